@@ -1,6 +1,6 @@
 import json
 
-from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from django.db import models
 from django.db.models import Q
@@ -8,13 +8,14 @@ from django.utils.formats import date_format
 from django.utils.timezone import localtime
 
 from apps.chat.models import BlockList, Chat, ChatParticipants, Message
+from setup.metrics import MeteredConsumerMixin
 
 
-class ChatConsumer(AsyncWebsocketConsumer):
+class ChatConsumer(MeteredConsumerMixin, AsyncWebsocketConsumer):
     async def connect(self) -> None:
         self.room_uuid = self.scope["url_route"]["kwargs"]["room_uuid"]
         self.room_group_uuid = f"chat_{self.room_uuid}"
-        self.chat = await sync_to_async(Chat.objects.get)(id=self.room_uuid)
+        self.chat = await database_sync_to_async(Chat.objects.get)(id=self.room_uuid)
         await self.channel_layer.group_add(self.room_group_uuid, self.channel_name)
         await self.accept()
 
@@ -31,7 +32,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return
 
         message_content = text_data_json["message"]
-        message = await sync_to_async(Message.objects.create)(
+        message = await database_sync_to_async(Message.objects.create)(
             sender=self.scope["user"],
             content=message_content,
             chat_id=self.room_uuid,
@@ -55,19 +56,19 @@ class ChatConsumer(AsyncWebsocketConsumer):
         message = event["message"]
         await self.send(text_data=json.dumps({"message": message}))
 
-    @sync_to_async
+    @database_sync_to_async
     def update_message_not_read(self) -> list:
         ChatParticipants.objects.filter(chat_id=self.room_uuid).exclude(user=self.scope["user"]).update(
             messages_not_read=models.F("messages_not_read") + 1
         )
 
-    @sync_to_async
+    @database_sync_to_async
     def read_messages(self) -> list:
         ChatParticipants.objects.filter(chat_id=self.room_uuid).filter(user=self.scope["user"]).update(
             messages_not_read=0
         )
 
-    @sync_to_async
+    @database_sync_to_async
     def verify_block(self) -> bool:
         receiver = self.chat.participants.filter(~Q(id=self.scope["user"].id)).first()
         return BlockList.objects.filter(
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class MatchmakingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.matchmaking"
+
+    def ready(self) -> None:
+        from setup.metrics import instrument_database_sync_to_async
+
+        instrument_database_sync_to_async()
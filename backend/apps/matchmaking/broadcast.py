@@ -0,0 +1,177 @@
+import asyncio
+import json
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Protocol
+
+from apps.matchmaking.pong_protocol import Snapshot, encode_delta, needs_keyframe
+
+if TYPE_CHECKING:
+    from channels.layers import BaseChannelLayer
+
+
+class FrameReceiver(Protocol):
+    channel_name: str
+
+    async def send_frame(self, frame: "EncodedFrame") -> None: ...
+
+
+@dataclass(slots=True)
+class BroadcastRate:
+    """Network send clock of one match, decoupled from its simulation clock.
+
+    While the state changes a frame goes out every ``active_every`` ticks; a static
+    state only gets a heartbeat every ``heartbeat_every`` ticks. Inputs and events
+    mark the clock ``urgent`` so the very next tick is sent.
+    """
+
+    tick_rate: float
+    active_every: int
+    heartbeat_every: int
+    last_sent_tick: int = 0
+    urgent: bool = False
+
+    @classmethod
+    def create(cls, tick_rate: float, broadcast_rate: float, heartbeat_rate: float) -> "BroadcastRate":
+        return cls(
+            tick_rate=tick_rate,
+            active_every=max(1, round(tick_rate / broadcast_rate)),
+            heartbeat_every=max(1, round(tick_rate / heartbeat_rate)),
+        )
+
+    def set_rate(self, rate: float) -> None:
+        """Override the active rate of this match, bounded by the heartbeat and tick rates."""
+        self.active_every = min(self.heartbeat_every, max(1, round(self.tick_rate / rate)))
+
+    def due(self, tick: int, changed: bool) -> bool:
+        elapsed = tick - self.last_sent_tick
+        if self.urgent or (changed and elapsed >= self.active_every) or elapsed >= self.heartbeat_every:
+            self.urgent = False
+            self.last_sent_tick = tick
+            return True
+        return False
+
+
+@dataclass(slots=True)
+class SpectatorFeed:
+    """Downsampled stream of one match for its spectators, encoded once per frame.
+
+    A frame goes out every ``every`` ticks as a binary delta against the previous
+    spectator frame, carrying the events of the skipped ticks. Keyframes are sent
+    on game events, when a spectator joins, and every ``keyframe_every`` frames so
+    a viewer that missed one resynchronizes. Spectators announce themselves
+    regularly; the feed is idle once none did for ``idle_ticks`` ticks.
+    """
+
+    every: int
+    keyframe_every: int
+    idle_ticks: int
+    last_join_tick: int = 0
+    last_sent_tick: int = 0
+    frames_since_keyframe: int = 0
+    snapshot: Snapshot | None = None
+    events: list[dict] = field(default_factory=list)
+    keyframe_due: bool = True
+
+    @classmethod
+    def create(
+        cls, tick_rate: float, spectator_rate: float, keyframe_interval: float, idle_timeout: float
+    ) -> "SpectatorFeed":
+        every = max(1, round(tick_rate / spectator_rate))
+        return cls(
+            every=every,
+            keyframe_every=max(1, round(keyframe_interval * tick_rate / every)),
+            idle_ticks=round(idle_timeout * tick_rate),
+        )
+
+    def idle(self, tick: int) -> bool:
+        return tick - self.last_join_tick > self.idle_ticks
+
+    def frame(self, tick: int, snapshot: Snapshot, events: list[dict], game: Callable[[], dict]) -> dict | None:
+        """Return the channel layer event of this tick for the spectator group, if one is due."""
+        self.events.extend(events)
+        keyframe = self.keyframe_due or needs_keyframe(self.events) or self.frames_since_keyframe >= self.keyframe_every
+        if not keyframe and tick - self.last_sent_tick < self.every:
+            return None
+
+        self.last_sent_tick = tick
+        events, self.events = self.events, []
+        if keyframe:
+            self.keyframe_due = False
+            self.frames_since_keyframe = 0
+            self.snapshot = snapshot
+            return {
+                "type": "send_spectator_frame",
+                "text": json.dumps({"game": game(), "events": events}),
+                # Spectators stop asking for the feed once they saw the last frame.
+                "final": any(event["type"] == "game_over" for event in events),
+            }
+
+        delta = encode_delta(tick, self.snapshot, snapshot, events)
+        self.snapshot = snapshot
+        self.frames_since_keyframe += 1
+        return {"type": "send_spectator_frame", "bytes": delta}
+
+
+class EncodedFrame:
+    """One broadcast of a match, encoded at most once per wire format.
+
+    ``delta`` is the binary frame for ticks, ``None`` for keyframes. The JSON text
+    is only produced when a local consumer actually needs it.
+    """
+
+    def __init__(self, game: Callable[[], dict], events: list[dict], delta: bytes | None = None) -> None:
+        self._game = game
+        self.events = events
+        self.delta = delta
+        self._text: str | None = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = json.dumps({"game": self._game(), "events": self.events})
+        return self._text
+
+    def to_event(self) -> dict:
+        if self.delta is not None:
+            return {"type": "send_game_delta", "frame": self.delta}
+        return {"type": "send_game_state", "game": self._game(), "events": self.events}
+
+
+class LocalFanout:
+    """Deliver match broadcasts straight to consumers living in this process.
+
+    Only channels that are not registered locally go through the channel layer,
+    one direct ``send`` each, so a match whose players share a worker never
+    touches Redis on the tick path.
+    """
+
+    def __init__(self) -> None:
+        self.groups: dict[str, dict[str, FrameReceiver]] = {}
+
+    def add(self, group: str, consumer: FrameReceiver) -> None:
+        self.groups.setdefault(group, {})[consumer.channel_name] = consumer
+
+    def discard(self, group: str, consumer: FrameReceiver) -> None:
+        members = self.groups.get(group)
+        if members is None:
+            return
+        members.pop(consumer.channel_name, None)
+        if not members:
+            del self.groups[group]
+
+    async def publish(
+        self,
+        channel_layer: "BaseChannelLayer",
+        group: str,
+        channel_names: Iterable[str],
+        frame: EncodedFrame,
+    ) -> None:
+        local = self.groups.get(group, {})
+        remote = [name for name in channel_names if name not in local]
+
+        sends = [consumer.send_frame(frame) for consumer in local.values()]
+        if remote:
+            event = frame.to_event()
+            sends.extend(channel_layer.send(name, event) for name in remote)
+        await asyncio.gather(*sends)
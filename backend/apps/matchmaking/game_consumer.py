@@ -1,270 +1,176 @@
 import asyncio
 import json
-import secrets
 import time
-from dataclasses import dataclass, field
-from enum import Enum
+import uuid
+from collections.abc import Coroutine
 from typing import ClassVar
 
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
-from django.utils.timezone import now
-
-from apps.matchmaking.models import Match, Tournament
-from apps.users.models import User
-
-GRID_WIDTH = 50
-GRID_HEIGHT = 25
-PADDLE_HEIGHT = 5.0
-PADDLE_WIDTH = 1.0
-BALL_SIZE = 1.0
-BALL_SPEED = 0.5
-PADDLE_X_OFFSET = 0.1
-FRAME_DELAY = 1 / 30
-PADDLE_SPEED = 0.3
-WIN_SCORE = 3
+from django.conf import settings
+
+from apps.matchmaking.broadcast import BroadcastRate, EncodedFrame, LocalFanout, SpectatorFeed
+from apps.matchmaking.models import MatchType, Tournament
+from apps.matchmaking.pong_ai import AIConfig, AIDifficulty, AIPlayer
+from apps.matchmaking.pong_engine import GameState, simulate
+from apps.matchmaking.pong_physics import BASE_TICK_RATE, paddle_velocity
+from apps.matchmaking.pong_protocol import (
+    MAX_INPUT_SEQ,
+    WireFormat,
+    apply_delta,
+    encode_delta,
+    needs_keyframe,
+)
+from apps.matchmaking.replays import MatchRecorder
+from apps.matchmaking.results import MatchResult, match_finished, result_writer
+from apps.matchmaking.scheduler import MatchScheduler, TimerWheel
+from apps.matchmaking.sharding import SHARD_REDIRECT_CODE, routable, shard_map
+from apps.matchmaking.state_store import state_store
+from apps.matchmaking.tickets import read_ticket
+from setup.metrics import ACTIVE_MATCHES, BROADCAST_LATENCY, MeteredConsumerMixin
+
+FRAME_DELAY = 1 / settings.PONG_SIMULATION_RATE
+SIMULATION_STEP = BASE_TICK_RATE / settings.PONG_SIMULATION_RATE
 REQUIRED_NUMBER_OF_PLAYERS = 2
-INITIAL_SPEED_HITS = 4
-MEDIUM_SPEED_HITS = 8
-MAX_SPEED_MULTIPLIER = 1.5
-
-
-class AIDifficulty(Enum):
-    EASY = "easy"
-    MEDIUM = "medium"
-    HARD = "hard"
-
-
-@dataclass
-class AIConfig:
-    prediction_interval: float
-    max_bounces: int
-    reaction_delay: float
-    speed_multiplier: float
-    return_to_center: bool
-
-    @classmethod
-    def get_config(cls, difficulty: str) -> "AIConfig":
-        configs = {
-            AIDifficulty.EASY.value: cls(
-                prediction_interval=2.0,
-                max_bounces=1,
-                reaction_delay=0.3,
-                speed_multiplier=0.7,
-                return_to_center=False,
-            ),
-            AIDifficulty.MEDIUM.value: cls(
-                prediction_interval=1.5,
-                max_bounces=2,
-                reaction_delay=0.1,
-                speed_multiplier=1.0,
-                return_to_center=True,
-            ),
-            AIDifficulty.HARD.value: cls(
-                prediction_interval=1.0,
-                max_bounces=4,
-                reaction_delay=0.0,
-                speed_multiplier=1.2,
-                return_to_center=True,
-            ),
-        }
-        return configs.get(difficulty, configs[AIDifficulty.MEDIUM.value])
-
-
-@dataclass
-class GameObject:
-    x: float
-    y: float
-    width: float
-    height: float
-    vx: float = 0.0
-    vy: float = 0.0
-
-
-@dataclass
-class Paddle(GameObject):
-    def __init__(self, x: float, y: float) -> None:
-        super().__init__(x=x, y=y, width=PADDLE_WIDTH, height=PADDLE_HEIGHT, vy=0.0)
-
-
-@dataclass
-class Ball(GameObject):
-    resseting: bool = False
-    reset_timer: float = 0.0
-    speed_multiplier: float = 1.0
-    hits: int = 0
-
-    def __init__(self) -> None:
-        super().__init__(
-            x=GRID_WIDTH / 2 - BALL_SIZE / 2,
-            y=GRID_HEIGHT / 2 - BALL_SIZE / 2,
-            width=BALL_SIZE,
-            height=BALL_SIZE,
-            vx=BALL_SPEED,
-            vy=BALL_SPEED,
+CHECKPOINT_EVERY = max(1, round(settings.GAME_STATE_CHECKPOINT_INTERVAL * settings.PONG_SIMULATION_RATE))
+SPECTATOR_GROUP = "spectate_{}"
+# Spectators announce themselves this often, and a feed nobody announced for a few intervals stops.
+SPECTATOR_ANNOUNCE_INTERVAL = 2.0
+SPECTATOR_IDLE_TIMEOUT = 3 * SPECTATOR_ANNOUNCE_INTERVAL
+FORFEIT_TIMER_RESOLUTION = 0.5
+
+
+def step_matches(rooms: list[str]) -> None:
+    """Advance the simulation of every scheduled match in one batch before the per-match callbacks run.
+
+    The inputs received since the previous tick are applied first, at the tick
+    boundary, and logged with the tick they were applied before.
+    """
+    games = []
+    for room in rooms:
+        game = PongConsumer.games.get(room)
+        if game is None:
+            continue
+        changed = game.apply_inputs()
+        recorder = PongConsumer.recorders.get(room)
+        if recorder is not None:
+            for paddle, velocity in changed:
+                recorder.record(game.tick, paddle, velocity)
+        games.append(game)
+    simulate(games, SIMULATION_STEP)
+
+
+def new_game() -> GameState:
+    return GameState(
+        broadcast=BroadcastRate.create(
+            settings.PONG_SIMULATION_RATE, settings.PONG_BROADCAST_RATE, settings.PONG_HEARTBEAT_RATE
         )
+    )
 
-    def reset(self) -> None:
-        self.x = GRID_WIDTH / 2 - BALL_SIZE / 2
-        self.y = GRID_HEIGHT / 2 - BALL_SIZE / 2
-        self.vx = (1 if secrets.randbelow(2) == 1 else -1) * BALL_SPEED
-        self.vy = (1 if secrets.randbelow(2) == 1 else -1) * BALL_SPEED * secrets.SystemRandom().uniform(0.5, 1.5)
-        self.resseting = True
-        self.reset_timer = time.perf_counter() + secrets.SystemRandom().uniform(0.5, 1.5)
-        self.speed_multiplier = 1.0
-        self.hits = 0
-
-    def increase_speed(self, normalized_impact: float) -> None:
-        if self.hits < INITIAL_SPEED_HITS:
-            speed_increase = 0.15
-        elif self.hits < MEDIUM_SPEED_HITS:
-            speed_increase = 0.10
-        elif self.speed_multiplier < MAX_SPEED_MULTIPLIER:
-            speed_increase = 0.05
-        else:
-            speed_increase = 0.0
-
-        self.speed_multiplier += speed_increase
-        self.hits += 1
-
-        self.vx = (self.vx / abs(self.vx)) * -1 * BALL_SPEED * self.speed_multiplier
-        self.vy = (self.vy / abs(self.vy)) * normalized_impact * BALL_SPEED * self.speed_multiplier
-
-
-@dataclass
-class Score:
-    left_score: int = 0
-    right_score: int = 0
-
-
-@dataclass
-class GameState:
-    players: dict[str, str | None] = field(default_factory=dict)
-    paddles: dict[str, Paddle] = field(default_factory=dict)
-    ball: Ball = field(default_factory=Ball)
-    score: Score = field(default_factory=Score)
-    running: bool = False
-    is_single_player: bool = False
-    last_prediction_time: float = 0.0
-    ai_target_y: float | None = None
-    last_ball_direction: float | None = None
-    ai_config: AIConfig | None = None
-    last_ai_move_time: float = 0.0
-
-    def __init__(self) -> None:
-        self.players = {}
-        self.paddles = {
-            "left_paddle": Paddle(x=PADDLE_X_OFFSET, y=GRID_HEIGHT / 2 - PADDLE_HEIGHT / 2),
-            "right_paddle": Paddle(
-                x=GRID_WIDTH - PADDLE_X_OFFSET - PADDLE_WIDTH, y=GRID_HEIGHT / 2 - PADDLE_HEIGHT / 2
-            ),
-        }
-        self.ball = Ball()
-        self.score = Score()
-        self.running = False
-        self.is_single_player = False
-        self.last_prediction_time = 0.0
-        self.ai_target_y = None
-        self.last_ball_direction = None
-        self.ai_config = None
-        self.last_ai_move_time = 0.0
-
-    def to_dict(self) -> dict:
-        return {
-            "players": self.players,
-            "paddles": {k: vars(v) for k, v in self.paddles.items()},
-            "ball": vars(self.ball),
-            "score": vars(self.score),
-            "running": self.running,
-        }
-
-    def should_update_prediction(self, current_time: float) -> bool:
-        if not self.ai_config:
-            return False
-        return current_time - self.last_prediction_time >= self.ai_config.prediction_interval
-
-    def update_prediction_time(self, current_time: float) -> None:
-        self.last_prediction_time = current_time
-
-
-class PongConsumer(AsyncWebsocketConsumer):
+
+class PongConsumer(MeteredConsumerMixin, AsyncWebsocketConsumer):
     games: ClassVar[dict[str, GameState]] = {}
-    game_locks: ClassVar[dict] = {}
+    scheduler: ClassVar[MatchScheduler] = MatchScheduler(FRAME_DELAY, step=step_matches, name="pong")
+    local_groups: ClassVar[LocalFanout] = LocalFanout()
+    background_tasks: ClassVar[set[asyncio.Task]] = set()
+    recorders: ClassVar[dict[str, MatchRecorder]] = {}
+    # Matches paused until a player reconnects, forfeited when their timer fires.
+    forfeits: ClassVar[TimerWheel] = TimerWheel(FORFEIT_TIMER_RESOLUTION, name="pong forfeit")
 
     async def connect(self) -> None:
         self.match_id = self.scope["url_route"]["kwargs"]["match_id"]
         self.room_group_name = f"match_{self.match_id}"
         self.user = self.scope["user"]
+        self.wire_format = WireFormat.negotiate(self.scope["query_string"])
+        self.keyframe: dict | None = None
 
         if not self.user.is_authenticated:
             await self.close()
             return
 
-        self.match = await database_sync_to_async(Match.objects.get)(id=self.match_id)
+        # The page signed who may join and on which side: reconnect storms never reach the database.
+        self.ticket = read_ticket(self.scope["query_string"], self.match_id, MatchType.PONG, self.user)
+        if self.ticket is None:
+            await self.close()
+            return
+        self.is_left_user = self.ticket.is_player1
 
-        if self.match.finished_date_played or not await verify_if_user_in_match(self.match, self.user):
+        # Tickets outlive the match: once its game is released, only the database knows it is over.
+        if self.room_group_name not in self.games and await match_finished(self.match_id):
             await self.close()
             return
 
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
 
-        if self.room_group_name not in self.games:
-            self.games[self.room_group_name] = GameState()
-            self.game_locks[self.room_group_name] = asyncio.Lock()
+        owner = await shard_map.claim(self.match_id) or await state_store.acquire(self.match_id)
+        if owner is not None:
+            if routable(owner):
+                await self.close(code=SHARD_REDIRECT_CODE, reason=owner)
+            else:
+                # Held by a worker nginx cannot reach: the client retries until the lease moves or expires.
+                await self.close()
+            return
 
-        self.is_left_user = await is_left_user(self.match, self.user)
+        self.local_groups.add(self.room_group_name, self)
+
+        if self.room_group_name not in self.games:
+            game = new_game()
+            await state_store.restore_pong(self.match_id, game)
+            self.games[self.room_group_name] = game
 
         game = self.games[self.room_group_name]
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {"type": "send_game_state", "game": game.to_dict(), "events": []},
-        )
+        game.reset_inputs("left_paddle" if self.is_left_user else "right_paddle")
+        await self.send_keyframe(game, [])
+
+        game.players[self.user.username] = self.channel_name
+        if self.forfeits.cancel(self.room_group_name):
+            # Back within the grace period: the paused match resumes from where it stopped.
+            self.scheduler.add(self.room_group_name, self.update_game_state)
 
-        if self.user.username not in game.players:
-            game.players[self.user.username] = self.channel_name
+        await self.start_game(game)
 
+    async def start_game(self, game: GameState) -> None:
+        # Tickets outlive the match: a socket reopened once it is over must not start it again.
+        if game.winner:
+            return
         self.is_single_player = "single_player" in self.scope["url_route"]["kwargs"]
         if self.is_single_player:
             difficulty = self.scope["url_route"]["kwargs"].get("difficulty", AIDifficulty.MEDIUM.value)
-            game.ai_config = AIConfig.get_config(difficulty)
+            if not game.ai_players:
+                game.ai_players = [AIPlayer("right_paddle", AIConfig.get_config(difficulty))]
             game.is_single_player = True
             game.players["AI"] = "AI"
-            if len(game.players) >= 1 and not game.running:
+            if not game.running:
                 game.running = True
-                await self.channel_layer.group_send(
-                    self.room_group_name,
-                    {
-                        "type": "send_game_state",
-                        "game": game.to_dict(),
-                        "events": [{"type": "game_start"}],
-                    },
-                )
-                self.game_task = asyncio.create_task(self.game_loop())
+                self.start_recording(game, difficulty)
+                await self.send_keyframe(game, [{"type": "game_start"}])
+                self.scheduler.add(self.room_group_name, self.update_game_state)
+                return
         elif len(game.players.values()) == REQUIRED_NUMBER_OF_PLAYERS and not game.running:
             game.running = True
-            if not hasattr(self, "game_task") or self.game_task.done():
-                await self.channel_layer.group_send(
-                    self.room_group_name,
-                    {
-                        "type": "send_game_state",
-                        "game": game.to_dict(),
-                        "events": [{"type": "game_start"}],
-                    },
-                )
-                self.game_task = asyncio.create_task(self.game_loop())
-        elif game.running:
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    "type": "send_game_state",
-                    "game": game.to_dict(),
-                    "events": [{"type": "game_start"}],
-                },
-            )
+            self.start_recording(game)
+            if self.room_group_name not in self.scheduler:
+                await self.send_keyframe(game, [{"type": "game_start"}])
+                self.scheduler.add(self.room_group_name, self.update_game_state)
+            return
+
+        if game.running:
+            await self.send_keyframe(game, [{"type": "game_start"}])
+
+    def start_recording(self, game: GameState, difficulty: str | None = None) -> None:
+        # A match resumed from a checkpoint lost the inputs that led to it, so it cannot be replayed.
+        if game.tick == 0 and self.room_group_name not in self.recorders:
+            self.recorders[self.room_group_name] = MatchRecorder.start(self.match_id, game, difficulty)
+
+    async def stop_recording(self, game: GameState) -> None:
+        recorder = self.recorders.pop(self.room_group_name, None)
+        if recorder is not None:
+            await recorder.close(game.tick)
 
     async def disconnect(self, message: dict) -> None:
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+        self.local_groups.discard(self.room_group_name, self)
         game = self.games.get(self.room_group_name)
         if not game:
             return
@@ -274,28 +180,38 @@ class PongConsumer(AsyncWebsocketConsumer):
                 game.players[username] = None
 
         human_players = [p for p in game.players.values() if p != "AI"]
-        if all(p is None for p in human_players):
-            del self.games[self.room_group_name]
-            if not game.running:
-                return
-            self.match.score_user1 = game.score.left_score
-            self.match.score_user2 = game.score.right_score
-            self.match.finished_date_played = now()
-            await self.match.asave(update_fields=["score_user1", "score_user2", "finished_date_played"])
-
-            if game.score.left_score == game.score.right_score:
-                winner = self.match.user1 if self.is_left_user else self.match.user2
-                losser = self.match.user2 if self.is_left_user else self.match.user1
-            else:
-                winner = self.match.user1 if game.score.left_score > game.score.right_score else self.match.user2
-                losser = self.match.user2 if game.score.left_score > game.score.right_score else self.match.user1
+        if not all(p is None for p in human_players):
+            return
+
+        if not game.running:
+            await self.release_match(game)
+            return
 
-            winner.wins += 1
-            losser.losses += 1
-            self.match.winner = winner
-            await self.match.asave(update_fields=["winner"])
-            await winner.asave(update_fields=["wins"])
-            await losser.asave(update_fields=["losses"])
+        # Paused rather than lost: no ticks nor broadcasts until a player comes back or the grace period ends.
+        self.scheduler.remove(self.room_group_name)
+        if state_store.enabled:
+            await state_store.checkpoint_pong(self.match_id, game)
+        self.forfeits.schedule(self.room_group_name, settings.PONG_RECONNECT_GRACE, self.forfeit)
+
+    async def forfeit(self) -> None:
+        """End a paused match nobody reconnected to, the last player to leave winning a tie."""
+        game = self.games.get(self.room_group_name)
+        if game is None:
+            return
+        await self.release_match(game)
+
+        if game.score.left_score == game.score.right_score:
+            left_won = self.is_left_user
+        else:
+            left_won = game.score.left_score > game.score.right_score
+        await self.update_match_winner(self.match_result(game, left_won))
+
+    async def release_match(self, game: GameState) -> None:
+        del self.games[self.room_group_name]
+        self.scheduler.remove(self.room_group_name)
+        await shard_map.release(self.match_id)
+        await state_store.discard(self.match_id)
+        await self.stop_recording(game)
 
     async def receive(self, text_data: str) -> None:
         data = json.loads(text_data)
@@ -303,132 +219,130 @@ class PongConsumer(AsyncWebsocketConsumer):
         if not game:
             return
 
-        async with self.game_locks[self.room_group_name]:
-            paddle_key = "left_paddle" if self.is_left_user else "right_paddle"
-            speed = PADDLE_SPEED if data["event"] == "keydown" else 0
-            if data["type"] == "up":
-                game.paddles[paddle_key].vy = -speed
-            elif data["type"] == "down":
-                game.paddles[paddle_key].vy = speed
-
-    async def game_loop(self) -> None:
-        while self.room_group_name in self.games and self.games[self.room_group_name].running:
-            start_time = time.perf_counter()
-            await self.update_game_state()
-            elapsed_time = time.perf_counter() - start_time
-            sleep_time = max(FRAME_DELAY - elapsed_time, 0)
-            await asyncio.sleep(sleep_time)
+        if data["type"] in {"up", "down"}:
+            # No lock and no await: the tick drains the queue at its next boundary.
+            seq = data.get("seq")
+            game.queue_input(
+                "left_paddle" if self.is_left_user else "right_paddle",
+                seq if isinstance(seq, int) and 0 < seq <= MAX_INPUT_SEQ else None,
+                paddle_velocity(data["type"], data["event"]),
+            )
 
     async def update_game_state(self) -> None:
         game = self.games.get(self.room_group_name)
         if not game:
+            self.scheduler.remove(self.room_group_name)
+            return
+
+        recorder = self.recorders.get(self.room_group_name)
+        if recorder is not None:
+            await recorder.flush()
+
+        events = game.events
+        if not game.running:
+            self.scheduler.remove(self.room_group_name)
+            await shard_map.release(self.match_id)
+            await state_store.discard(self.match_id)
+            await self.stop_recording(game)
+            if game.winner:
+                self.finish_match(game)
+        elif state_store.enabled and (needs_keyframe(events) or game.tick % CHECKPOINT_EVERY == 0):
+            await state_store.checkpoint_pong(self.match_id, game)
+        if game.spectators is not None:
+            self.publish_spectators(game, events)
+
+        if needs_keyframe(events):
+            await self.send_keyframe(game, events)
             return
 
-        ball = game.ball
-        paddles = game.paddles
-        events = []
+        snapshot = game.snapshot()
+        if events:
+            game.broadcast.urgent = True
+        if not game.broadcast.due(game.tick, changed=snapshot != game.last_snapshot):
+            return
 
-        async with self.game_locks[self.room_group_name]:
-            await self.update_ball_position(ball)
-            await self.update_paddle_positions(paddles)
+        delta = encode_delta(game.tick, game.last_snapshot, snapshot, events)
+        game.last_snapshot = snapshot
+        await self.publish(game, EncodedFrame(game.to_dict, events, delta))
 
-            if game.is_single_player:
-                await self.update_ai_paddle(game)
+    def publish_spectators(self, game: GameState, events: list[dict]) -> None:
+        if game.spectators.idle(game.tick):
+            # Every spectator left: no more frames until one announces itself again.
+            game.spectators = None
+            return
+        event = game.spectators.frame(game.tick, game.snapshot(), events, game.to_dict)
+        if event is not None:
+            # Spectators never hold up the tick: one pre-encoded frame per match goes to their group.
+            self.run_in_background(self.channel_layer.group_send(SPECTATOR_GROUP.format(self.match_id), event))
 
-            await self.check_wall_collisions(ball, events)
-            await self.check_paddle_collisions(ball, paddles, events)
-            await self.check_score(ball, game, events)
+    async def set_broadcast_rate(self, event: dict) -> None:
+        """Override the broadcast rate of the match, sent by the ``set_broadcast_rate`` command.
 
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {"type": "send_game_state", "game": game.to_dict(), "events": events},
-        )
+        The rate is shared by both players, so it is a channel layer event that
+        no player socket can send.
+        """
+        game = self.games.get(self.room_group_name)
+        rate = event.get("rate")
+        if game is not None and isinstance(rate, int | float) and rate > 0:
+            game.broadcast.set_rate(rate)
 
-    async def update_ball_position(self, ball: Ball) -> None:
-        if not ball.resseting:
-            ball.x += ball.vx
-            ball.y += ball.vy
-        elif time.perf_counter() > ball.reset_timer:
-            ball.resseting = False
-
-    async def update_paddle_positions(self, paddles: dict[str, Paddle]) -> None:
-        paddles["left_paddle"].y = max(
-            1.0,
-            min(
-                GRID_HEIGHT - PADDLE_HEIGHT - 1.0,
-                paddles["left_paddle"].y + paddles["left_paddle"].vy,
-            ),
-        )
-        paddles["right_paddle"].y = max(
-            1.0,
-            min(
-                GRID_HEIGHT - PADDLE_HEIGHT - 1.0,
-                paddles["right_paddle"].y + paddles["right_paddle"].vy,
-            ),
+    async def spectator_join(self, event: dict) -> None:
+        game = self.games.get(self.room_group_name)
+        if game is None:
+            return
+        if game.spectators is None:
+            game.spectators = SpectatorFeed.create(
+                settings.PONG_SIMULATION_RATE,
+                settings.PONG_SPECTATOR_RATE,
+                settings.PONG_SPECTATOR_KEYFRAME_INTERVAL,
+                SPECTATOR_IDLE_TIMEOUT,
+            )
+        game.spectators.last_join_tick = game.tick
+        # A spectator only keeping the feed alive already follows the stream.
+        if event.get("keyframe", True):
+            game.spectators.keyframe_due = True
+
+    async def send_keyframe(self, game: GameState, events: list[dict]) -> None:
+        game.last_snapshot = game.snapshot()
+        game.broadcast.last_sent_tick = game.tick
+        await self.publish(game, EncodedFrame(game.to_dict, events))
+
+    async def publish(self, game: GameState, frame: EncodedFrame) -> None:
+        channels = [channel for channel in game.players.values() if channel and channel != "AI"]
+        start = time.perf_counter()
+        await self.local_groups.publish(self.channel_layer, self.room_group_name, channels, frame)
+        BROADCAST_LATENCY.observe(time.perf_counter() - start, "fanout")
+
+    def match_result(self, game: GameState, left_won: bool) -> MatchResult:
+        user1, user2 = self.ticket.user_ids
+        return MatchResult(
+            match_id=self.ticket.match_id,
+            winner_id=user1 if left_won else user2,
+            loser_id=user2 if left_won else user1,
+            score_user1=game.score.left_score,
+            score_user2=game.score.right_score,
         )
 
-    async def check_wall_collisions(self, ball: Ball, events: list) -> None:
-        if ball.y < 1.0 or ball.y > GRID_HEIGHT - 2.0:
-            ball.vy *= -1
-            events.append({"type": "wall_hit"})
-
-    async def check_paddle_collisions(self, ball: Ball, paddles: dict[str, Paddle], events: list) -> None:
-        left_paddle = paddles["left_paddle"]
-        right_paddle = paddles["right_paddle"]
-
-        def update_ball_when_collide_with_paddle(paddle: Paddle, new_ball_x: float) -> None:
-            impact_point = ball.y + ball.height / 2 - (paddle.y + paddle.height / 2)
-            normalized_impact = impact_point / (paddle.height / 2)
-            ball.increase_speed(normalized_impact)
-            ball.x = new_ball_x
-
-        if (
-            ball.x < left_paddle.x + left_paddle.width
-            and (left_paddle.y - ball.height) < ball.y < left_paddle.y + left_paddle.height
-        ):
-            update_ball_when_collide_with_paddle(left_paddle, left_paddle.x + left_paddle.width)
-            events.append({"type": "paddle_hit"})
-
-        if (
-            right_paddle.x < (ball.x + BALL_SIZE)
-            and (right_paddle.y - ball.height) < ball.y < right_paddle.y + right_paddle.height
-        ):
-            update_ball_when_collide_with_paddle(right_paddle, right_paddle.x - ball.width)
-            events.append({"type": "paddle_hit"})
-
-    async def check_score(self, ball: Ball, game: GameState, events: list) -> None:
-        if ball.x < 0.0 or ball.x > GRID_WIDTH - BALL_SIZE:
-            if ball.x < 0.0:
-                game.score.right_score += 1
-                scoring_player = "right_score"
-            else:
-                game.score.left_score += 1
-                scoring_player = "left_score"
-
-            events.append({"type": "score_update"})
-            ball.reset()
-
-            current_score = game.score.right_score if scoring_player == "right_score" else game.score.left_score
-            if current_score >= WIN_SCORE:
-                winner = self.match.user1 if scoring_player == "left_score" else self.match.user2
-                losser = self.match.user2 if scoring_player == "left_score" else self.match.user1
-                asyncio.create_task(self.update_match_winner(self.match, winner, losser, game.score))  # noqa: RUF006
-                game.running = False
-                events.append({"type": "game_over", "winner": winner.username})
-
-    async def update_match_winner(self, match: Match, winner: User, losser: User, scores: Score) -> None:
-        match.winner = winner
-        match.score_user1 = scores.left_score
-        match.score_user2 = scores.right_score
-        match.finished_date_played = now()
-        await match.asave(update_fields=["winner", "score_user1", "score_user2", "finished_date_played"])
-
-        winner.wins += 1
-        losser.losses += 1
-        await winner.asave(update_fields=["wins"])
-        await losser.asave(update_fields=["losses"])
-
-        tournament_matches = await get_tournament_matches(match)
+    def finish_match(self, game: GameState) -> None:
+        left_won = game.winner == "left_paddle"
+        winner = self.ticket.usernames[0 if left_won else 1]
+        for event in game.events:
+            if event["type"] == "game_over":
+                event["winner"] = winner
+
+        # The tick must not wait on the database; results finishing in the same tick share one transaction.
+        self.run_in_background(self.update_match_winner(self.match_result(game, left_won)))
+
+    def run_in_background(self, coroutine: Coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+
+    async def update_match_winner(self, result: MatchResult) -> None:
+        if not await result_writer.commit(result):
+            return
+
+        tournament_matches = await get_tournament_matches(result.match_id)
         if tournament_matches:
             tournament = tournament_matches[0]
             await tournament_check_round_finished(tournament)
@@ -439,74 +353,27 @@ class PongConsumer(AsyncWebsocketConsumer):
             )
 
     async def send_game_state(self, event: dict) -> None:
+        self.keyframe = event["game"]
         await self.send(text_data=json.dumps({"game": event["game"], "events": event["events"]}))
 
-    async def update_ai_paddle(self, game: GameState) -> None:
-        ball = game.ball
-        ai_paddle = game.paddles["right_paddle"]
-
-        if self.should_stop_ai(ball):
-            ai_paddle.vy = 0
-            return
-
-        current_time = time.perf_counter()
-        if game.should_update_prediction(current_time):
-            game.update_prediction_time(current_time)
-            await self.update_ai_target(game, ball)
-
-        await self.move_ai_paddle(game, ai_paddle)
-
-    def should_stop_ai(self, ball: Ball) -> bool:
-        return ball.vx == 0 or ball.vy == 0 or ball.x < 0 or ball.x > GRID_WIDTH - BALL_SIZE or ball.resseting
-
-    async def update_ai_target(self, game: GameState, ball: Ball) -> None:
-        if game.last_ball_direction != ball.vx:
-            game.last_ball_direction = ball.vx
-            if ball.vx < 0 and game.ai_config.return_to_center:
-                game.ai_target_y = GRID_HEIGHT / 2
-            else:
-                game.ai_target_y = await self.predict_ball_y_position(game)
-
-    async def predict_ball_y_position(self, game: GameState) -> float:
-        ball = game.ball
-        ai_paddle = game.paddles["right_paddle"]
-
-        time_to_reach = (ai_paddle.x - ball.x) / ball.vx
-        predicted_y = ball.y + (ball.vy * time_to_reach)
-
-        return await self.adjust_for_bounces(predicted_y, game.ai_config.max_bounces)
-
-    async def adjust_for_bounces(self, predicted_y: float, max_bounces: int) -> float:
-        num_bounces = 0
-        while predicted_y < 1.0 or predicted_y > GRID_HEIGHT - 2.0:
-            if predicted_y < 1.0:
-                predicted_y = 2.0 - predicted_y
-            elif predicted_y > GRID_HEIGHT - 2.0:
-                predicted_y = 2 * (GRID_HEIGHT - 2.0) - predicted_y
-
-            num_bounces += 1
-            if num_bounces > max_bounces:
-                break
-
-        return predicted_y
+    async def send_frame(self, frame: EncodedFrame) -> None:
+        if frame.delta is not None and self.wire_format is WireFormat.BINARY:
+            await self.send(bytes_data=frame.delta)
+        else:
+            await self.send(text_data=frame.text)
 
-    async def move_ai_paddle(self, game: GameState, ai_paddle: Paddle) -> None:
-        if game.ai_target_y is None:
+    async def send_game_delta(self, event: dict) -> None:
+        if self.wire_format is WireFormat.BINARY:
+            await self.send(bytes_data=event["frame"])
             return
 
-        current_time = time.perf_counter()
-        if current_time - game.last_ai_move_time < game.ai_config.reaction_delay:
+        if self.keyframe is None:
             return
-        game.last_ai_move_time = current_time
+        events = apply_delta(self.keyframe, event["frame"])
+        await self.send(text_data=json.dumps({"game": self.keyframe, "events": events}))
 
-        paddle_center = ai_paddle.y + (PADDLE_HEIGHT / 2)
-        distance_to_target = abs(paddle_center - game.ai_target_y)
 
-        if distance_to_target < PADDLE_SPEED * game.ai_config.speed_multiplier:
-            ai_paddle.vy = 0
-        else:
-            speed = PADDLE_SPEED * game.ai_config.speed_multiplier
-            ai_paddle.vy = speed if paddle_center < game.ai_target_y else -speed
+ACTIVE_MATCHES.set_function("pong", function=lambda: len(PongConsumer.games))
 
 
 @database_sync_to_async
@@ -515,15 +382,5 @@ def tournament_check_round_finished(tournament: Tournament) -> bool:
 
 
 @database_sync_to_async
-def get_tournament_matches(match: Match) -> list[Match]:
-    return list(match.tournament_matches.all())
-
-
-@database_sync_to_async
-def is_left_user(match: Match, user: User) -> bool:
-    return user == match.user1
-
-
-@database_sync_to_async
-def verify_if_user_in_match(match: Match, user: User) -> bool:
-    return user in {match.user1, match.user2}
+def get_tournament_matches(match_id: uuid.UUID) -> list[Tournament]:
+    return list(Tournament.objects.filter(matches=match_id))
@@ -0,0 +1,344 @@
+import asyncio
+import contextvars
+import json
+import random
+import statistics
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+
+from apps.matchmaking.models import Match, MatchType
+from apps.matchmaking.pong_protocol import apply_delta
+from apps.matchmaking.tickets import issue_ticket
+from apps.users.models import User
+
+CONNECT_TIMEOUT = 10.0
+CLOSE_TIMEOUT = 5.0
+# Seconds without an answer after which a dropped click is played again.
+CLICK_RETRY = 1.0
+LOOP_LAG_INTERVAL = 0.01
+
+
+@dataclass(slots=True)
+class LoadStats:
+    connections: Counter[str] = field(default_factory=Counter)
+    refused: Counter[str] = field(default_factory=Counter)
+    sent: Counter[str] = field(default_factory=Counter)
+    received: Counter[str] = field(default_factory=Counter)
+    games: Counter[str] = field(default_factory=Counter)
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    loop_lag: list[float] = field(default_factory=list)
+
+    def latency(self, scenario: str, seconds: float) -> None:
+        self.latencies.setdefault(scenario, []).append(seconds)
+
+
+class SyntheticSocket:
+    """One WebSocket client driven straight through the ASGI application.
+
+    Messages sent by the consumer are handed to ``on_message`` as they are
+    produced, so thousands of clients need no reader task nor output queue.
+    """
+
+    def __init__(
+        self,
+        application: URLRouter,
+        path: str,
+        user: User,
+        on_message: Callable[[str | None, bytes | None], None],
+    ) -> None:
+        self.application = application
+        self.scope = {
+            "type": "websocket",
+            "path": path.split("?")[0],
+            "query_string": path.partition("?")[2].encode(),
+            "headers": [],
+            "subprotocols": [],
+            "client": ("127.0.0.1", 0),
+            "server": ("testserver", 80),
+            "user": user,
+        }
+        self.on_message = on_message
+        self.inbox: asyncio.Queue[dict] = asyncio.Queue()
+        self.accepted: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+        self.closed = False
+        self.task: asyncio.Task | None = None
+
+    async def connect(self) -> bool:
+        # A fresh context per client, as a real server gives every connection.
+        self.task = asyncio.create_task(
+            self.application(self.scope, self.inbox.get, self.deliver), context=contextvars.Context()
+        )
+        await self.inbox.put({"type": "websocket.connect"})
+        try:
+            return await asyncio.wait_for(asyncio.shield(self.accepted), CONNECT_TIMEOUT)
+        except TimeoutError:
+            return False
+
+    async def deliver(self, message: dict) -> None:
+        kind = message["type"]
+        if kind == "websocket.accept":
+            self.accepted.set_result(True)
+        elif kind == "websocket.close":
+            self.closed = True
+            if not self.accepted.done():
+                self.accepted.set_result(False)
+        elif kind == "websocket.send":
+            self.on_message(message.get("text"), message.get("bytes"))
+
+    async def send(self, text: str) -> None:
+        if not self.closed:
+            await self.inbox.put({"type": "websocket.receive", "text": text})
+
+    async def close(self) -> None:
+        if self.task is None:
+            return
+        await self.inbox.put({"type": "websocket.disconnect", "code": 1000})
+        done, _ = await asyncio.wait({self.task}, timeout=CLOSE_TIMEOUT)
+        if not done:
+            self.task.cancel()
+
+
+@dataclass(slots=True)
+class LoadTest:
+    application: URLRouter
+    duration: float
+    ramp: float
+    rate: float
+    stats: LoadStats = field(default_factory=LoadStats)
+    deadline: float = 0.0
+
+    @property
+    def running(self) -> bool:
+        return time.perf_counter() < self.deadline
+
+    async def run(self, scenarios: list[Callable[[], Awaitable[None]]]) -> None:
+        self.deadline = time.perf_counter() + self.ramp + self.duration
+        monitor = asyncio.create_task(self.monitor_loop_lag())
+        await asyncio.gather(*(self.start_later(scenario) for scenario in scenarios))
+        monitor.cancel()
+
+    async def start_later(self, scenario: Callable[[], Awaitable[None]]) -> None:
+        await asyncio.sleep(random.uniform(0, self.ramp))  # noqa: S311
+        await scenario()
+
+    async def monitor_loop_lag(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(LOOP_LAG_INTERVAL)
+            self.stats.loop_lag.append(time.perf_counter() - start - LOOP_LAG_INTERVAL)
+
+    async def open(
+        self, scenario: str, path: str, user: User, on_message: Callable[[str | None, bytes | None], None]
+    ) -> SyntheticSocket | None:
+        def count(text: str | None, data: bytes | None) -> None:
+            self.stats.received[scenario] += 1
+            on_message(text, data)
+
+        socket = SyntheticSocket(self.application, path, user, count)
+        if not await socket.connect():
+            self.stats.refused[scenario] += 1
+            await socket.close()
+            return None
+        self.stats.connections[scenario] += 1
+        return socket
+
+    async def send(self, scenario: str, socket: SyntheticSocket, message: dict) -> None:
+        self.stats.sent[scenario] += 1
+        await socket.send(json.dumps(message))
+
+    async def pace(self) -> None:
+        await asyncio.sleep(random.expovariate(self.rate))
+
+    async def pong_pair(self, left: User, right: User) -> None:
+        """Play Pong matches back to back, timing each input until a frame acknowledges it."""
+        while self.running:
+            match = await create_match(left, right, MatchType.PONG)
+            finished = asyncio.Event()
+            players = [PongPlayer(self, "left_paddle", finished), PongPlayer(self, "right_paddle", finished)]
+            # The left player reads binary deltas, the right one JSON frames.
+            paths = [
+                f"/ws/game/{match.id}/?protocol=binary&ticket={issue_ticket(match, left)}",
+                f"/ws/game/{match.id}/?ticket={issue_ticket(match, right)}",
+            ]
+            sockets = [
+                await self.open("pong", path, user, player.on_message)
+                for path, user, player in zip(paths, (left, right), players, strict=True)
+            ]
+            if all(sockets):
+                await asyncio.gather(*(player.play(socket) for player, socket in zip(players, sockets, strict=True)))
+                self.stats.games["pong"] += finished.is_set()
+            for socket in sockets:
+                if socket is not None:
+                    await socket.close()
+
+    async def tictactoe_pair(self, first: User, second: User) -> None:
+        """Play TicTacToe matches back to back, timing each click until its symbol is placed."""
+        while self.running:
+            match = await create_match(first, second, MatchType.TICTACTOE)
+            finished = asyncio.Event()
+            players = [TicTacToePlayer(self, "X", finished), TicTacToePlayer(self, "O", finished)]
+            sockets = []
+            for user, player in zip((first, second), players, strict=True):
+                path = f"/ws/tictactoe/{match.id}/?ticket={issue_ticket(match, user)}"
+                socket = await self.open("tictactoe", path, user, player.on_message)
+                sockets.append(socket)
+            if all(sockets):
+                await asyncio.gather(*(player.play(socket) for player, socket in zip(players, sockets, strict=True)))
+                self.stats.games["tictactoe"] += finished.is_set()
+            for socket in sockets:
+                if socket is not None:
+                    await socket.close()
+
+    async def chat_member(self, user: User, chat_id: str) -> None:
+        """Post chat messages, timing each one until it comes back from the room."""
+        pending: dict[str, float] = {}
+        name = str(user.id)
+
+        def on_message(text: str | None, _: bytes | None) -> None:
+            content = json.loads(text)["message"]["content"]
+            sent_at = pending.pop(content, None)
+            if sent_at is not None:
+                self.stats.latency("chat", time.perf_counter() - sent_at)
+
+        socket = await self.open("chat", f"/ws/chat/{chat_id}/", user, on_message)
+        if socket is None:
+            return
+        sequence = 0
+        while self.running:
+            await self.pace()
+            sequence += 1
+            content = f"{name}:{sequence}"
+            pending[content] = time.perf_counter()
+            await self.send("chat", socket, {"type": "message", "message": content})
+        await socket.close()
+
+    async def lobby_member(self, user: User, tournament_id: str) -> None:
+        """Reload a tournament lobby over and over, timing each join until the player list arrives."""
+        while self.running:
+            joined = asyncio.Event()
+            start = time.perf_counter()
+
+            def on_message(text: str | None, _: bytes | None, joined: asyncio.Event = joined) -> None:
+                if not joined.is_set() and json.loads(text).get("action") == "players_status_update":
+                    joined.set()
+
+            socket = await self.open("tournament", f"/ws/tournament/{tournament_id}/", user, on_message)
+            if socket is None:
+                return
+            try:
+                await asyncio.wait_for(joined.wait(), CONNECT_TIMEOUT)
+                self.stats.latency("tournament", time.perf_counter() - start)
+            except TimeoutError:
+                self.stats.refused["tournament"] += 1
+            await asyncio.sleep(random.expovariate(self.rate / 10))
+            await socket.close()
+
+
+class PongPlayer:
+    def __init__(self, test: LoadTest, paddle: str, finished: asyncio.Event) -> None:
+        self.test = test
+        self.paddle = paddle
+        self.finished = finished
+        self.keyframe: dict | None = None
+        self.pending: dict[int, float] = {}
+        self.sequence = 0
+
+    def on_message(self, text: str | None, data: bytes | None) -> None:
+        if text is not None:
+            message = json.loads(text)
+            self.keyframe = message["game"]
+            events = message["events"]
+        elif self.keyframe is not None:
+            events = apply_delta(self.keyframe, data)
+        else:
+            return
+
+        acknowledged = self.keyframe["acks"][self.paddle]
+        now = time.perf_counter()
+        for sequence in [sequence for sequence in self.pending if sequence <= acknowledged]:
+            self.test.stats.latency("pong", now - self.pending.pop(sequence))
+        if any(event["type"] == "game_over" for event in events):
+            self.finished.set()
+
+    async def play(self, socket: SyntheticSocket) -> None:
+        while self.test.running and not self.finished.is_set() and not socket.closed:
+            await self.test.pace()
+            self.sequence += 1
+            self.pending[self.sequence] = time.perf_counter()
+            direction = random.choice(("up", "down"))  # noqa: S311
+            event = random.choice(("keydown", "keyup"))  # noqa: S311
+            await self.test.send("pong", socket, {"type": direction, "event": event, "seq": self.sequence})
+
+
+class TicTacToePlayer:
+    def __init__(self, test: LoadTest, symbol: str, finished: asyncio.Event) -> None:
+        self.test = test
+        self.symbol = symbol
+        self.finished = finished
+        self.game: dict | None = None
+        self.block_index: int | None = None
+        self.turn = asyncio.Event()
+        self.click: tuple[int, float] | None = None
+
+    def on_message(self, text: str | None, _: bytes | None) -> None:
+        message = json.loads(text)
+        if "game" in message:
+            self.game = message["game"]
+            self.block_index = self.game["block_index"]
+        for event in message["events"]:
+            if event["type"] != "move":
+                continue
+            self.game["board"][event["position"]] = event["symbol"]
+            if event["number"] > self.game["moves"]:
+                self.game["moves"] = event["number"]
+                self.game["turn"] = event["turn"]
+                if event["block_index"] is not None:
+                    self.block_index = event["block_index"]
+            if self.click is not None and event["position"] == self.click[0]:
+                self.test.stats.latency("tictactoe", time.perf_counter() - self.click[1])
+                self.click = None
+            if event["result"] is not None:
+                self.game["winner"] = event["symbol"]
+                self.finished.set()
+        if self.game is not None and self.game["turn"] == self.symbol:
+            self.turn.set()
+
+    async def play(self, socket: SyntheticSocket) -> None:
+        while self.test.running and not self.finished.is_set() and not socket.closed:
+            try:
+                await asyncio.wait_for(self.turn.wait(), CLICK_RETRY)
+            except TimeoutError:
+                # The server ignores a click on a cell that got blocked meanwhile: play again.
+                if self.game is not None and self.game["turn"] == self.symbol:
+                    self.turn.set()
+                continue
+            await self.test.pace()
+            board = self.game["board"]
+            cells = [index for index, cell in enumerate(board) if not cell and index != self.block_index]
+            if not cells or self.game["turn"] != self.symbol or self.game["winner"]:
+                self.turn.clear()
+                if not cells:
+                    # A full board without a line never finishes; start a new match.
+                    self.finished.set()
+                continue
+            position = random.choice(cells)  # noqa: S311
+            self.click = (position, time.perf_counter())
+            self.turn.clear()
+            await self.test.send("tictactoe", socket, {"action": "click", "position": position})
+
+
+@database_sync_to_async
+def create_match(user1: User, user2: User, match_type: MatchType) -> Match:
+    return Match.objects.create(user1=user1, user2=user2, match_type=match_type)
+
+
+def percentiles(samples: list[float]) -> str:
+    if len(samples) < 2:  # noqa: PLR2004
+        return "-"
+    quantiles = statistics.quantiles(samples, n=100)
+    return f"p50 {quantiles[49] * 1000:.1f} ms, p95 {quantiles[94] * 1000:.1f} ms, p99 {quantiles[98] * 1000:.1f} ms"
@@ -0,0 +1,95 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from apps.matchmaking.pong_ai import AIDifficulty
+from apps.matchmaking.tictactoe_ai import TicTacToeAIConfig, search_move
+from apps.matchmaking.tictactoe_book import SYMMETRIES, canonical, pack, transform, write_book
+from apps.matchmaking.tictactoe_engine import CELLS, FULL_BOARD, iter_cells, winning_line
+
+# x, o and block of a position, in the canonical orientation.
+Position = tuple[int, int, int]
+
+
+def opening_positions(depth: int) -> list[Position]:
+    """List every position after at most ``depth`` moves with no winner yet, up to the symmetries of the board."""
+    level = {(0, 0, 0)}
+    positions = list(level)
+    for _ in range(depth):
+        following = set()
+        for x, o, block in level:
+            to_move_x = x.bit_count() == o.bit_count()
+            for cell in iter_cells(FULL_BOARD & ~(x | o | block)):
+                stones = (x if to_move_x else o) | 1 << cell
+                if winning_line(stones, cell) is not None:
+                    continue
+                next_x, next_o = (stones, o) if to_move_x else (x, stones)
+                # The block moves to any empty cell but the one it leaves.
+                for next_block in iter_cells(FULL_BOARD & ~(next_x | next_o | block)):
+                    following.add(canonical_position(next_x, next_o, 1 << next_block))
+        level = following
+        positions.extend(level)
+    return positions
+
+
+def canonical_position(x: int, o: int, block: int) -> Position:
+    _, index = canonical(x, o, block)
+    symmetry = SYMMETRIES[index]
+    return transform(x, symmetry), transform(o, symmetry), transform(block, symmetry)
+
+
+def solve(position: Position, time_budget: float) -> int | None:
+    x, o, block = position
+    return search_move(x, o, block, CELLS, time.perf_counter() + time_budget)
+
+
+class Command(BaseCommand):
+    help = "Solve the TicTacToe opening positions and write them to the memory-mapped opening book of the AI."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--depth",
+            type=int,
+            default=1,
+            help="Moves played in the deepest positions of the book. Each extra move multiplies them by about 250.",
+        )
+        parser.add_argument(
+            "--time-budget",
+            type=float,
+            default=TicTacToeAIConfig.get_config(AIDifficulty.HARD.value).time_budget,
+            help="Seconds searched per position; the book is no weaker than the hardest AI by default.",
+        )
+        # The AI always plays O.
+        parser.add_argument("--symbol", choices=["X", "O"], default="O", help="Side to move in the solved positions.")
+        parser.add_argument("--workers", type=int, default=None, help="Solving processes; one per CPU when omitted.")
+        parser.add_argument("--output", default=settings.TICTACTOE_OPENING_BOOK, help="Path of the book.")
+
+    def handle(self, *args: object, **options: object) -> None:
+        path = Path(options["output"])
+        start = time.perf_counter()
+        # X moves first, so it is to move whenever both have as many stones.
+        to_move_x = options["symbol"] == "X"
+        positions = [
+            (x, o, block)
+            for x, o, block in opening_positions(options["depth"])
+            if (x.bit_count() == o.bit_count()) == to_move_x
+        ]
+        self.stdout.write(f"Solving {len(positions)} positions up to {options['depth']} moves")
+
+        time_budgets = [options["time_budget"]] * len(positions)
+        with ProcessPoolExecutor(options["workers"]) as executor:
+            solved = executor.map(solve, positions, time_budgets)
+            moves = {
+                pack(*position): move for position, move in zip(positions, solved, strict=True) if move is not None
+            }
+
+        write_book(path, moves, options["depth"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {len(moves)} positions to {path} ({path.stat().st_size} bytes) "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+        )
@@ -0,0 +1,110 @@
+import asyncio
+import statistics
+import uuid
+from itertools import islice
+
+from channels.routing import URLRouter
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from apps.chat.models import Chat, ChatParticipants
+from apps.matchmaking.game_consumer import PongConsumer
+from apps.matchmaking.loadtest import LoadTest, percentiles
+from apps.matchmaking.models import Tournament, TournamentPlayer
+from apps.users.models import User
+from setup.routing import websocket_urlpatterns
+
+SCENARIOS = ("pong", "tictactoe", "chat", "tournament")
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive synthetic WebSocket clients through every consumer in-process and report throughput, "
+        "latency and event loop lag. Run with DJANGO_SETTINGS_MODULE=setup.settings_loadtest."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--pong", type=int, default=100, help="Pong player pairs.")
+        parser.add_argument("--tictactoe", type=int, default=100, help="TicTacToe player pairs.")
+        parser.add_argument("--chat", type=int, default=100, help="Two-member chat rooms.")
+        parser.add_argument("--tournaments", type=int, default=10, help="Tournament lobbies.")
+        parser.add_argument("--lobby-size", type=int, default=8, help="Members of each tournament lobby.")
+        parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load after the ramp.")
+        parser.add_argument("--ramp", type=float, default=5.0, help="Seconds over which clients connect.")
+        parser.add_argument("--rate", type=float, default=5.0, help="Messages per second of each client.")
+
+    def handle(self, *args: object, **options: object) -> None:
+        if not getattr(settings, "LOADTEST", False):
+            msg = "loadtest creates thousands of users: run it with DJANGO_SETTINGS_MODULE=setup.settings_loadtest"
+            raise CommandError(msg)
+
+        settings.LOADTEST_DIR.mkdir(parents=True, exist_ok=True)
+        call_command("migrate", verbosity=0, interactive=False)
+
+        test = LoadTest(URLRouter(websocket_urlpatterns), options["duration"], options["ramp"], options["rate"])
+        scenarios = self.create_scenarios(test, options)
+        self.stdout.write(f"{len(scenarios)} clients, {options['ramp']:g} s ramp, {options['duration']:g} s load")
+        asyncio.run(test.run(scenarios))
+        self.report(test, options["ramp"] + options["duration"])
+
+    def create_scenarios(self, test: LoadTest, options: dict) -> list:
+        run = uuid.uuid4().hex[:8]
+        pairs = options["pong"] + options["tictactoe"] + options["chat"]
+        users = iter(
+            User.objects.bulk_create(
+                User(username=f"load-{run}-{index}", email=f"load-{run}-{index}@loadtest.local")
+                for index in range(2 * pairs + options["tournaments"] * options["lobby_size"])
+            )
+        )
+
+        scenarios = []
+        for _ in range(options["pong"]):
+            left, right = islice(users, 2)
+            scenarios.append(lambda left=left, right=right: test.pong_pair(left, right))
+        for _ in range(options["tictactoe"]):
+            first, second = islice(users, 2)
+            scenarios.append(lambda first=first, second=second: test.tictactoe_pair(first, second))
+
+        chats = Chat.objects.bulk_create(Chat() for _ in range(options["chat"]))
+        for chat in chats:
+            members = list(islice(users, 2))
+            ChatParticipants.objects.bulk_create(ChatParticipants(chat=chat, user=user) for user in members)
+            scenarios.extend(lambda user=user, chat=chat: test.chat_member(user, str(chat.id)) for user in members)
+
+        for index in range(options["tournaments"]):
+            members = list(islice(users, options["lobby_size"]))
+            tournament = Tournament.objects.create(name=f"load-{run}-{index}", created_by=members[0])
+            tournament.players.add(
+                *TournamentPlayer.objects.bulk_create(
+                    TournamentPlayer(player=user, display_name=user.username) for user in members
+                )
+            )
+            scenarios.extend(
+                lambda user=user, tournament=tournament: test.lobby_member(user, str(tournament.id)) for user in members
+            )
+        return scenarios
+
+    def report(self, test: LoadTest, elapsed: float) -> None:
+        stats = test.stats
+        for scenario in SCENARIOS:
+            if not stats.connections[scenario] and not stats.refused[scenario]:
+                continue
+            self.stdout.write(
+                f"{scenario}: {stats.connections[scenario]} connections ({stats.refused[scenario]} refused), "
+                f"sent {stats.sent[scenario] / elapsed:.0f} msg/s, received {stats.received[scenario] / elapsed:.0f} "
+                f"msg/s, {stats.games[scenario]} games finished"
+            )
+            self.stdout.write(f"  latency: {percentiles(stats.latencies.get(scenario, []))}")
+
+        total = sum(stats.received.values()) + sum(stats.sent.values())
+        self.stdout.write(f"throughput: {total / elapsed:.0f} msg/s")
+        self.stdout.write(f"event loop lag: {percentiles(stats.loop_lag)}, max {max(stats.loop_lag) * 1000:.1f} ms")
+
+        ticks = PongConsumer.scheduler.stats
+        if ticks.ticks:
+            self.stdout.write(
+                f"pong ticks: {ticks.ticks} ({ticks.skipped_ticks} skipped), "
+                f"max tick {ticks.max_tick_duration * 1000:.1f} ms, max lag {ticks.max_lag * 1000:.1f} ms, "
+                f"mean loop lag {statistics.mean(stats.loop_lag) * 1000:.2f} ms"
+            )
@@ -0,0 +1,76 @@
+import gc
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import fields, is_dataclass
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from apps.matchmaking.game_consumer import GameState, new_game
+from apps.matchmaking.tictactoe_consumer import GameObject
+
+
+def pong_match() -> GameState:
+    game = new_game()
+    game.players = {"player_one": "specific.channel!one", "player_two": "specific.channel!two"}
+    return game
+
+
+def tictactoe_match() -> GameObject:
+    game = GameObject()
+    game.players.player_x.username = "player_one"
+    game.players.player_o.username = "player_two"
+    return game
+
+
+# Plain stand-in classes of the slotted ones, by slotted class.
+legacy_classes: dict[type, type] = {}
+
+
+def legacy_layout(value: object) -> object:
+    """Copy ``value`` into plain classes holding their fields in an instance ``__dict__``, as before slots."""
+    if is_dataclass(value) and not isinstance(value, type):
+        cls = type(value)
+        if cls not in legacy_classes:
+            legacy_classes[cls] = type(f"Legacy{cls.__name__}", (), {})
+        legacy = legacy_classes[cls]()
+        for item in fields(value):
+            setattr(legacy, item.name, legacy_layout(getattr(value, item.name)))
+        return legacy
+    if isinstance(value, dict):
+        return {key: legacy_layout(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [legacy_layout(item) for item in value]
+    return value
+
+
+def bytes_per_match(factory: Callable[[], object], count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        matches = {f"match_{index}": factory() for index in range(count)}
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del matches
+    return (after - before) / count
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the memory held per live Pong and TicTacToe match, including its registry entry, "
+        "next to the same matches laid out in per-instance __dict__s."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--matches", type=int, default=10_000, help="Number of matches kept alive at once.")
+
+    def handle(self, *args: object, **options: object) -> None:
+        count = options["matches"]
+        for name, factory in (("pong", pong_match), ("tictactoe", tictactoe_match)):
+            slotted = bytes_per_match(factory, count)
+            legacy = bytes_per_match(lambda factory=factory: legacy_layout(factory()), count)
+            self.stdout.write(
+                f"{name}: {slotted:.0f} bytes per match with slots, {legacy:.0f} with __dict__ "
+                f"({1 - slotted / legacy:.0%} less, {count} matches)"
+            )
@@ -0,0 +1,72 @@
+import statistics
+import time
+import tracemalloc
+from itertools import cycle
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from apps.matchmaking.pong_ai import AIConfig, AIDifficulty, AIPlayer
+from apps.matchmaking.pong_engine import GameState, simulate
+from apps.matchmaking.pong_physics import BASE_TICK_RATE
+
+
+def ai_match(difficulty: str) -> GameState:
+    game = GameState()
+    config = AIConfig.get_config(difficulty)
+    game.ai_players = [AIPlayer("left_paddle", config), AIPlayer("right_paddle", config)]
+    game.running = True
+    return game
+
+
+class Command(BaseCommand):
+    help = "Run AI vs AI Pong matches through the headless engine and report the cost of a tick."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--matches", type=int, default=1000, help="Number of simultaneous matches.")
+        parser.add_argument("--ticks", type=int, default=300, help="Number of ticks to simulate.")
+        parser.add_argument("--rate", type=float, default=BASE_TICK_RATE, help="Simulation rate in Hz.")
+        parser.add_argument(
+            "--difficulty",
+            choices=[difficulty.value for difficulty in AIDifficulty],
+            help="AI difficulty of every match; cycles through all of them when omitted.",
+        )
+        parser.add_argument(
+            "--trace-ticks", type=int, default=50, help="Extra ticks run under tracemalloc to count allocations."
+        )
+
+    def handle(self, *args: object, **options: object) -> None:
+        difficulties = cycle([options["difficulty"]] if options["difficulty"] else [d.value for d in AIDifficulty])
+        games = [ai_match(next(difficulties)) for _ in range(options["matches"])]
+        rate = options["rate"]
+        dt = BASE_TICK_RATE / rate
+
+        def step() -> None:
+            simulate(games, dt)
+            for index, game in enumerate(games):
+                if not game.running:
+                    games[index] = ai_match(next(difficulties))
+
+        durations = []
+        for _ in range(options["ticks"]):
+            start = time.perf_counter()
+            step()
+            durations.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        peaks = []
+        for _ in range(options["trace_ticks"]):
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            step()
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        tracemalloc.stop()
+
+        total = sum(durations)
+        quantiles = statistics.quantiles(durations, n=100)
+        self.stdout.write(f"matches: {len(games)}, ticks: {len(durations)}, simulation rate: {rate:g} Hz")
+        self.stdout.write(f"ticks/sec: {len(durations) / total:.1f}")
+        self.stdout.write(f"match ticks/sec: {len(durations) * len(games) / total:.0f}")
+        self.stdout.write(f"tick cost p50: {quantiles[49] * 1000:.3f} ms, p99: {quantiles[98] * 1000:.3f} ms")
+        self.stdout.write(f"worker load at {rate:g} Hz: {total / len(durations) * rate:.1%}")
+        if peaks:
+            self.stdout.write(f"allocated per tick (peak): {statistics.mean(peaks) / 1024:.1f} KiB")
@@ -0,0 +1,24 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+
+class Command(BaseCommand):
+    help = (
+        "Override the broadcast rate of a live Pong match, e.g. for players on a slow link. "
+        "The rate stays bounded by the heartbeat and simulation rates."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("match_id", help="Id of the live match.")
+        parser.add_argument("rate", type=float, help="Frames per second sent while the state changes.")
+
+    def handle(self, *args: object, **options: object) -> None:
+        if options["rate"] <= 0:
+            msg = "The rate must be positive."
+            raise CommandError(msg)
+        # Whichever worker runs the match is in its group, so the override reaches it on any shard.
+        async_to_sync(get_channel_layer().group_send)(
+            f"match_{options['match_id']}", {"type": "set_broadcast_rate", "rate": options["rate"]}
+        )
+        self.stdout.write(f"Broadcast rate of match {options['match_id']} set to {options['rate']:g} Hz")
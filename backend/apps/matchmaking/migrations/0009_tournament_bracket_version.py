@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matchmaking', '0008_match_match_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='bracket_version',
+            field=models.PositiveIntegerField(default=0, verbose_name='Versão da chave'),
+        ),
+    ]
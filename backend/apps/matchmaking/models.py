@@ -1,8 +1,11 @@
+import json
 import random
 import uuid
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models
-from django.db.models import Q
+from django.db.models import F, Prefetch, Q
 from django.urls import reverse
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
@@ -80,6 +83,8 @@ class Tournament(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Criado em"))
     started_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Iniciado em"))
     finished_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Finalizado em"))
+    # Bumped whenever the bracket changes, which invalidates its cached JSON.
+    bracket_version = models.PositiveIntegerField(default=0, verbose_name=_("Versão da chave"))
 
     class Meta:
         verbose_name = _("Torneio")
@@ -111,6 +116,7 @@ class Tournament(models.Model):
                 self.winner = winners[0]
             self.finished_at = now()
             self.save(update_fields=["winner", "finished_at"])
+            self.bump_bracket_version()
             return
 
         random.shuffle(winners)
@@ -133,6 +139,9 @@ class Tournament(models.Model):
 
         if matches:
             self.matches.add(*matches)
+        self.bump_bracket_version()
+
+        if matches:
             for match in matches:
                 RedirectMessage(
                     url=f"{reverse('match_game', args=[match.id])}?next={reverse('tournament_room', args=[self.id])}",
@@ -164,48 +173,73 @@ class Tournament(models.Model):
                     },
                 ).send_to_group(match.user2.id)
 
-    def get_rounds_data(self) -> list[dict]:
-        rounds_data = []
-        max_round = max(
-            self.matches.aggregate(models.Max("round_number"))["round_number__max"] or 0,
-            self.byes.aggregate(models.Max("round_number"))["round_number__max"] or 0,
-        )
+    def bump_bracket_version(self) -> None:
+        Tournament.objects.filter(id=self.id).update(bracket_version=F("bracket_version") + 1)
+        self.refresh_from_db(fields=["bracket_version"])
 
-        for round_num in range(1, max_round + 1):
-            round_matches = self.matches.filter(round_number=round_num)
-            round_byes = self.byes.filter(round_number=round_num)
+    def get_rounds_data(self) -> list[dict]:
+        return json.loads(self.get_bracket_json())
+
+    def get_bracket_json(self) -> str:
+        """Return the bracket serialized as JSON, built once per ``bracket_version`` and shared through the cache."""
+        key = f"tournament_bracket:{self.id}:{self.bracket_version}"
+        bracket = cache.get(key)
+        if bracket is None:
+            bracket = json.dumps(self.build_rounds_data())
+            cache.set(key, bracket, settings.TOURNAMENT_BRACKET_CACHE_TTL)
+        return bracket
+
+    def build_rounds_data(self) -> list[dict]:
+        """Assemble the bracket in memory from one prefetching query set, whatever the size of the tournament."""
+        tournament = Tournament.objects.prefetch_related(
+            Prefetch(
+                "matches",
+                queryset=Match.objects.select_related("user1", "user2", "winner").order_by("started_date_played"),
+            ),
+            Prefetch("byes", queryset=TournamentBye.objects.select_related("player__player").order_by("created_at")),
+            "players",
+        ).get(id=self.id)
+        display_names = {player.player_id: player.display_name for player in tournament.players.all()}
+
+        matches = list(tournament.matches.all())
+        byes = list(tournament.byes.all())
+        max_round = max((item.round_number for item in (*matches, *byes)), default=0)
+        rounds = [
+            {
+                "round_number": round_number,
+                "matches": [],
+                "byes": [],
+                "is_current": round_number == tournament.current_round_number,
+                "is_finished": tournament.finished_at is not None,
+            }
+            for round_number in range(1, max_round + 1)
+        ]
+
+        for match in matches:
+            rounds[match.round_number - 1]["matches"].append(
+                {
+                    "id": str(match.id),
+                    "player1": {
+                        "display_name": display_names.get(match.user1_id, match.user1.username),
+                        "username": match.user1.username,
+                        "score": match.score_user1,
+                    },
+                    "player2": {
+                        "display_name": display_names.get(match.user2_id, match.user2.username),
+                        "username": match.user2.username,
+                        "score": match.score_user2,
+                    },
+                    "winner": match.winner.username if match.winner else None,
+                    "is_finished": match.winner is not None,
+                }
+            )
 
-            rounds_data.append(
+        for bye in byes:
+            rounds[bye.round_number - 1]["byes"].append(
                 {
-                    "round_number": round_num,
-                    "matches": [
-                        {
-                            "id": str(match.id),
-                            "player1": {
-                                "display_name": self.players.get(player__id=match.user1.id).display_name,
-                                "username": match.user1.username,
-                                "score": match.score_user1,
-                            },
-                            "player2": {
-                                "display_name": self.players.get(player__id=match.user2.id).display_name,
-                                "username": match.user2.username,
-                                "score": match.score_user2,
-                            },
-                            "winner": match.winner.username if match.winner else None,
-                            "is_finished": match.winner is not None,
-                        }
-                        for match in round_matches
-                    ],
-                    "byes": [
-                        {
-                            "display_name": bye.player.display_name,
-                            "username": bye.player.player.username,
-                        }
-                        for bye in round_byes
-                    ],
-                    "is_current": round_num == self.current_round_number,
-                    "is_finished": self.finished_at is not None,
+                    "display_name": bye.player.display_name,
+                    "username": bye.player.player.username,
                 }
             )
 
-        return rounds_data
+        return rounds
@@ -0,0 +1,155 @@
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from apps.matchmaking.pong_physics import (
+    BALL_SIZE,
+    GRID_HEIGHT,
+    GRID_WIDTH,
+    PADDLE_HEIGHT,
+    PADDLE_SPEED,
+    WALL_BOTTOM,
+    WALL_TOP,
+    Ball,
+    Paddle,
+)
+
+if TYPE_CHECKING:
+    from apps.matchmaking.pong_engine import GameState
+
+PLAYFIELD_HEIGHT = WALL_BOTTOM - WALL_TOP
+
+
+class AIDifficulty(Enum):
+    EASY = "easy"
+    MEDIUM = "medium"
+    HARD = "hard"
+
+
+@dataclass(slots=True, frozen=True)
+class AIConfig:
+    prediction_interval: float
+    max_bounces: int
+    reaction_delay: float
+    speed_multiplier: float
+    return_to_center: bool
+
+    @classmethod
+    def get_config(cls, difficulty: str) -> "AIConfig":
+        return AI_CONFIGS.get(difficulty, AI_CONFIGS[AIDifficulty.MEDIUM.value])
+
+
+# Configs are immutable, so every single-player match shares one instance per difficulty.
+AI_CONFIGS = {
+    AIDifficulty.EASY.value: AIConfig(
+        prediction_interval=2.0,
+        max_bounces=1,
+        reaction_delay=0.3,
+        speed_multiplier=0.7,
+        return_to_center=False,
+    ),
+    AIDifficulty.MEDIUM.value: AIConfig(
+        prediction_interval=1.5,
+        max_bounces=2,
+        reaction_delay=0.1,
+        speed_multiplier=1.0,
+        return_to_center=True,
+    ),
+    AIDifficulty.HARD.value: AIConfig(
+        prediction_interval=1.0,
+        max_bounces=4,
+        reaction_delay=0.0,
+        speed_multiplier=1.2,
+        return_to_center=True,
+    ),
+}
+
+
+@dataclass(slots=True)
+class AIPlayer:
+    """AI steering one paddle.
+
+    ``target_y`` is a cached prediction keyed by the ball's horizontal velocity
+    in ``last_ball_direction``: it is only recomputed once a paddle hit flips
+    that velocity or a scored point invalidates it, and at most once every
+    ``prediction_interval`` seconds of simulation time.
+    """
+
+    paddle: str
+    config: AIConfig
+    target_y: float | None = None
+    last_ball_direction: float | None = None
+    last_prediction_time: float = -math.inf
+    last_move_time: float = -math.inf
+
+    def invalidate(self) -> None:
+        self.last_ball_direction = None
+
+
+def update_ai_players(games: Sequence["GameState"]) -> None:
+    """Steer every AI paddle of ``games`` in one pass, each at the simulation time of its game."""
+    for game in games:
+        for ai in game.ai_players:
+            update_ai_paddle(game.ball, game.paddles[ai.paddle], ai, game.time)
+
+
+def intercept_y(y: float, max_bounces: int) -> float:
+    """Fold a straight-line ``y`` back into the playfield, reflecting at most ``max_bounces + 1`` times.
+
+    The wall bounces of the ball form a triangle wave of period twice the
+    playfield height, so the folded position is read off ``y`` modulo that
+    period instead of reflecting step by step.
+    """
+    offset = y - WALL_TOP
+    if offset > PLAYFIELD_HEIGHT:
+        bounces = math.ceil(offset / PLAYFIELD_HEIGHT) - 1
+    elif offset < 0:
+        bounces = math.ceil(-offset / PLAYFIELD_HEIGHT)
+    else:
+        return y
+
+    limit = max_bounces + 1
+    if bounces <= limit:
+        phase = offset % (2 * PLAYFIELD_HEIGHT)
+        return WALL_TOP + (phase if phase <= PLAYFIELD_HEIGHT else 2 * PLAYFIELD_HEIGHT - phase)
+
+    # The AI gives up after ``limit`` reflections, leaving its guess outside the playfield.
+    if offset > 0:
+        folded = offset - limit * PLAYFIELD_HEIGHT if limit % 2 == 0 else (limit + 1) * PLAYFIELD_HEIGHT - offset
+    else:
+        folded = offset + limit * PLAYFIELD_HEIGHT if limit % 2 == 0 else -offset - (limit - 1) * PLAYFIELD_HEIGHT
+    return WALL_TOP + folded
+
+
+def paddle_face(paddle: Paddle, side: str) -> float:
+    return paddle.x if side == "right_paddle" else paddle.x + paddle.width
+
+
+def update_ai_paddle(ball: Ball, paddle: Paddle, ai: AIPlayer, now: float) -> None:
+    if ball.vx == 0 or ball.vy == 0 or ball.x < 0 or ball.x > GRID_WIDTH - BALL_SIZE or ball.resseting:
+        paddle.vy = 0
+        return
+
+    if now - ai.last_prediction_time >= ai.config.prediction_interval:
+        ai.last_prediction_time = now
+        if ai.last_ball_direction != ball.vx:
+            ai.last_ball_direction = ball.vx
+            moving_away = (ball.vx < 0) == (ai.paddle == "right_paddle")
+            if moving_away and ai.config.return_to_center:
+                ai.target_y = GRID_HEIGHT / 2
+            else:
+                time_to_reach = (paddle_face(paddle, ai.paddle) - ball.x) / ball.vx
+                ai.target_y = intercept_y(ball.y + ball.vy * time_to_reach, ai.config.max_bounces)
+
+    if ai.target_y is None or now - ai.last_move_time < ai.config.reaction_delay:
+        return
+    ai.last_move_time = now
+
+    speed = PADDLE_SPEED * ai.config.speed_multiplier
+    paddle_center = paddle.y + PADDLE_HEIGHT / 2
+    if abs(paddle_center - ai.target_y) < speed:
+        paddle.vy = 0
+    else:
+        paddle.vy = speed if paddle_center < ai.target_y else -speed
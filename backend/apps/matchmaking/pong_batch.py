@@ -0,0 +1,174 @@
+from collections.abc import Sequence
+from itertools import chain
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from apps.matchmaking.pong_physics import (
+    BALL_SIZE,
+    BALL_SPEED,
+    GRID_WIDTH,
+    INITIAL_SPEED_HITS,
+    MAX_COLLISIONS_PER_STEP,
+    MAX_SPEED_MULTIPLIER,
+    MEDIUM_SPEED_HITS,
+    PADDLE_HEIGHT,
+    PADDLE_MAX_Y,
+    PADDLE_MIN_Y,
+    PADDLE_WIDTH,
+    PADDLE_X_OFFSET,
+    WALL_BOTTOM,
+    WALL_TOP,
+    move_paddles,
+    release_ball,
+    step_ball,
+)
+
+if TYPE_CHECKING:
+    from apps.matchmaking.pong_engine import GameState
+
+# Below this many matches the per-object step is cheaper than packing arrays.
+BATCH_THRESHOLD = 64
+
+LEFT_FACE = PADDLE_X_OFFSET + PADDLE_WIDTH
+RIGHT_FACE = GRID_WIDTH - PADDLE_X_OFFSET - PADDLE_WIDTH - BALL_SIZE
+
+
+def step_games(games: Sequence["GameState"], dt: float) -> None:
+    """Advance paddles and balls of every game by one step, appending to ``game.events``."""
+    if len(games) < BATCH_THRESHOLD:
+        for game in games:
+            move_paddles(game.paddles, dt)
+            if not release_ball(game.ball, game.time):
+                step_ball(game.ball, game.paddles, game.events, dt)
+        return
+
+    active = np.fromiter((not release_ball(game.ball, game.time) for game in games), bool, len(games))
+    BatchStep(games).run(active, dt)
+
+
+class BatchStep:
+    """Structure-of-arrays step of many matches at once.
+
+    Positions and velocities of every ball and paddle are gathered into NumPy
+    arrays and the swept collision loop of ``pong_physics.step_ball`` runs as a
+    handful of array operations per collision round instead of per match. The
+    results are scattered back to the game objects and their event lists.
+    """
+
+    def __init__(self, games: Sequence["GameState"]) -> None:
+        self.games = games
+        fields = chain.from_iterable(
+            (
+                game.ball.x,
+                game.ball.y,
+                game.ball.vx,
+                game.ball.vy,
+                game.ball.speed_multiplier,
+                game.ball.hits,
+                game.paddles["left_paddle"].y,
+                game.paddles["left_paddle"].vy,
+                game.paddles["right_paddle"].y,
+                game.paddles["right_paddle"].vy,
+            )
+            for game in games
+        )
+        columns = np.fromiter(fields, float, len(games) * 10).reshape(len(games), 10).T
+        (
+            self.x,
+            self.y,
+            self.vx,
+            self.vy,
+            self.speed,
+            hits,
+            self.left_y,
+            self.left_vy,
+            self.right_y,
+            self.right_vy,
+        ) = columns.copy()
+        self.hits = hits.astype(int)
+
+    def run(self, active: np.ndarray, dt: float) -> None:
+        self.left_y = np.clip(self.left_y + self.left_vy * dt, PADDLE_MIN_Y, PADDLE_MAX_Y)
+        self.right_y = np.clip(self.right_y + self.right_vy * dt, PADDLE_MIN_Y, PADDLE_MAX_Y)
+
+        remaining = np.where(active, dt, 0.0)
+        for _ in range(MAX_COLLISIONS_PER_STEP):
+            if not self.collide(active, remaining):
+                break
+
+        self.x += self.vx * remaining
+        self.y += self.vy * remaining
+        self.scatter(active)
+
+    def collide(self, active: np.ndarray, remaining: np.ndarray) -> bool:
+        x, y, vx, vy = self.x, self.y, self.vx, self.vy
+        with np.errstate(divide="ignore", invalid="ignore"):
+            wall_time = np.where(vy < 0, (WALL_TOP - y) / vy, np.where(vy > 0, (WALL_BOTTOM - y) / vy, np.inf))
+            wall_time = np.maximum(wall_time, 0.0)
+
+            going_left = vx < 0
+            face = np.where(going_left, LEFT_FACE, RIGHT_FACE)
+            reachable = np.where(going_left, x >= face, x <= face) & (vx != 0)
+            paddle_time = np.where(reachable, (face - x) / vx, np.inf)
+
+        paddle_y = np.where(going_left, self.left_y, self.right_y)
+        y_at_impact = y + vy * np.where(reachable, paddle_time, 0.0)
+        wall_valid = active & (wall_time <= remaining)
+        paddle_valid = (
+            active
+            & reachable
+            & (paddle_time <= remaining)
+            & (paddle_y - BALL_SIZE < y_at_impact)
+            & (y_at_impact < paddle_y + PADDLE_HEIGHT)
+        )
+        paddle_hit = paddle_valid & (~wall_valid | (paddle_time < wall_time))
+        wall_hit = wall_valid & ~paddle_hit
+        if not (paddle_hit.any() or wall_hit.any()):
+            return False
+
+        impact_time = np.where(paddle_hit, paddle_time, np.where(wall_hit, wall_time, 0.0))
+        self.x = x + vx * impact_time
+        self.y = y + vy * impact_time
+        remaining -= impact_time
+
+        impact = (self.y + BALL_SIZE / 2 - (paddle_y + PADDLE_HEIGHT / 2)) / (PADDLE_HEIGHT / 2)
+        increase = np.select(
+            [self.hits < INITIAL_SPEED_HITS, self.hits < MEDIUM_SPEED_HITS, self.speed < MAX_SPEED_MULTIPLIER],
+            [0.15, 0.10, 0.05],
+            0.0,
+        )
+        speed = np.where(paddle_hit, self.speed + increase, self.speed)
+        self.vx = np.where(paddle_hit, -np.copysign(1.0, vx) * BALL_SPEED * speed, vx)
+        self.vy = np.where(paddle_hit, np.copysign(1.0, vy) * impact * BALL_SPEED * speed, np.where(wall_hit, -vy, vy))
+        self.speed = speed
+        self.hits = self.hits + paddle_hit
+
+        for index in np.flatnonzero(wall_hit):
+            self.games[index].events.append({"type": "wall_hit"})
+        for index in np.flatnonzero(paddle_hit):
+            self.games[index].events.append({"type": "paddle_hit"})
+        return True
+
+    def scatter(self, active: np.ndarray) -> None:
+        paddles = zip(self.left_y.tolist(), self.right_y.tolist(), strict=True)
+        for game, (left_y, right_y) in zip(self.games, paddles, strict=True):
+            game.paddles["left_paddle"].y = left_y
+            game.paddles["right_paddle"].y = right_y
+
+        indexes = np.flatnonzero(active)
+        balls = zip(
+            indexes.tolist(),
+            self.x[indexes].tolist(),
+            self.y[indexes].tolist(),
+            self.vx[indexes].tolist(),
+            self.vy[indexes].tolist(),
+            self.speed[indexes].tolist(),
+            self.hits[indexes].tolist(),
+            strict=True,
+        )
+        for index, x, y, vx, vy, speed, hits in balls:
+            ball = self.games[index].ball
+            ball.x, ball.y, ball.vx, ball.vy = x, y, vx, vy
+            ball.speed_multiplier = speed
+            ball.hits = hits
@@ -0,0 +1,182 @@
+import secrets
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+from apps.matchmaking.broadcast import BroadcastRate, SpectatorFeed
+from apps.matchmaking.pong_ai import AIPlayer, update_ai_players
+from apps.matchmaking.pong_batch import step_games
+from apps.matchmaking.pong_physics import (
+    BALL_SIZE,
+    BASE_TICK_RATE,
+    GRID_HEIGHT,
+    GRID_WIDTH,
+    PADDLE_HEIGHT,
+    PADDLE_WIDTH,
+    PADDLE_X_OFFSET,
+    Ball,
+    MatchRandom,
+    Paddle,
+    Score,
+)
+from apps.matchmaking.pong_protocol import Snapshot
+
+WIN_SCORE = 3
+# Inputs a match holds between two ticks. Only the last one of each paddle counts,
+# so dropping the oldest when a client floods the queue loses nothing. A list, not
+# a deque: an empty deque costs more memory than the rest of an idle match.
+INPUT_QUEUE_SIZE = 64
+
+# paddle, input sequence number (None when the client sends none), paddle velocity
+PaddleInput = tuple[str, int | None, float]
+
+
+@dataclass(slots=True)
+class GameState:
+    players: dict[str, str | None] = field(default_factory=dict)
+    paddles: dict[str, Paddle] = field(default_factory=dict)
+    ball: Ball = field(default_factory=Ball)
+    score: Score = field(default_factory=Score)
+    running: bool = False
+    is_single_player: bool = False
+    ai_players: list[AIPlayer] = field(default_factory=list)
+    winner: str | None = None
+    tick: int = 0
+    last_snapshot: Snapshot | None = None
+    input_acks: dict[str, int] = field(default_factory=dict)
+    inputs: list[PaddleInput] = field(default_factory=list)
+    broadcast: BroadcastRate | None = None
+    events: list[dict] = field(default_factory=list)
+    seed: int = 0
+    rng: MatchRandom = field(default_factory=lambda: MatchRandom(0))
+    time: float = 0.0
+    spectators: SpectatorFeed | None = None
+
+    def __init__(self, broadcast: BroadcastRate | None = None, seed: int | None = None) -> None:
+        self.players = {}
+        self.paddles = {
+            "left_paddle": Paddle(x=PADDLE_X_OFFSET, y=GRID_HEIGHT / 2 - PADDLE_HEIGHT / 2),
+            "right_paddle": Paddle(
+                x=GRID_WIDTH - PADDLE_X_OFFSET - PADDLE_WIDTH, y=GRID_HEIGHT / 2 - PADDLE_HEIGHT / 2
+            ),
+        }
+        self.ball = Ball()
+        self.score = Score()
+        self.running = False
+        self.is_single_player = False
+        self.ai_players = []
+        self.winner = None
+        self.tick = 0
+        self.last_snapshot = None
+        self.input_acks = {"left_paddle": 0, "right_paddle": 0}
+        self.inputs = []
+        self.broadcast = broadcast
+        self.events = []
+        # Everything random in a match comes from its seed and the clock is simulated,
+        # so the seed and the inputs are enough to play the match again.
+        self.seed = secrets.randbits(64) if seed is None else seed
+        self.rng = MatchRandom(self.seed)
+        self.time = 0.0
+        self.spectators = None
+
+    def reset_inputs(self, paddle: str) -> None:
+        """Forget the inputs of ``paddle`` for a client that starts numbering them again."""
+        self.input_acks[paddle] = 0
+        self.inputs = [entry for entry in self.inputs if entry[0] != paddle]
+
+    def queue_input(self, paddle: str, seq: int | None, velocity: float) -> None:
+        """Queue an input for the next tick; never blocks nor waits on the tick."""
+        if len(self.inputs) >= INPUT_QUEUE_SIZE:
+            del self.inputs[0]
+        self.inputs.append((paddle, seq, velocity))
+
+    def apply_inputs(self) -> list[tuple[str, float]]:
+        """Apply the inputs queued since the last tick, the last one of each paddle winning.
+
+        Inputs at or below the acknowledged sequence number are replays of a
+        reconnecting client and are skipped. Returns the paddles whose velocity
+        changed, with their new velocity.
+        """
+        latest: dict[str, float] = {}
+        for paddle, seq, velocity in self.inputs:
+            if seq is not None:
+                if seq <= self.input_acks[paddle]:
+                    continue
+                self.input_acks[paddle] = seq
+            latest[paddle] = velocity
+        self.inputs.clear()
+
+        if latest and self.broadcast is not None:
+            self.broadcast.urgent = True
+        changed = []
+        for paddle, velocity in latest.items():
+            if self.paddles[paddle].vy != velocity:
+                self.paddles[paddle].vy = velocity
+                changed.append((paddle, velocity))
+        return changed
+
+    def snapshot(self) -> Snapshot:
+        return (
+            self.ball.x,
+            self.ball.y,
+            self.paddles["left_paddle"].y,
+            self.paddles["right_paddle"].y,
+            self.input_acks["left_paddle"],
+            self.input_acks["right_paddle"],
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "players": self.players,
+            "paddles": {
+                "left_paddle": self.paddles["left_paddle"].to_dict(),
+                "right_paddle": self.paddles["right_paddle"].to_dict(),
+            },
+            "ball": self.ball.to_dict(),
+            "score": self.score.to_dict(),
+            "running": self.running,
+            "acks": dict(self.input_acks),
+        }
+
+
+def simulate(games: Sequence[GameState], dt: float) -> None:
+    """Advance every running game by one step of ``dt`` reference ticks.
+
+    Each game's ``events`` is replaced with what happened during the step. A game
+    that reaches ``WIN_SCORE`` stops running with ``winner`` set to the paddle key.
+    Timers run on ``game.time``, the simulated seconds of the match, never on the
+    wall clock, so a step only depends on the state and the inputs applied to it.
+    """
+    games = [game for game in games if game.running]
+    for game in games:
+        game.events = []
+    step_games(games, dt)
+    update_ai_players(games)
+
+    elapsed = dt / BASE_TICK_RATE
+    for game in games:
+        score_point(game)
+        game.tick += 1
+        game.time += elapsed
+
+
+def score_point(game: GameState) -> None:
+    ball = game.ball
+    if 0.0 <= ball.x <= GRID_WIDTH - BALL_SIZE:
+        return
+
+    if ball.x < 0.0:
+        game.score.right_score += 1
+        scorer, points = "right_paddle", game.score.right_score
+    else:
+        game.score.left_score += 1
+        scorer, points = "left_paddle", game.score.left_score
+
+    game.events.append({"type": "score_update"})
+    ball.reset(game.rng, game.time)
+    for ai in game.ai_players:
+        ai.invalidate()
+
+    if points >= WIN_SCORE:
+        game.running = False
+        game.winner = scorer
+        game.events.append({"type": "game_over"})
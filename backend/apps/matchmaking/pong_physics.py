@@ -0,0 +1,210 @@
+import math
+from dataclasses import dataclass
+
+GRID_WIDTH = 50
+GRID_HEIGHT = 25
+PADDLE_HEIGHT = 5.0
+PADDLE_WIDTH = 1.0
+BALL_SIZE = 1.0
+BALL_SPEED = 0.5
+PADDLE_X_OFFSET = 0.1
+PADDLE_SPEED = 0.3
+INITIAL_SPEED_HITS = 4
+MEDIUM_SPEED_HITS = 8
+MAX_SPEED_MULTIPLIER = 1.5
+
+# Velocities are expressed in grid units per tick of the reference 30 Hz clock;
+# a step at another rate scales them by ``BASE_TICK_RATE / rate``.
+BASE_TICK_RATE = 30
+WALL_TOP = 1.0
+WALL_BOTTOM = GRID_HEIGHT - 2.0
+PADDLE_MIN_Y = 1.0
+PADDLE_MAX_Y = GRID_HEIGHT - PADDLE_HEIGHT - 1.0
+MAX_COLLISIONS_PER_STEP = 8
+MASK_64 = (1 << 64) - 1
+
+
+@dataclass(slots=True)
+class MatchRandom:
+    """SplitMix64 generator of one match, a single integer of state instead of the 2.5 KB of ``random.Random``."""
+
+    state: int
+
+    def next(self) -> int:
+        self.state = (self.state + 0x9E3779B97F4A7C15) & MASK_64
+        z = self.state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK_64
+        return z ^ (z >> 31)
+
+    def sign(self) -> int:
+        return 1 if self.next() >> 63 else -1
+
+    def uniform(self, low: float, high: float) -> float:
+        return low + (high - low) * (self.next() >> 11) / (1 << 53)
+
+
+@dataclass(slots=True)
+class GameObject:
+    x: float
+    y: float
+    width: float
+    height: float
+    vx: float = 0.0
+    vy: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {"x": self.x, "y": self.y, "width": self.width, "height": self.height, "vx": self.vx, "vy": self.vy}
+
+
+@dataclass(slots=True)
+class Paddle(GameObject):
+    width: float = PADDLE_WIDTH
+    height: float = PADDLE_HEIGHT
+
+
+@dataclass(slots=True)
+class Ball(GameObject):
+    x: float = GRID_WIDTH / 2 - BALL_SIZE / 2
+    y: float = GRID_HEIGHT / 2 - BALL_SIZE / 2
+    width: float = BALL_SIZE
+    height: float = BALL_SIZE
+    vx: float = BALL_SPEED
+    vy: float = BALL_SPEED
+    resseting: bool = False
+    reset_timer: float = 0.0
+    speed_multiplier: float = 1.0
+    hits: int = 0
+
+    def reset(self, rng: MatchRandom, now: float) -> None:
+        """Serve again from the center, drawing direction and delay from the match ``rng`` so replays match."""
+        self.x = GRID_WIDTH / 2 - BALL_SIZE / 2
+        self.y = GRID_HEIGHT / 2 - BALL_SIZE / 2
+        self.vx = rng.sign() * BALL_SPEED
+        self.vy = rng.sign() * BALL_SPEED * rng.uniform(0.5, 1.5)
+        self.resseting = True
+        self.reset_timer = now + rng.uniform(0.5, 1.5)
+        self.speed_multiplier = 1.0
+        self.hits = 0
+
+    def increase_speed(self, normalized_impact: float) -> None:
+        if self.hits < INITIAL_SPEED_HITS:
+            speed_increase = 0.15
+        elif self.hits < MEDIUM_SPEED_HITS:
+            speed_increase = 0.10
+        elif self.speed_multiplier < MAX_SPEED_MULTIPLIER:
+            speed_increase = 0.05
+        else:
+            speed_increase = 0.0
+
+        self.speed_multiplier += speed_increase
+        self.hits += 1
+
+        self.vx = math.copysign(1, self.vx) * -1 * BALL_SPEED * self.speed_multiplier
+        self.vy = math.copysign(1, self.vy) * normalized_impact * BALL_SPEED * self.speed_multiplier
+
+
+@dataclass(slots=True)
+class Score:
+    left_score: int = 0
+    right_score: int = 0
+
+    def to_dict(self) -> dict:
+        return {"left_score": self.left_score, "right_score": self.right_score}
+
+
+def paddle_velocity(direction: str, event: str) -> float:
+    """Map a client input to the paddle velocity applied from the next tick on."""
+    speed = PADDLE_SPEED if event == "keydown" else 0.0
+    return -speed if direction == "up" else speed
+
+
+def move_paddles(paddles: dict[str, Paddle], dt: float = 1.0) -> None:
+    """Authoritative paddle step, which clients replay to predict their own paddle.
+
+    Every tick each paddle moves by ``vy * dt`` and is clamped to
+    ``[PADDLE_MIN_Y, PADDLE_MAX_Y]``, ``dt`` being the step length in reference
+    ticks. ``vy`` only changes through :func:`paddle_velocity` when an input is
+    applied, so replaying the unacknowledged inputs over the last server
+    position gives the same result as the server.
+    """
+    for paddle in paddles.values():
+        paddle.y = max(PADDLE_MIN_Y, min(PADDLE_MAX_Y, paddle.y + paddle.vy * dt))
+
+
+def release_ball(ball: Ball, now: float) -> bool:
+    """Return whether the ball is still waiting after a reset, releasing it once ``now`` passes its timer."""
+    if not ball.resseting:
+        return False
+    if now > ball.reset_timer:
+        ball.resseting = False
+    return True
+
+
+def step_ball(ball: Ball, paddles: dict[str, Paddle], events: list, dt: float = 1.0) -> None:
+    """Advance the ball by ``dt`` reference ticks with swept collision detection.
+
+    Instead of testing overlap at the end of the step, the exact time of impact
+    against the walls and the paddle faces is solved along the ball path. The
+    ball is moved to the contact point, bounced, and the rest of the step is
+    simulated with the new velocity, so several bounces can happen per step and
+    a fast ball can never tunnel through a paddle.
+    """
+    remaining = dt
+    for _ in range(MAX_COLLISIONS_PER_STEP):
+        impact = time_of_impact(ball, paddles, remaining)
+        if impact is None:
+            break
+
+        impact_time, paddle = impact
+        ball.x += ball.vx * impact_time
+        ball.y += ball.vy * impact_time
+        remaining -= impact_time
+
+        if paddle is None:
+            ball.vy = -ball.vy
+            events.append({"type": "wall_hit"})
+        else:
+            impact_point = ball.y + ball.height / 2 - (paddle.y + paddle.height / 2)
+            ball.increase_speed(impact_point / (paddle.height / 2))
+            events.append({"type": "paddle_hit"})
+
+    ball.x += ball.vx * remaining
+    ball.y += ball.vy * remaining
+
+
+def time_of_impact(ball: Ball, paddles: dict[str, Paddle], limit: float) -> tuple[float, Paddle | None] | None:
+    """Return the earliest collision within ``limit`` ticks as ``(time, paddle)``, with ``None`` for walls."""
+    impact: tuple[float, Paddle | None] | None = None
+
+    if ball.vy < 0:
+        wall_time = max((WALL_TOP - ball.y) / ball.vy, 0.0)
+    elif ball.vy > 0:
+        wall_time = max((WALL_BOTTOM - ball.y) / ball.vy, 0.0)
+    else:
+        wall_time = math.inf
+    if wall_time <= limit:
+        impact = (wall_time, None)
+
+    left_paddle = paddles["left_paddle"]
+    right_paddle = paddles["right_paddle"]
+    if ball.vx < 0:
+        paddle, face = left_paddle, left_paddle.x + left_paddle.width
+        reachable = ball.x >= face
+    elif ball.vx > 0:
+        paddle, face = right_paddle, right_paddle.x - ball.width
+        reachable = ball.x <= face
+    else:
+        return impact
+
+    if not reachable:
+        return impact
+
+    paddle_time = (face - ball.x) / ball.vx
+    if paddle_time > limit or (impact is not None and paddle_time >= impact[0]):
+        return impact
+
+    y_at_impact = ball.y + ball.vy * paddle_time
+    if paddle.y - ball.height < y_at_impact < paddle.y + paddle.height:
+        return (paddle_time, paddle)
+    return impact
@@ -0,0 +1,94 @@
+import struct
+from enum import Enum
+
+PROTOCOL_VERSION = 2
+
+HEADER = struct.Struct("<BBBxI")
+MAX_INPUT_SEQ = 0xFFFFFFFF
+
+BALL_CHANGED = 1 << 0
+LEFT_PADDLE_CHANGED = 1 << 1
+RIGHT_PADDLE_CHANGED = 1 << 2
+LEFT_ACK_CHANGED = 1 << 3
+RIGHT_ACK_CHANGED = 1 << 4
+
+DELTA_EVENTS = {"paddle_hit": 1 << 0, "wall_hit": 1 << 1}
+KEYFRAME_EVENTS = frozenset({"game_start", "score_update", "game_over"})
+
+# Fields are compared against the last broadcast snapshot, laid out as
+# (ball_x, ball_y, left_paddle_y, right_paddle_y, left_input_ack, right_input_ack).
+Snapshot = tuple[float, float, float, float, int, int]
+
+_FIELD_GROUPS = (
+    (BALL_CHANGED, (0, 1), "ff"),
+    (LEFT_PADDLE_CHANGED, (2,), "f"),
+    (RIGHT_PADDLE_CHANGED, (3,), "f"),
+    (LEFT_ACK_CHANGED, (4,), "I"),
+    (RIGHT_ACK_CHANGED, (5,), "I"),
+)
+_BODIES = {
+    mask: struct.Struct("<" + "".join(fmt for bit, _, fmt in _FIELD_GROUPS if mask & bit))
+    for mask in range(1 << len(_FIELD_GROUPS))
+}
+
+
+class WireFormat(Enum):
+    JSON = "json"
+    BINARY = "binary"
+
+    @classmethod
+    def negotiate(cls, query_string: bytes) -> "WireFormat":
+        """Pick the format requested with ``?protocol=`` falling back to JSON."""
+        for pair in query_string.decode().split("&"):
+            key, _, value = pair.partition("=")
+            if key == "protocol" and value == cls.BINARY.value:
+                return cls.BINARY
+        return cls.JSON
+
+
+def needs_keyframe(events: list[dict]) -> bool:
+    return any(event["type"] in KEYFRAME_EVENTS for event in events)
+
+
+def encode_delta(tick: int, previous: Snapshot | None, current: Snapshot, events: list[dict]) -> bytes:
+    """Pack the fields that changed since ``previous`` into a fixed-layout frame.
+
+    Layout: ``version:u8 | field_mask:u8 | event_mask:u8 | pad | tick:u32`` followed,
+    in bit order, by the little-endian values of every group set in ``field_mask``:
+    float32 positions, then uint32 sequence numbers of the last input applied to
+    each paddle.
+    """
+    mask = 0
+    values: list[float | int] = []
+    for bit, indexes, _ in _FIELD_GROUPS:
+        if previous is None or any(previous[i] != current[i] for i in indexes):
+            mask |= bit
+            values.extend(current[i] for i in indexes)
+
+    event_mask = 0
+    for event in events:
+        event_mask |= DELTA_EVENTS.get(event["type"], 0)
+
+    return HEADER.pack(PROTOCOL_VERSION, mask, event_mask, tick) + _BODIES[mask].pack(*values)
+
+
+def apply_delta(game: dict, frame: bytes) -> list[dict]:
+    """Update a keyframe dict in place from a delta frame and return its events."""
+    version, mask, event_mask, _ = HEADER.unpack_from(frame)
+    if version != PROTOCOL_VERSION:
+        return []
+
+    values = iter(_BODIES[mask].unpack_from(frame, HEADER.size))
+    if mask & BALL_CHANGED:
+        game["ball"]["x"] = next(values)
+        game["ball"]["y"] = next(values)
+    if mask & LEFT_PADDLE_CHANGED:
+        game["paddles"]["left_paddle"]["y"] = next(values)
+    if mask & RIGHT_PADDLE_CHANGED:
+        game["paddles"]["right_paddle"]["y"] = next(values)
+    if mask & LEFT_ACK_CHANGED:
+        game["acks"]["left_paddle"] = next(values)
+    if mask & RIGHT_ACK_CHANGED:
+        game["acks"]["right_paddle"] = next(values)
+
+    return [{"type": name} for name, bit in DELTA_EVENTS.items() if event_mask & bit]
@@ -0,0 +1,100 @@
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from apps.matchmaking.models import Match, MatchType
+from apps.matchmaking.pong_engine import GameState
+from apps.matchmaking.pong_protocol import WireFormat, encode_delta, needs_keyframe
+from apps.matchmaking.replays import MAX_REPLAY_SPEED, Replay
+from setup.metrics import MeteredConsumerMixin
+
+
+class ReplayConsumer(MeteredConsumerMixin, AsyncWebsocketConsumer):
+    """Stream a finished Pong match re-simulated from its input log.
+
+    The viewer receives the same keyframes and deltas as a player, at the
+    simulation rate of the match times ``?speed=`` (1 to ``MAX_REPLAY_SPEED``).
+    """
+
+    async def connect(self) -> None:
+        self.match_id = self.scope["url_route"]["kwargs"]["match_id"]
+        self.user = self.scope["user"]
+        self.wire_format = WireFormat.negotiate(self.scope["query_string"])
+        self.stream: asyncio.Task | None = None
+
+        if not self.user.is_authenticated:
+            await self.close()
+            return
+
+        match = await get_finished_match(self.match_id)
+        replay = await asyncio.to_thread(Replay.load, self.match_id) if match else None
+        if replay is None:
+            await self.close()
+            return
+
+        await self.accept()
+        self.stream = asyncio.create_task(self.play(replay, match.winner.username if match.winner else None))
+
+    async def disconnect(self, message: dict) -> None:
+        if self.stream is not None:
+            self.stream.cancel()
+
+    async def play(self, replay: Replay, winner: str | None) -> None:
+        speed = replay_speed(self.scope["query_string"])
+        game = replay.new_game()
+        await self.send_keyframe(game, [{"type": "game_start"}])
+
+        frames = replay.play(game)
+        last_snapshot = game.snapshot()
+        finished = False
+        while not finished:
+            await asyncio.sleep(1 / replay.simulation_rate)
+            events = []
+            for _ in range(speed):
+                if next(frames, None) is None:
+                    finished = True
+                    break
+                events.extend(game.events)
+            finished = finished or not game.running
+
+            if finished and not any(event["type"] == "game_over" for event in events):
+                events.append({"type": "game_over"})
+            for event in events:
+                if event["type"] == "game_over":
+                    event["winner"] = winner
+
+            if needs_keyframe(events):
+                last_snapshot = game.snapshot()
+                await self.send_keyframe(game, events)
+                continue
+
+            snapshot = game.snapshot()
+            if self.wire_format is WireFormat.BINARY:
+                await self.send(bytes_data=encode_delta(game.tick, last_snapshot, snapshot, events))
+            else:
+                await self.send(text_data=json.dumps({"game": game.to_dict(), "events": events}))
+            last_snapshot = snapshot
+
+    async def send_keyframe(self, game: GameState, events: list[dict]) -> None:
+        await self.send(text_data=json.dumps({"game": game.to_dict(), "events": events}))
+
+
+def replay_speed(query_string: bytes) -> int:
+    values = parse_qs(query_string.decode()).get("speed", [])
+    try:
+        speed = int(values[0])
+    except (IndexError, ValueError):
+        return 1
+    return min(MAX_REPLAY_SPEED, max(1, speed))
+
+
+@database_sync_to_async
+def get_finished_match(match_id: str) -> Match | None:
+    return (
+        Match.objects.select_related("winner")
+        .filter(id=match_id, match_type=MatchType.PONG, finished_date_played__isnull=False)
+        .first()
+    )
@@ -0,0 +1,137 @@
+import asyncio
+import struct
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+
+from apps.matchmaking.pong_ai import AIConfig, AIDifficulty, AIPlayer
+from apps.matchmaking.pong_engine import GameState, simulate
+from apps.matchmaking.pong_physics import BASE_TICK_RATE, PADDLE_SPEED
+
+REPLAY_MAGIC = b"PRPL"
+REPLAY_VERSION = 1
+# magic | version:u8 | seed:u64 | simulation rate:u16 | AI difficulty:u8 (0 for two players)
+HEADER = struct.Struct("<4sBQHB")
+# tick:u32 | paddle << 2 | direction + 1
+RECORD = struct.Struct("<IB")
+END_OF_MATCH = 0xFF
+PADDLES = ("left_paddle", "right_paddle")
+DIFFICULTIES = [difficulty.value for difficulty in AIDifficulty]
+# Records buffered before they are appended to the log in the middle of a match.
+FLUSH_EVERY = 256
+MAX_REPLAY_SPEED = 8
+
+
+def replay_path(match_id: str) -> Path:
+    return Path(settings.MEDIA_ROOT) / "replays" / f"{match_id}.replay"
+
+
+@dataclass(slots=True)
+class MatchRecorder:
+    """Append-only input log of one Pong match.
+
+    Only the seed of the match and the paddle inputs are kept, as 5-byte
+    records stamped with the tick they were applied before; the engine being
+    deterministic, that is enough to simulate the match again. Records are
+    buffered and appended to ``MEDIA_ROOT/replays/<match>.replay`` off the
+    event loop.
+    """
+
+    match_id: str
+    buffer: bytearray = field(default_factory=bytearray)
+    closed: bool = False
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @classmethod
+    def start(cls, match_id: str, game: GameState, difficulty: str | None = None) -> "MatchRecorder":
+        ai = DIFFICULTIES.index(difficulty) + 1 if difficulty in DIFFICULTIES else 0
+        header = HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, game.seed, settings.PONG_SIMULATION_RATE, ai)
+        recorder = cls(match_id, bytearray(header))
+        # Inputs sent while waiting for the opponent are already applied to the paddles.
+        for paddle in PADDLES:
+            if game.paddles[paddle].vy:
+                recorder.record(game.tick, paddle, game.paddles[paddle].vy)
+        return recorder
+
+    def record(self, tick: int, paddle: str, velocity: float) -> None:
+        direction = (velocity > 0) - (velocity < 0)
+        self.buffer += RECORD.pack(tick, PADDLES.index(paddle) << 2 | direction + 1)
+
+    async def flush(self) -> None:
+        if len(self.buffer) >= FLUSH_EVERY * RECORD.size:
+            await self.write()
+
+    async def close(self, tick: int) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.buffer += RECORD.pack(tick, END_OF_MATCH)
+        await self.write()
+
+    async def write(self) -> None:
+        async with self.lock:
+            chunk, self.buffer = bytes(self.buffer), bytearray()
+            if chunk:
+                await asyncio.to_thread(append_log, replay_path(self.match_id), chunk)
+
+
+def append_log(path: Path, chunk: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("ab") as log:
+        log.write(chunk)
+
+
+@dataclass(slots=True)
+class Replay:
+    seed: int
+    simulation_rate: int
+    difficulty: str | None
+    inputs: list[tuple[int, str, float]]
+    end_tick: int | None
+
+    @classmethod
+    def load(cls, match_id: str) -> "Replay | None":
+        path = replay_path(match_id)
+        if not path.is_file():
+            return None
+        data = path.read_bytes()
+        if len(data) < HEADER.size:
+            return None
+        magic, version, seed, rate, ai = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            return None
+
+        # A worker that died mid-write can leave a truncated last record behind.
+        body = data[HEADER.size :]
+        body = body[: len(body) - len(body) % RECORD.size]
+        inputs = []
+        end_tick = None
+        for tick, code in RECORD.iter_unpack(body):
+            if code == END_OF_MATCH:
+                end_tick = tick
+                break
+            inputs.append((tick, PADDLES[code >> 2], ((code & 0b11) - 1) * PADDLE_SPEED))
+        return cls(seed, rate, DIFFICULTIES[ai - 1] if ai else None, inputs, end_tick)
+
+    def new_game(self) -> GameState:
+        game = GameState(seed=self.seed)
+        if self.difficulty is not None:
+            game.ai_players = [AIPlayer("right_paddle", AIConfig.get_config(self.difficulty))]
+            game.is_single_player = True
+        game.running = True
+        return game
+
+    def play(self, game: GameState) -> Iterator[GameState]:
+        """Simulate ``game`` one tick at a time, applying the recorded inputs, until the match ended."""
+        dt = BASE_TICK_RATE / self.simulation_rate
+        inputs = iter(self.inputs)
+        pending = next(inputs, None)
+        while game.running and (self.end_tick is None or game.tick < self.end_tick):
+            while pending is not None and pending[0] <= game.tick:
+                _, paddle, velocity = pending
+                game.paddles[paddle].vy = velocity
+                pending = next(inputs, None)
+            simulate([game], dt)
+            yield game
@@ -0,0 +1,113 @@
+import asyncio
+import uuid
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from channels.db import database_sync_to_async
+from django.db import transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+from apps.matchmaking.models import Match, Tournament
+from apps.users.models import User
+from setup.metrics import current_handler
+
+
+@dataclass(slots=True, frozen=True)
+class MatchResult:
+    match_id: uuid.UUID
+    winner_id: uuid.UUID
+    loser_id: uuid.UUID
+    score_user1: int | None = None
+    score_user2: int | None = None
+    count_stats: bool = True
+
+
+def commit_results(results: Sequence[MatchResult]) -> dict[uuid.UUID, MatchResult]:
+    """Persist ``results`` in one transaction and return the ones that finished their match, by match id.
+
+    A match is only finished once: the update is conditioned on
+    ``finished_date_played`` being unset, so a result that lost the race to
+    another one changes nothing, counters included. ``wins``/``losses`` are
+    incremented with ``F()`` expressions, aggregated per user over the batch,
+    and the tournaments of the finished matches get a new bracket version.
+    """
+    finished: dict[uuid.UUID, MatchResult] = {}
+    wins: Counter[uuid.UUID] = Counter()
+    losses: Counter[uuid.UUID] = Counter()
+    timestamp = now()
+
+    with transaction.atomic():
+        for result in results:
+            if result.match_id in finished:
+                continue
+
+            fields = {"winner_id": result.winner_id, "finished_date_played": timestamp, "updated_at": timestamp}
+            if result.score_user1 is not None:
+                fields["score_user1"] = result.score_user1
+            if result.score_user2 is not None:
+                fields["score_user2"] = result.score_user2
+
+            if not Match.objects.filter(id=result.match_id, finished_date_played__isnull=True).update(**fields):
+                continue
+
+            finished[result.match_id] = result
+            if result.count_stats:
+                wins[result.winner_id] += 1
+                losses[result.loser_id] += 1
+
+        if finished:
+            # Their brackets show the new winners.
+            Tournament.objects.filter(matches__in=list(finished)).update(bracket_version=F("bracket_version") + 1)
+
+        for user_id, count in wins.items():
+            User.objects.filter(id=user_id).update(wins=F("wins") + count)
+        for user_id, count in losses.items():
+            User.objects.filter(id=user_id).update(losses=F("losses") + count)
+
+    return finished
+
+
+class ResultWriter:
+    """Group the results submitted during the same event loop iteration into one transaction.
+
+    Every game tick that finishes matches submits them concurrently; the first
+    submission schedules a flush that runs once the others had a chance to
+    join, and each caller awaits whether its own match was finished by it.
+    """
+
+    def __init__(self) -> None:
+        self.pending: list[tuple[MatchResult, asyncio.Future[bool]]] = []
+        self._task: asyncio.Task | None = None
+
+    async def commit(self, result: MatchResult) -> bool:
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((result, future))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush())
+        return await future
+
+    async def _flush(self) -> None:
+        current_handler.set("ResultWriter.flush")
+        await asyncio.sleep(0)
+        while self.pending:
+            batch, self.pending = self.pending, []
+            try:
+                finished = await database_sync_to_async(commit_results)([result for result, _ in batch])
+            except Exception as error:  # noqa: BLE001
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            for result, future in batch:
+                if not future.done():
+                    future.set_result(finished.get(result.match_id) is result)
+
+
+result_writer = ResultWriter()
+
+
+@database_sync_to_async
+def match_finished(match_id: str) -> bool:
+    return Match.objects.filter(id=match_id, finished_date_played__isnull=False).exists()
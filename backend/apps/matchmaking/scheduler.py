@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import math
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from setup.metrics import TICK_DURATION, TICK_LAG, TICK_STEP_DURATION, TICKS_SKIPPED
+
+logger = logging.getLogger(__name__)
+
+TickCallback = Callable[[], Awaitable[None]]
+StepCallback = Callable[[list[str]], None]
+
+
+@dataclass
+class TickStats:
+    ticks: int = 0
+    skipped_ticks: int = 0
+    active_matches: int = 0
+    last_tick_duration: float = 0.0
+    max_tick_duration: float = 0.0
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "ticks": self.ticks,
+            "skipped_ticks": self.skipped_ticks,
+            "active_matches": self.active_matches,
+            "last_tick_duration": self.last_tick_duration,
+            "max_tick_duration": self.max_tick_duration,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+        }
+
+
+class MatchScheduler:
+    """Drive every registered match from a single deadline-based clock.
+
+    Deadlines are computed as ``start + n * interval`` so sleep overshoot never
+    accumulates. When the loop falls more than one full interval behind, the
+    missed ticks are dropped and the clock is re-anchored instead of bursting.
+
+    Each tick runs in two phases: the optional synchronous ``step`` advances the
+    simulation of every registered room at once, then the per-match callbacks
+    run concurrently to score and broadcast.
+    """
+
+    def __init__(self, interval: float, step: StepCallback | None = None, name: str = "") -> None:
+        self.interval = interval
+        self.step = step
+        self.name = name
+        self.matches: dict[str, TickCallback] = {}
+        self.stats = TickStats()
+        self._task: asyncio.Task | None = None
+
+    def add(self, room: str, callback: TickCallback) -> None:
+        self.matches[room] = callback
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def remove(self, room: str) -> None:
+        self.matches.pop(room, None)
+
+    def __contains__(self, room: str) -> bool:
+        return room in self.matches
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+
+        while self.matches:
+            deadline += self.interval
+            delay = deadline - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif -delay > self.interval:
+                skipped = int(-delay // self.interval)
+                self.stats.skipped_ticks += skipped
+                TICKS_SKIPPED.inc(self.name, amount=skipped)
+                deadline += skipped * self.interval
+
+            lag = loop.time() - deadline
+            start_time = time.perf_counter()
+            await self._tick()
+            duration = time.perf_counter() - start_time
+
+            self.stats.ticks += 1
+            self.stats.active_matches = len(self.matches)
+            self.stats.last_lag = lag
+            self.stats.max_lag = max(self.stats.max_lag, lag)
+            self.stats.last_tick_duration = duration
+            self.stats.max_tick_duration = max(self.stats.max_tick_duration, duration)
+            TICK_DURATION.observe(duration, self.name)
+            TICK_LAG.observe(lag, self.name)
+
+        self._task = None
+
+    async def _tick(self) -> None:
+        rooms = list(self.matches.items())
+        if self.step is not None:
+            start_time = time.perf_counter()
+            try:
+                self.step([room for room, _ in rooms])
+            except Exception:
+                logger.exception("Simulation step failed")
+            TICK_STEP_DURATION.observe(time.perf_counter() - start_time, self.name)
+        results = await asyncio.gather(*(callback() for _, callback in rooms), return_exceptions=True)
+        for (room, _), result in zip(rooms, results, strict=True):
+            if isinstance(result, Exception):
+                logger.error("Tick failed for %s", room, exc_info=result)
+
+
+class TimerWheel:
+    """Run one-shot callbacks after a delay, all driven by a single task.
+
+    Timers hash into ``slots`` buckets by expiry tick, ``resolution`` seconds
+    apart, and carry the number of full turns left, so scheduling and
+    cancelling are O(1) and each turn only looks at one bucket. Callbacks fire
+    up to ``resolution`` late, which suits timeouts counted in seconds.
+    """
+
+    def __init__(self, resolution: float, slots: int = 64, name: str = "") -> None:
+        self.resolution = resolution
+        self.name = name
+        self.slots: list[dict[str, tuple[int, TickCallback]]] = [{} for _ in range(slots)]
+        self.timers: dict[str, int] = {}
+        self.position = 0
+        self._task: asyncio.Task | None = None
+
+    def schedule(self, key: str, delay: float, callback: TickCallback) -> None:
+        """Run ``callback`` in ``delay`` seconds, replacing the timer already set for ``key``."""
+        self.cancel(key)
+        ticks = max(1, math.ceil(delay / self.resolution))
+        slot = (self.position + ticks) % len(self.slots)
+        self.slots[slot][key] = ((ticks - 1) // len(self.slots), callback)
+        self.timers[key] = slot
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def cancel(self, key: str) -> bool:
+        slot = self.timers.pop(key, None)
+        if slot is None:
+            return False
+        del self.slots[slot][key]
+        return True
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.timers
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+
+        while self.timers:
+            deadline += self.resolution
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            self.position = (self.position + 1) % len(self.slots)
+            bucket = self.slots[self.position]
+            due = []
+            for key, (rounds, callback) in list(bucket.items()):
+                if rounds:
+                    bucket[key] = (rounds - 1, callback)
+                    continue
+                del bucket[key]
+                del self.timers[key]
+                due.append((key, callback))
+
+            results = await asyncio.gather(*(callback() for _, callback in due), return_exceptions=True)
+            for (key, _), result in zip(due, results, strict=True):
+                if isinstance(result, Exception):
+                    logger.error("%s timer failed for %s", self.name, key, exc_info=result)
+
+        self._task = None
@@ -0,0 +1,87 @@
+import hashlib
+from functools import cache
+
+import redis
+from django.conf import settings
+from redis import asyncio as aioredis
+
+from apps.matchmaking.state_store import state_store
+
+SHARD_MAP_KEY = "game_shards"
+SHARD_REDIRECT_CODE = 4301
+
+
+def sharding_enabled() -> bool:
+    return len(settings.GAME_SHARDS) > 1
+
+
+def routable(shard: str) -> bool:
+    """Tell whether nginx can send a redirected socket to ``shard``: only the listed shards have a route."""
+    return shard in settings.GAME_SHARDS
+
+
+def hash_shard(match_id: str) -> str:
+    """Rendezvous-hash a match onto one of ``GAME_SHARDS``.
+
+    Adding or removing a shard only moves the matches that hashed to it.
+    """
+    return max(
+        settings.GAME_SHARDS,
+        key=lambda shard: hashlib.blake2b(f"{shard}:{match_id}".encode(), digest_size=8).digest(),
+    )
+
+
+def resolve_owner(match_id: str, mapped: bytes | None) -> str:
+    if mapped is not None and mapped.decode() in settings.GAME_SHARDS:
+        return mapped.decode()
+    return hash_shard(match_id)
+
+
+@cache
+def sync_client() -> redis.Redis:
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def locate_shard(match_id: str) -> str | None:
+    if not sharding_enabled():
+        return None
+    return resolve_owner(str(match_id), sync_client().hget(SHARD_MAP_KEY, str(match_id)))
+
+
+class ShardMap:
+    """Record which shard owns each live match.
+
+    The owner is the rendezvous hash of the match id unless the map already
+    points to another live shard, which keeps running matches in place while
+    the shard list changes. A match whose owner died, leaving a checkpoint
+    without a lease in the state store, is taken over by the claiming shard.
+    """
+
+    def __init__(self) -> None:
+        self._client: aioredis.Redis | None = None
+
+    @property
+    def client(self) -> aioredis.Redis:
+        if self._client is None:
+            self._client = aioredis.Redis.from_url(settings.REDIS_URL)
+        return self._client
+
+    async def owner(self, match_id: str) -> str:
+        return resolve_owner(match_id, await self.client.hget(SHARD_MAP_KEY, match_id))
+
+    async def claim(self, match_id: str) -> str | None:
+        """Claim ``match_id`` for this shard, returning the real owner when it lives elsewhere."""
+        if not sharding_enabled():
+            return None
+        owner = await self.owner(match_id)
+        if owner != settings.GAME_SHARD_ID and not await state_store.orphaned(match_id):
+            return owner
+        await self.client.hset(SHARD_MAP_KEY, match_id, settings.GAME_SHARD_ID)
+        return None
+
+    async def release(self, match_id: str) -> None:
+        if sharding_enabled():
+            await self.client.hdel(SHARD_MAP_KEY, match_id)
+
+
+shard_map = ShardMap()
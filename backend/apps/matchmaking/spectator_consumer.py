@@ -0,0 +1,87 @@
+import asyncio
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from apps.matchmaking.game_consumer import SPECTATOR_ANNOUNCE_INTERVAL, SPECTATOR_GROUP
+from apps.matchmaking.models import Match, MatchType, Tournament
+from apps.matchmaking.results import match_finished
+from apps.users.models import User
+from setup.metrics import MeteredConsumerMixin
+
+# Unanswered announcements between checks that the match is not over, and before giving up on it.
+FINISHED_CHECK_EVERY = 5
+MAX_SILENT_ANNOUNCEMENTS = 30
+
+
+class SpectatorConsumer(MeteredConsumerMixin, AsyncWebsocketConsumer):
+    """Watch a live Pong match of a tournament you take part in.
+
+    Spectators only ever join ``spectate_<match>``, where the match owner
+    publishes one downsampled frame per match, so their number does not change
+    the work of the tick or of the players' group. A spectator announces itself
+    to the players' group every ``SPECTATOR_ANNOUNCE_INTERVAL``, which keeps
+    the feed of the match alive. When it got no frame for that long, the
+    announcement also starts the feed, or restarts it after a worker took the
+    match over, and forces a keyframe. It stops at game over, and closes once the match is finished or
+    stayed silent for ``MAX_SILENT_ANNOUNCEMENTS`` announcements.
+    """
+
+    async def connect(self) -> None:
+        self.match_id = self.scope["url_route"]["kwargs"]["match_id"]
+        self.group_name = SPECTATOR_GROUP.format(self.match_id)
+        self.user = self.scope["user"]
+        self.announcer: asyncio.Task | None = None
+        self.last_frame = -SPECTATOR_ANNOUNCE_INTERVAL
+
+        if not self.user.is_authenticated or not await can_spectate(self.match_id, self.user):
+            await self.close()
+            return
+
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        self.announcer = asyncio.create_task(self.announce())
+
+    async def disconnect(self, message: dict) -> None:
+        if self.announcer is not None:
+            self.announcer.cancel()
+        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def announce(self) -> None:
+        loop = asyncio.get_running_loop()
+        silent = 0
+        while silent < MAX_SILENT_ANNOUNCEMENTS:
+            if loop.time() - self.last_frame < SPECTATOR_ANNOUNCE_INTERVAL:
+                silent = 0
+                await self.channel_layer.group_send(
+                    f"match_{self.match_id}", {"type": "spectator_join", "keyframe": False}
+                )
+            else:
+                silent += 1
+                # A match released without a game over frame, or never started, is only over in the database.
+                if silent % FINISHED_CHECK_EVERY == 0 and await match_finished(self.match_id):
+                    break
+                await self.channel_layer.group_send(f"match_{self.match_id}", {"type": "spectator_join"})
+            await asyncio.sleep(SPECTATOR_ANNOUNCE_INTERVAL)
+        self.announcer = None
+        await self.close()
+
+    async def send_spectator_frame(self, event: dict) -> None:
+        self.last_frame = asyncio.get_running_loop().time()
+        if event.get("final") and self.announcer is not None:
+            self.announcer.cancel()
+            self.announcer = None
+        if "text" in event:
+            await self.send(text_data=event["text"])
+        else:
+            await self.send(bytes_data=event["bytes"])
+
+
+@database_sync_to_async
+def can_spectate(match_id: str, user: User) -> bool:
+    match = Match.objects.filter(id=match_id, match_type=MatchType.PONG, finished_date_played__isnull=True).first()
+    if match is None:
+        return False
+    if user.id in {match.user1_id, match.user2_id}:
+        return True
+    return Tournament.objects.filter(matches=match, players__player=user).exists()
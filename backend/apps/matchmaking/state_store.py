@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import struct
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+if TYPE_CHECKING:
+    from apps.matchmaking.pong_engine import GameState
+    from apps.matchmaking.tictactoe_consumer import GameObject
+
+logger = logging.getLogger(__name__)
+
+STATE_KEY = "game_state:{}"
+LEASE_KEY = "game_lease:{}"
+# Checkpoints of a match nobody resumed are dropped after this many seconds.
+STATE_TTL = 3600
+
+# x, y, vx, vy, speed multiplier, hits, waiting to be served, serve time.
+BALL = struct.Struct("<5dI?d")
+PADDLES = struct.Struct("<2d")
+SCORE = struct.Struct("<2H")
+# Seed and generator state of the match, and its simulated clock: a resumed match
+# keeps drawing the serves its replay expects.
+RANDOM = struct.Struct("<2Qd")
+# TicTacToe bitboards: X stones, O stones, blocked cell.
+STONES = struct.Struct("<3I")
+
+# Fencing: a worker only writes a checkpoint while it still holds the match lease.
+CHECKPOINT_SCRIPT = """
+if redis.call('get', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('hset', KEYS[2], unpack(ARGV, 3))
+redis.call('expire', KEYS[2], ARGV[2])
+return 1
+"""
+ACQUIRE_SCRIPT = """
+local owner = redis.call('get', KEYS[1])
+if owner and owner ~= ARGV[1] then
+    return owner
+end
+redis.call('set', KEYS[1], ARGV[1], 'px', ARGV[2])
+return false
+"""
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    redis.call('del', KEYS[2])
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def pong_checkpoint(game: "GameState") -> dict[str, str | bytes | int]:
+    ball = game.ball
+    return {
+        "kind": "pong",
+        "ball": BALL.pack(
+            ball.x, ball.y, ball.vx, ball.vy, ball.speed_multiplier, ball.hits, ball.resseting, ball.reset_timer
+        ),
+        "paddles": PADDLES.pack(game.paddles["left_paddle"].y, game.paddles["right_paddle"].y),
+        "score": SCORE.pack(game.score.left_score, game.score.right_score),
+        "random": RANDOM.pack(game.seed, game.rng.state, game.time),
+        "tick": game.tick,
+    }
+
+
+def load_pong_checkpoint(state: dict[bytes, bytes], game: "GameState") -> None:
+    """Load the fields of ``pong_checkpoint``, as Redis returns them, into ``game``."""
+    ball = game.ball
+    (
+        ball.x,
+        ball.y,
+        ball.vx,
+        ball.vy,
+        ball.speed_multiplier,
+        ball.hits,
+        ball.resseting,
+        ball.reset_timer,
+    ) = BALL.unpack(state[b"ball"])
+    game.paddles["left_paddle"].y, game.paddles["right_paddle"].y = PADDLES.unpack(state[b"paddles"])
+    game.score.left_score, game.score.right_score = SCORE.unpack(state[b"score"])
+    game.seed, game.rng.state, game.time = RANDOM.unpack(state[b"random"])
+    game.tick = int(state[b"tick"])
+
+
+class GameStateStore:
+    """Checkpoint live matches to Redis hashes so any worker can resume them.
+
+    A worker owns a match through a lease key that expires after
+    ``GAME_STATE_LEASE_TTL`` unless renewed; one background loop renews every
+    lease held by the process. When the owner dies its leases expire and the
+    next worker a player reaches acquires the match and restores it from the
+    last checkpoint. Everything is a no-op unless ``GAME_STATE_STORE`` is set.
+    """
+
+    def __init__(self) -> None:
+        self._client: aioredis.Redis | None = None
+        # Lease owners double as redirect targets, so they are shard ids nginx can route to.
+        self.worker = settings.GAME_SHARD_ID
+        self.leases: set[str] = set()
+        self._renewal: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.GAME_STATE_STORE
+
+    @property
+    def client(self) -> aioredis.Redis:
+        if self._client is None:
+            self._client = aioredis.Redis.from_url(settings.REDIS_URL)
+        return self._client
+
+    @property
+    def lease_ms(self) -> int:
+        return int(settings.GAME_STATE_LEASE_TTL * 1000)
+
+    async def acquire(self, match_id: str) -> str | None:
+        """Take the lease of ``match_id``, returning the live owner instead when it is held elsewhere."""
+        if not self.enabled:
+            return None
+        # Checked and taken in one script: another worker may take the lease between a GET and a SET.
+        owner = await self.client.eval(ACQUIRE_SCRIPT, 1, LEASE_KEY.format(match_id), self.worker, self.lease_ms)
+        if owner is not None:
+            return owner.decode()
+
+        self.leases.add(match_id)
+        if self._renewal is None or self._renewal.done():
+            self._renewal = asyncio.create_task(self._renew())
+        return None
+
+    async def orphaned(self, match_id: str) -> bool:
+        """Whether ``match_id`` has a checkpoint but no live owner."""
+        if not self.enabled:
+            return False
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.exists(STATE_KEY.format(match_id))
+            pipe.exists(LEASE_KEY.format(match_id))
+            has_state, has_lease = await pipe.execute()
+        return bool(has_state) and not has_lease
+
+    async def discard(self, match_id: str) -> None:
+        if not self.enabled or match_id not in self.leases:
+            return
+        self.leases.discard(match_id)
+        await self.client.eval(RELEASE_SCRIPT, 2, LEASE_KEY.format(match_id), STATE_KEY.format(match_id), self.worker)
+
+    async def checkpoint_pong(self, match_id: str, game: "GameState") -> None:
+        await self._write(match_id, pong_checkpoint(game))
+
+    async def restore_pong(self, match_id: str, game: "GameState") -> bool:
+        """Load the last checkpoint of ``match_id`` into a fresh ``game``, paused until its players return."""
+        state = await self._read(match_id, "pong")
+        if state is None:
+            return False
+        load_pong_checkpoint(state, game)
+        return True
+
+    async def checkpoint_tictactoe(self, match_id: str, game: "GameObject") -> None:
+        await self._write(
+            match_id,
+            {
+                "kind": "tictactoe",
+                "stones": STONES.pack(game.x, game.o, game.block),
+                "turn": game.turn,
+                "winner": game.winner or "",
+                "x": game.players.player_x.username or "",
+                "o": game.players.player_o.username or "",
+            },
+        )
+
+    async def restore_tictactoe(self, match_id: str, game: "GameObject") -> bool:
+        state = await self._read(match_id, "tictactoe")
+        if state is None:
+            return False
+        game.x, game.o, game.block = STONES.unpack(state[b"stones"])
+        game.turn = state[b"turn"].decode()
+        game.winner = state[b"winner"].decode() or None
+        game.players.player_x.username = state[b"x"].decode() or None
+        game.players.player_o.username = state[b"o"].decode() or None
+        return True
+
+    async def _write(self, match_id: str, fields: dict[str, str | bytes | int]) -> None:
+        if not self.enabled or match_id not in self.leases:
+            return
+        arguments = [item for pair in fields.items() for item in pair]
+        written = await self.client.eval(
+            CHECKPOINT_SCRIPT,
+            2,
+            LEASE_KEY.format(match_id),
+            STATE_KEY.format(match_id),
+            self.worker,
+            STATE_TTL,
+            *arguments,
+        )
+        if not written:
+            self.leases.discard(match_id)
+            logger.warning("Lost the lease of match %s, checkpoints stopped", match_id)
+
+    async def _read(self, match_id: str, kind: str) -> dict[bytes, bytes] | None:
+        if not self.enabled:
+            return None
+        state = await self.client.hgetall(STATE_KEY.format(match_id))
+        if state.get(b"kind") != kind.encode():
+            return None
+        return state
+
+    async def _renew(self) -> None:
+        while self.leases:
+            await asyncio.sleep(settings.GAME_STATE_LEASE_TTL / 3)
+            matches = list(self.leases)
+            try:
+                async with self.client.pipeline(transaction=False) as pipe:
+                    for match_id in matches:
+                        pipe.eval(RENEW_SCRIPT, 1, LEASE_KEY.format(match_id), self.worker, self.lease_ms)
+                    renewed = await pipe.execute()
+            except RedisError:
+                logger.exception("Could not renew game leases")
+                continue
+            for match_id, kept in zip(matches, renewed, strict=True):
+                if not kept:
+                    self.leases.discard(match_id)
+                    logger.warning("Lost the lease of match %s", match_id)
+
+
+state_store = GameStateStore()
@@ -0,0 +1,42 @@
+from io import StringIO
+
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+from apps.matchmaking.game_consumer import PongConsumer, new_game
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class BroadcastRateTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.consumer = PongConsumer()
+        self.consumer.room_group_name = "match_rate-test"
+        self.game = new_game()
+        PongConsumer.games[self.consumer.room_group_name] = self.game
+        self.addCleanup(PongConsumer.games.pop, self.consumer.room_group_name)
+
+    async def test_override_is_bounded_by_the_heartbeat_rate(self) -> None:
+        await self.consumer.set_broadcast_rate({"type": "set_broadcast_rate", "rate": 10})
+        self.assertEqual(self.game.broadcast.active_every, round(self.game.broadcast.tick_rate / 10))
+        await self.consumer.set_broadcast_rate({"type": "set_broadcast_rate", "rate": 0.001})
+        self.assertEqual(self.game.broadcast.active_every, self.game.broadcast.heartbeat_every)
+
+    async def test_invalid_rates_are_ignored(self) -> None:
+        active_every = self.game.broadcast.active_every
+        for rate in ("10", None, 0, -5):
+            await self.consumer.set_broadcast_rate({"type": "set_broadcast_rate", "rate": rate})
+        await self.consumer.set_broadcast_rate({"type": "set_broadcast_rate"})
+        self.assertEqual(self.game.broadcast.active_every, active_every)
+
+    async def test_command_sends_the_override_to_the_match_group(self) -> None:
+        layer = get_channel_layer()
+        channel = await layer.new_channel()
+        await layer.group_add(self.consumer.room_group_name, channel)
+        await sync_to_async(call_command)("set_broadcast_rate", "rate-test", "15", stdout=StringIO())
+        self.assertEqual(await layer.receive(channel), {"type": "set_broadcast_rate", "rate": 15.0})
+
+    def test_command_refuses_rates_that_are_not_positive(self) -> None:
+        with self.assertRaises(CommandError):
+            call_command("set_broadcast_rate", "rate-test", "0", stdout=StringIO())
@@ -0,0 +1,19 @@
+from channels.db import database_sync_to_async
+from django.test import SimpleTestCase
+
+from setup.metrics import DB_DURATION, Metric, current_handler
+
+
+class MetricsTests(SimpleTestCase):
+    def test_metric_without_samples_cannot_be_created(self) -> None:
+        with self.assertRaises(TypeError):
+            Metric("incomplete_metric", "A metric without samples.")
+
+    async def test_database_waits_are_recorded_under_the_running_handler(self) -> None:
+        handler = ("MetricsTests.handler",)
+        token = current_handler.set(handler[0])
+        try:
+            self.assertEqual(await database_sync_to_async(sum)([1, 2]), 3)
+        finally:
+            current_handler.reset(token)
+        self.assertEqual(sum(DB_DURATION.series[handler][:-1]), 1)
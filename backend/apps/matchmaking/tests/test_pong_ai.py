@@ -0,0 +1,76 @@
+import random
+
+from django.test import SimpleTestCase
+
+from apps.matchmaking.pong_ai import PLAYFIELD_HEIGHT, AIConfig, AIDifficulty, AIPlayer, intercept_y, update_ai_paddle
+from apps.matchmaking.pong_physics import (
+    GRID_HEIGHT,
+    GRID_WIDTH,
+    PADDLE_HEIGHT,
+    PADDLE_WIDTH,
+    PADDLE_X_OFFSET,
+    WALL_BOTTOM,
+    WALL_TOP,
+    Ball,
+    Paddle,
+)
+
+
+def reflect(y: float, max_bounces: int) -> float:
+    """Reflect ``y`` off the walls one bounce at a time, giving up after ``max_bounces + 1`` of them."""
+    for _ in range(max_bounces + 1):
+        if y < WALL_TOP:
+            y = 2 * WALL_TOP - y
+        elif y > WALL_BOTTOM:
+            y = 2 * WALL_BOTTOM - y
+        else:
+            break
+    return y
+
+
+class InterceptTests(SimpleTestCase):
+    def test_positions_inside_the_playfield_are_kept(self) -> None:
+        for y in (WALL_TOP, WALL_BOTTOM, (WALL_TOP + WALL_BOTTOM) / 2):
+            self.assertEqual(intercept_y(y, 0), y)
+
+    def test_single_bounces(self) -> None:
+        self.assertAlmostEqual(intercept_y(WALL_TOP - 2.0, 0), WALL_TOP + 2.0)
+        self.assertAlmostEqual(intercept_y(WALL_BOTTOM + 2.0, 0), WALL_BOTTOM - 2.0)
+
+    def test_folding_matches_bounce_by_bounce_reflection(self) -> None:
+        rng = random.Random(3)  # noqa: S311
+        for _ in range(5000):
+            y = rng.uniform(-12 * PLAYFIELD_HEIGHT, 12 * PLAYFIELD_HEIGHT)
+            for max_bounces in range(6):
+                self.assertAlmostEqual(intercept_y(y, max_bounces), reflect(y, max_bounces), msg=(y, max_bounces))
+
+
+class SteeringTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.paddle = Paddle(x=GRID_WIDTH - PADDLE_X_OFFSET - PADDLE_WIDTH, y=GRID_HEIGHT / 2 - PADDLE_HEIGHT / 2)
+        self.ai = AIPlayer("right_paddle", AIConfig.get_config(AIDifficulty.HARD.value))
+
+    def test_paddle_heads_for_the_predicted_intercept(self) -> None:
+        # Reaches the paddle after bouncing off the top wall, far above the paddle.
+        ball = Ball(x=GRID_WIDTH - 11.0, y=WALL_TOP + 1.0, vx=1.0, vy=-0.5)
+        update_ai_paddle(ball, self.paddle, self.ai, 0.0)
+        time_to_reach = (self.paddle.x - ball.x) / ball.vx
+        self.assertAlmostEqual(self.ai.target_y, intercept_y(ball.y + ball.vy * time_to_reach, 4))
+        self.assertLess(self.paddle.vy, 0.0)
+
+    def test_paddle_stops_while_the_ball_waits_to_serve(self) -> None:
+        self.paddle.vy = 1.0
+        update_ai_paddle(Ball(resseting=True), self.paddle, self.ai, 0.0)
+        self.assertEqual(self.paddle.vy, 0)
+
+    def test_prediction_is_kept_until_the_ball_turns(self) -> None:
+        ball = Ball(x=30.0, y=12.0, vx=1.0, vy=0.5)
+        update_ai_paddle(ball, self.paddle, self.ai, 0.0)
+        target = self.ai.target_y
+        ball.y = 3.0
+        update_ai_paddle(ball, self.paddle, self.ai, 10.0)
+        self.assertEqual(self.ai.target_y, target)
+        ball.vx = -ball.vx
+        update_ai_paddle(ball, self.paddle, self.ai, 20.0)
+        # The hard AI waits in the middle while the ball moves away.
+        self.assertEqual(self.ai.target_y, GRID_HEIGHT / 2)
@@ -0,0 +1,69 @@
+import copy
+import random
+from dataclasses import asdict
+
+from django.test import SimpleTestCase
+
+from apps.matchmaking.pong_batch import BATCH_THRESHOLD, step_games
+from apps.matchmaking.pong_engine import GameState
+from apps.matchmaking.pong_physics import GRID_WIDTH, PADDLE_SPEED, WALL_BOTTOM, WALL_TOP
+
+TICKS = 150
+
+
+def scattered_games(count: int, seed: int) -> list[GameState]:
+    """Return ``count`` matches with the ball and paddles spread over the field, a few waiting to serve."""
+    rng = random.Random(seed)  # noqa: S311
+    games = []
+    for index in range(count):
+        game = GameState()
+        ball = game.ball
+        ball.x = rng.uniform(0.0, GRID_WIDTH - 1.0)
+        ball.y = rng.uniform(WALL_TOP, WALL_BOTTOM)
+        ball.vx = rng.choice((-1, 1)) * rng.uniform(0.3, 3.0)
+        ball.vy = rng.uniform(-3.0, 3.0)
+        ball.hits = rng.randrange(10)
+        ball.speed_multiplier = rng.uniform(1.0, 1.5)
+        if index % 10 == 0:
+            ball.resseting = True
+            ball.reset_timer = float("inf")
+        for paddle in game.paddles.values():
+            paddle.y = rng.uniform(1.0, 19.0)
+            paddle.vy = rng.choice((-PADDLE_SPEED, 0.0, PADDLE_SPEED))
+        games.append(game)
+    return games
+
+
+class BatchStepTests(SimpleTestCase):
+    def assert_same_games(self, batched: list[GameState], scalar: list[GameState], tick: int) -> None:
+        for one, other in zip(batched, scalar, strict=True):
+            self.assertEqual(one.events, other.events, tick)
+            self.assertEqual(asdict(one.ball), asdict(other.ball), tick)
+            for paddle in one.paddles:
+                self.assertEqual(one.paddles[paddle].y, other.paddles[paddle].y, tick)
+
+    def test_batch_step_matches_the_scalar_step(self) -> None:
+        games = scattered_games(BATCH_THRESHOLD * 2, seed=5)
+        reference = copy.deepcopy(games)
+        hits = 0
+        for tick in range(TICKS):
+            for game in games + reference:
+                game.events = []
+            step_games(games, 1.0)
+            # Below the threshold every game takes the per-object path.
+            for game in reference:
+                step_games([game], 1.0)
+            self.assert_same_games(games, reference, tick)
+
+            hits += sum(event["type"] == "paddle_hit" for game in games for event in game.events)
+            # Scoring is not part of the step: serve the balls that left the field again.
+            for batched, scalar in zip(games, reference, strict=True):
+                if not 0.0 <= batched.ball.x <= GRID_WIDTH - 1.0:
+                    batched.ball.x = scalar.ball.x = GRID_WIDTH / 2
+        self.assertGreater(hits, 0)
+
+    def test_waiting_balls_do_not_move(self) -> None:
+        games = scattered_games(BATCH_THRESHOLD, seed=7)
+        waiting = [(game.ball.x, game.ball.y) for game in games if game.ball.resseting]
+        step_games(games, 1.0)
+        self.assertEqual([(game.ball.x, game.ball.y) for game in games if game.ball.resseting], waiting)
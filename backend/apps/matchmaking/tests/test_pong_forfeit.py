@@ -0,0 +1,62 @@
+from channels.layers import get_channel_layer
+from django.test import TestCase, override_settings
+
+from apps.matchmaking.game_consumer import PongConsumer, new_game
+from apps.matchmaking.models import Tournament, TournamentPlayer
+from apps.matchmaking.tickets import MatchTicket
+from apps.users.models import User
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class ForfeitTests(TestCase):
+    def setUp(self) -> None:
+        self.alice = User.objects.create(username="alice", email="alice@example.com")
+        self.bob = User.objects.create(username="bob", email="bob@example.com")
+        self.tournament = Tournament.objects.create(name="Copa", created_by=self.alice)
+        self.tournament.players.add(
+            TournamentPlayer.objects.create(player=self.alice, display_name="Alice"),
+            TournamentPlayer.objects.create(player=self.bob, display_name="Bob"),
+        )
+        self.tournament.create_next_round()
+        self.match = self.tournament.matches.select_related("user1", "user2").get()
+
+    def paused_match(self, left_score: int, right_score: int) -> PongConsumer:
+        consumer = PongConsumer()
+        consumer.channel_layer = get_channel_layer()
+        consumer.match_id = str(self.match.id)
+        consumer.room_group_name = f"match_{self.match.id}"
+        consumer.ticket = MatchTicket(
+            match_id=self.match.id,
+            match_type=self.match.match_type,
+            side=2,
+            user_ids=(self.match.user1_id, self.match.user2_id),
+            usernames=(self.match.user1.username, self.match.user2.username),
+        )
+        consumer.is_left_user = False
+        game = new_game()
+        game.score.left_score, game.score.right_score = left_score, right_score
+        PongConsumer.games[consumer.room_group_name] = game
+        self.addCleanup(PongConsumer.games.pop, consumer.room_group_name, None)
+        return consumer
+
+    async def test_forfeit_finishes_the_tournament_round(self) -> None:
+        layer = get_channel_layer()
+        channel = await layer.new_channel()
+        await layer.group_add(f"tournament_{self.tournament.id}", channel)
+
+        await self.paused_match(3, 1).forfeit()
+
+        await self.match.arefresh_from_db()
+        self.assertEqual(self.match.winner_id, self.match.user1_id)
+        await self.tournament.arefresh_from_db()
+        self.assertIsNotNone(self.tournament.finished_at)
+        self.assertEqual(await layer.receive(channel), {"type": "handle_match_finished"})
+        self.assertNotIn(f"match_{self.match.id}", PongConsumer.games)
+
+    async def test_last_player_to_leave_wins_a_tie(self) -> None:
+        await self.paused_match(2, 2).forfeit()
+        await self.match.arefresh_from_db()
+        self.assertEqual(self.match.winner_id, self.match.user2_id)
@@ -0,0 +1,83 @@
+from django.test import SimpleTestCase
+
+from apps.matchmaking.pong_physics import (
+    GRID_HEIGHT,
+    GRID_WIDTH,
+    PADDLE_HEIGHT,
+    PADDLE_MAX_Y,
+    PADDLE_MIN_Y,
+    PADDLE_WIDTH,
+    PADDLE_X_OFFSET,
+    WALL_BOTTOM,
+    WALL_TOP,
+    Ball,
+    Paddle,
+    move_paddles,
+    step_ball,
+    time_of_impact,
+)
+
+
+def paddles() -> dict[str, Paddle]:
+    middle = GRID_HEIGHT / 2 - PADDLE_HEIGHT / 2
+    return {
+        "left_paddle": Paddle(x=PADDLE_X_OFFSET, y=middle),
+        "right_paddle": Paddle(x=GRID_WIDTH - PADDLE_X_OFFSET - PADDLE_WIDTH, y=middle),
+    }
+
+
+def ball(x: float, y: float, vx: float, vy: float) -> Ball:
+    ball = Ball()
+    ball.x, ball.y, ball.vx, ball.vy = x, y, vx, vy
+    return ball
+
+
+class SweptCollisionTests(SimpleTestCase):
+    def test_fast_ball_bounces_off_the_paddle_instead_of_tunnelling(self) -> None:
+        field = paddles()
+        paddle = field["right_paddle"]
+        # Three times the width of the paddle per tick, aimed at its center.
+        fast = ball(paddle.x - 1.5, paddle.y + 2.0, 3.0, 0.0)
+        events = []
+        step_ball(fast, field, events, 1.0)
+        self.assertEqual(events, [{"type": "paddle_hit"}])
+        self.assertLess(fast.vx, 0.0)
+        self.assertLess(fast.x, paddle.x)
+
+    def test_several_bounces_in_one_step(self) -> None:
+        field = paddles()
+        # Steep enough to hit both walls within a single step.
+        steep = ball(GRID_WIDTH / 2, WALL_TOP + 1.0, 0.1, -30.0)
+        events = []
+        step_ball(steep, field, events, 1.0)
+        self.assertEqual(events, [{"type": "wall_hit"}, {"type": "wall_hit"}])
+        self.assertTrue(WALL_TOP <= steep.y <= WALL_BOTTOM)
+
+    def test_time_of_impact_solves_the_wall_contact(self) -> None:
+        rising = ball(20.0, WALL_TOP + 1.0, 0.5, -2.0)
+        self.assertEqual(time_of_impact(rising, paddles(), 1.0), (0.5, None))
+        self.assertIsNone(time_of_impact(rising, paddles(), 0.25))
+
+    def test_time_of_impact_picks_the_paddle_before_the_wall(self) -> None:
+        field = paddles()
+        paddle = field["left_paddle"]
+        incoming = ball(paddle.x + paddle.width + 1.0, paddle.y + 2.0, -2.0, 0.1)
+        self.assertEqual(time_of_impact(incoming, field, 1.0), (0.5, paddle))
+
+    def test_ball_missing_the_paddle_crosses_its_face(self) -> None:
+        field = paddles()
+        paddle = field["left_paddle"]
+        paddle.y = WALL_BOTTOM - paddle.height
+        passing = ball(paddle.x + paddle.width + 0.5, WALL_TOP, -1.0, 0.0)
+        events = []
+        step_ball(passing, field, events, 1.0)
+        self.assertEqual(events, [])
+        self.assertLess(passing.x, paddle.x + paddle.width)
+
+    def test_paddles_stay_inside_the_field(self) -> None:
+        field = paddles()
+        field["left_paddle"].vy = -100.0
+        field["right_paddle"].vy = 100.0
+        move_paddles(field, 1.0)
+        self.assertEqual(field["left_paddle"].y, PADDLE_MIN_Y)
+        self.assertEqual(field["right_paddle"].y, PADDLE_MAX_Y)
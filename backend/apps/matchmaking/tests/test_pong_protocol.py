@@ -0,0 +1,65 @@
+import struct
+from itertools import pairwise
+
+from django.test import SimpleTestCase
+
+from apps.matchmaking.pong_protocol import HEADER, PROTOCOL_VERSION, WireFormat, apply_delta, encode_delta
+
+SNAPSHOTS = [
+    (24.5, 12.0, 10.0, 10.0, 0, 0),
+    (25.0, 12.5, 10.0, 10.0, 1, 0),
+    (25.5, 13.0, 10.3, 10.0, 1, 0),
+    (25.5, 13.0, 10.3, 10.0, 1, 0),
+    (26.0, 12.5, 10.6, 9.7, 1, 1),
+    (26.0, 12.5, 10.6, 9.7, 2, 2),
+    (1.25, 22.75, 1.0, 19.0, 0xFFFFFFFF, 2),
+]
+
+
+def as_float32(value: float) -> float:
+    return struct.unpack("<f", struct.pack("<f", value))[0]
+
+
+def keyframe(snapshot: tuple) -> dict:
+    ball_x, ball_y, left_y, right_y, left_ack, right_ack = snapshot
+    return {
+        "ball": {"x": ball_x, "y": ball_y},
+        "paddles": {"left_paddle": {"y": left_y}, "right_paddle": {"y": right_y}},
+        "acks": {"left_paddle": left_ack, "right_paddle": right_ack},
+    }
+
+
+class DeltaRoundTripTests(SimpleTestCase):
+    def test_deltas_rebuild_every_snapshot_from_a_keyframe(self) -> None:
+        client = keyframe(SNAPSHOTS[0])
+        for tick, (previous, current) in enumerate(pairwise(SNAPSHOTS), start=1):
+            apply_delta(client, encode_delta(tick, previous, current, []))
+            # Positions travel as float32, input sequence numbers as exact integers.
+            self.assertEqual(client, keyframe((*map(as_float32, current[:4]), *current[4:])))
+
+    def test_unchanged_fields_are_left_out(self) -> None:
+        snapshot = SNAPSHOTS[0]
+        self.assertEqual(len(encode_delta(7, snapshot, snapshot, [])), HEADER.size)
+        self.assertEqual(len(encode_delta(7, None, snapshot, [])), HEADER.size + 6 * 4)
+        moved_paddle = (*snapshot[:3], snapshot[3] + 1.0, *snapshot[4:])
+        self.assertEqual(len(encode_delta(7, snapshot, moved_paddle, [])), HEADER.size + 4)
+        acknowledged = (*snapshot[:4], snapshot[4] + 1, snapshot[5])
+        self.assertEqual(len(encode_delta(7, snapshot, acknowledged, [])), HEADER.size + 4)
+
+    def test_events_travel_as_flags(self) -> None:
+        events = [{"type": "wall_hit"}, {"type": "paddle_hit"}, {"type": "score_update"}]
+        frame = encode_delta(3, SNAPSHOTS[0], SNAPSHOTS[0], events)
+        self.assertEqual(apply_delta(keyframe(SNAPSHOTS[0]), frame), [{"type": "paddle_hit"}, {"type": "wall_hit"}])
+
+    def test_frames_of_another_version_are_ignored(self) -> None:
+        client = keyframe(SNAPSHOTS[0])
+        frame = bytearray(encode_delta(1, None, SNAPSHOTS[-1], [{"type": "wall_hit"}]))
+        frame[0] = PROTOCOL_VERSION + 1
+        self.assertEqual(apply_delta(client, bytes(frame)), [])
+        self.assertEqual(client, keyframe(SNAPSHOTS[0]))
+
+    def test_binary_format_is_negotiated_from_the_query_string(self) -> None:
+        self.assertEqual(WireFormat.negotiate(b"protocol=binary"), WireFormat.BINARY)
+        self.assertEqual(WireFormat.negotiate(b"ticket=abc&protocol=binary"), WireFormat.BINARY)
+        self.assertEqual(WireFormat.negotiate(b"protocol=json"), WireFormat.JSON)
+        self.assertEqual(WireFormat.negotiate(b""), WireFormat.JSON)
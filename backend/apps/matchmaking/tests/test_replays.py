@@ -0,0 +1,99 @@
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.matchmaking.pong_ai import AIConfig, AIDifficulty, AIPlayer
+from apps.matchmaking.pong_engine import GameState, simulate
+from apps.matchmaking.pong_physics import PADDLE_SPEED, MatchRandom
+from apps.matchmaking.replays import MatchRecorder, Replay, replay_path
+
+MAX_TICKS = 50_000
+
+
+def scripted_match(seed: int, recorder: MatchRecorder | None = None, difficulty: str | None = None) -> GameState:
+    """Play a match to the end with pseudo-random inputs, logging every velocity change like the consumer."""
+    inputs = MatchRandom(seed + 1)
+    game = GameState(seed=seed)
+    if difficulty is not None:
+        game.ai_players = [AIPlayer("right_paddle", AIConfig.get_config(difficulty))]
+    game.running = True
+    paddles = ["left_paddle"] if difficulty is not None else ["left_paddle", "right_paddle"]
+    while game.running and game.tick < MAX_TICKS:
+        if game.tick % 7 == 0:
+            paddle = paddles[inputs.next() % len(paddles)]
+            velocity = inputs.sign() * PADDLE_SPEED * (inputs.next() % 2)
+            if game.paddles[paddle].vy != velocity:
+                game.paddles[paddle].vy = velocity
+                if recorder is not None:
+                    recorder.record(game.tick, paddle, velocity)
+        simulate([game], 1.0)
+    return game
+
+
+class MatchRandomTests(SimpleTestCase):
+    def test_same_seed_draws_the_same_numbers(self) -> None:
+        first, second = MatchRandom(99), MatchRandom(99)
+        self.assertEqual([first.next() for _ in range(100)], [second.next() for _ in range(100)])
+        self.assertNotEqual(MatchRandom(99).next(), MatchRandom(100).next())
+
+    def test_uniform_stays_in_range(self) -> None:
+        rng = MatchRandom(7)
+        for _ in range(1000):
+            self.assertTrue(0.5 <= rng.uniform(0.5, 1.5) < 1.5)
+
+    def test_same_seed_and_inputs_play_the_same_match(self) -> None:
+        first, second = scripted_match(11), scripted_match(11)
+        self.assertEqual(first.to_dict(), second.to_dict())
+        self.assertEqual((first.tick, first.winner), (second.tick, second.winner))
+
+
+@override_settings(PONG_SIMULATION_RATE=30)
+class ReplayTests(SimpleTestCase):
+    def setUp(self) -> None:
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings = override_settings(MEDIA_ROOT=media.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    async def record(self, match_id: str, seed: int, difficulty: str | None = None) -> GameState:
+        recorder = MatchRecorder.start(match_id, GameState(seed=seed), difficulty)
+        game = scripted_match(seed, recorder, difficulty)
+        self.assertFalse(game.running)
+        await recorder.close(game.tick)
+        return game
+
+    def replay(self, match_id: str) -> GameState:
+        replay = Replay.load(match_id)
+        self.assertIsNotNone(replay)
+        game = replay.new_game()
+        for _ in replay.play(game):
+            pass
+        return game
+
+    async def test_replay_plays_the_recorded_match_again(self) -> None:
+        game = await self.record("two-players", seed=11)
+        replayed = self.replay("two-players")
+        self.assertEqual(replayed.to_dict(), game.to_dict())
+        self.assertEqual((replayed.tick, replayed.winner), (game.tick, game.winner))
+
+    async def test_replay_of_a_single_player_match_drives_the_ai_again(self) -> None:
+        game = await self.record("single-player", seed=12, difficulty=AIDifficulty.HARD.value)
+        self.assertEqual(Replay.load("single-player").difficulty, AIDifficulty.HARD.value)
+        replayed = self.replay("single-player")
+        self.assertEqual(replayed.to_dict(), game.to_dict())
+        self.assertEqual((replayed.tick, replayed.winner), (game.tick, game.winner))
+
+    async def test_truncated_last_record_is_dropped(self) -> None:
+        game = await self.record("truncated", seed=13)
+        replay = Replay.load("truncated")
+        # A worker dying in the middle of a write leaves part of the end record behind.
+        log = replay_path("truncated")
+        log.write_bytes(log.read_bytes()[:-2])
+        truncated = Replay.load("truncated")
+        self.assertEqual(truncated.inputs, replay.inputs)
+        self.assertIsNone(truncated.end_tick)
+        self.assertEqual(replay.end_tick, game.tick)
+
+    def test_missing_replay_loads_as_none(self) -> None:
+        self.assertIsNone(Replay.load("no-such-match"))
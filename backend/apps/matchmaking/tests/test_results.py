@@ -0,0 +1,105 @@
+import asyncio
+from unittest import mock
+
+from django.test import TestCase
+
+from apps.matchmaking import results
+from apps.matchmaking.models import Match
+from apps.matchmaking.results import MatchResult, ResultWriter, commit_results
+from apps.users.models import User
+
+
+class CommitResultsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.alice = User.objects.create(username="alice", email="alice@example.com")
+        cls.bob = User.objects.create(username="bob", email="bob@example.com")
+
+    def setUp(self) -> None:
+        self.match = Match.objects.create(user1=self.alice, user2=self.bob)
+
+    def result(self, match: Match | None = None, **fields: object) -> MatchResult:
+        return MatchResult(match_id=(match or self.match).id, winner_id=self.alice.id, loser_id=self.bob.id, **fields)
+
+    def test_result_finishes_the_match_and_counts_it(self) -> None:
+        result = self.result(score_user1=3, score_user2=1)
+        self.assertEqual(commit_results([result]), {self.match.id: result})
+
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.winner, self.alice)
+        self.assertEqual((self.match.score_user1, self.match.score_user2), (3, 1))
+        self.assertIsNotNone(self.match.finished_date_played)
+        self.assertEqual(User.objects.get(id=self.alice.id).wins, 1)
+        self.assertEqual(User.objects.get(id=self.bob.id).losses, 1)
+
+    def test_match_is_only_finished_once(self) -> None:
+        commit_results([self.result()])
+        late = MatchResult(match_id=self.match.id, winner_id=self.bob.id, loser_id=self.alice.id)
+        self.assertEqual(commit_results([late]), {})
+
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.winner, self.alice)
+        self.assertEqual(User.objects.get(id=self.bob.id).wins, 0)
+        self.assertEqual(User.objects.get(id=self.alice.id).losses, 0)
+
+    def test_first_result_of_a_batch_wins_the_match(self) -> None:
+        first = self.result()
+        second = MatchResult(match_id=self.match.id, winner_id=self.bob.id, loser_id=self.alice.id)
+        self.assertEqual(commit_results([first, second]), {self.match.id: first})
+        self.assertEqual(User.objects.get(id=self.bob.id).wins, 0)
+
+    def test_counters_are_aggregated_over_the_batch(self) -> None:
+        other = Match.objects.create(user1=self.alice, user2=self.bob)
+        commit_results([self.result(), self.result(other)])
+        self.assertEqual(User.objects.get(id=self.alice.id).wins, 2)
+        self.assertEqual(User.objects.get(id=self.bob.id).losses, 2)
+
+    def test_uncounted_result_leaves_the_stats_alone(self) -> None:
+        commit_results([self.result(count_stats=False)])
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.winner, self.alice)
+        self.assertEqual(User.objects.get(id=self.alice.id).wins, 0)
+
+
+class ResultWriterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.alice = User.objects.create(username="alice", email="alice@example.com")
+        cls.bob = User.objects.create(username="bob", email="bob@example.com")
+        cls.matches = [Match.objects.create(user1=cls.alice, user2=cls.bob) for _ in range(3)]
+
+    async def test_concurrent_results_share_one_transaction(self) -> None:
+        writer = ResultWriter()
+        batches = []
+
+        def commit(batch: list[MatchResult]) -> dict:
+            batches.append(batch)
+            return commit_results(batch)
+
+        with mock.patch.object(results, "commit_results", commit):
+            finished = await asyncio.gather(
+                *(
+                    writer.commit(MatchResult(match_id=match.id, winner_id=self.alice.id, loser_id=self.bob.id))
+                    for match in self.matches
+                )
+            )
+        self.assertEqual(finished, [True, True, True])
+        self.assertEqual(len(batches), 1)
+
+    async def test_only_the_first_result_of_a_match_is_reported_finished(self) -> None:
+        writer = ResultWriter()
+        match_id = self.matches[0].id
+        finished = await asyncio.gather(
+            writer.commit(MatchResult(match_id=match_id, winner_id=self.alice.id, loser_id=self.bob.id)),
+            writer.commit(MatchResult(match_id=match_id, winner_id=self.bob.id, loser_id=self.alice.id)),
+        )
+        self.assertEqual(finished, [True, False])
+
+    async def test_failed_transaction_is_raised_to_every_caller(self) -> None:
+        writer = ResultWriter()
+        result = MatchResult(match_id=self.matches[0].id, winner_id=self.alice.id, loser_id=self.bob.id)
+        with (
+            mock.patch.object(results, "commit_results", side_effect=RuntimeError),
+            self.assertRaises(RuntimeError),
+        ):
+            await writer.commit(result)
@@ -0,0 +1,135 @@
+import asyncio
+import time
+
+from django.test import SimpleTestCase
+
+from apps.matchmaking.scheduler import MatchScheduler, TickCallback, TimerWheel
+
+INTERVAL = 0.01
+
+
+class MatchSchedulerTests(SimpleTestCase):
+    async def test_every_match_is_ticked_until_removed(self) -> None:
+        scheduler = MatchScheduler(INTERVAL)
+        ticks = {"a": 0, "b": 0}
+
+        def counter(room: str) -> TickCallback:
+            async def tick() -> None:
+                ticks[room] += 1
+
+            return tick
+
+        scheduler.add("a", counter("a"))
+        scheduler.add("b", counter("b"))
+        self.assertIn("a", scheduler)
+        await asyncio.sleep(INTERVAL * 10)
+        scheduler.remove("a")
+        a_ticks = ticks["a"]
+        await asyncio.sleep(INTERVAL * 5)
+        scheduler.remove("b")
+
+        self.assertNotIn("a", scheduler)
+        self.assertGreater(a_ticks, 0)
+        self.assertEqual(ticks["a"], a_ticks)
+        self.assertGreater(ticks["b"], a_ticks)
+
+    async def test_loop_stops_once_no_match_is_left(self) -> None:
+        scheduler = MatchScheduler(INTERVAL)
+
+        async def tick() -> None:
+            scheduler.remove("a")
+
+        scheduler.add("a", tick)
+        task = scheduler._task  # noqa: SLF001
+        await asyncio.wait_for(task, INTERVAL * 20)
+        self.assertIsNone(scheduler._task)  # noqa: SLF001
+        self.assertEqual(scheduler.stats.ticks, 1)
+
+    async def test_failing_match_does_not_stop_the_others(self) -> None:
+        scheduler = MatchScheduler(INTERVAL)
+        ticks = []
+
+        async def failing() -> None:
+            raise RuntimeError
+
+        async def working() -> None:
+            ticks.append(None)
+
+        scheduler.add("failing", failing)
+        scheduler.add("working", working)
+        with self.assertLogs("apps.matchmaking.scheduler", "ERROR"):
+            await asyncio.sleep(INTERVAL * 5)
+        scheduler.remove("failing")
+        scheduler.remove("working")
+        self.assertGreater(len(ticks), 1)
+
+    async def test_late_ticks_are_dropped_instead_of_bursting(self) -> None:
+        scheduler = MatchScheduler(INTERVAL)
+        starts = []
+
+        async def slow() -> None:
+            starts.append(time.perf_counter())
+            if len(starts) == 1:
+                # Blocks the event loop for several intervals, like an overloaded worker.
+                time.sleep(INTERVAL * 5)  # noqa: ASYNC251
+            elif len(starts) == 5:
+                scheduler.remove("slow")
+
+        scheduler.add("slow", slow)
+        await asyncio.wait_for(scheduler._task, 1.0)  # noqa: SLF001
+
+        self.assertGreaterEqual(scheduler.stats.skipped_ticks, 3)
+        # Only the tick after the stall runs at once, the next ones wait for their deadlines again.
+        self.assertGreaterEqual(starts[4] - starts[1], INTERVAL * 1.5)
+
+
+class TimerWheelTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.wheel = TimerWheel(INTERVAL, slots=4, name="test")
+        self.fired: list[tuple[str, float]] = []
+
+    def callback(self, key: str) -> TickCallback:
+        async def fire() -> None:
+            self.fired.append((key, asyncio.get_running_loop().time()))
+
+        return fire
+
+    async def wait_until_idle(self) -> None:
+        await asyncio.wait_for(self.wheel._task, 1.0)  # noqa: SLF001
+
+    async def test_timers_fire_once_in_order_of_their_delay(self) -> None:
+        start = asyncio.get_running_loop().time()
+        # Longer than a turn of the wheel, so it waits for a full round in its slot.
+        self.wheel.schedule("late", INTERVAL * 6, self.callback("late"))
+        self.wheel.schedule("soon", INTERVAL * 2, self.callback("soon"))
+        self.assertIn("late", self.wheel)
+        await self.wait_until_idle()
+
+        self.assertEqual([key for key, _ in self.fired], ["soon", "late"])
+        late = dict(self.fired)["late"] - start
+        self.assertGreaterEqual(late, INTERVAL * 6 * 0.9)
+        self.assertNotIn("late", self.wheel)
+
+    async def test_cancelled_timer_never_fires(self) -> None:
+        self.wheel.schedule("cancelled", INTERVAL * 2, self.callback("cancelled"))
+        self.wheel.schedule("kept", INTERVAL * 3, self.callback("kept"))
+        self.assertTrue(self.wheel.cancel("cancelled"))
+        self.assertFalse(self.wheel.cancel("cancelled"))
+        await self.wait_until_idle()
+        self.assertEqual([key for key, _ in self.fired], ["kept"])
+
+    async def test_scheduling_a_key_again_replaces_its_timer(self) -> None:
+        self.wheel.schedule("match", INTERVAL * 2, self.callback("first"))
+        self.wheel.schedule("match", INTERVAL * 3, self.callback("second"))
+        await self.wait_until_idle()
+        self.assertEqual([key for key, _ in self.fired], ["second"])
+
+    async def test_failing_timer_does_not_stop_the_wheel(self) -> None:
+        async def failing() -> None:
+            raise RuntimeError
+
+        self.wheel.schedule("failing", INTERVAL, failing)
+        self.wheel.schedule("kept", INTERVAL * 2, self.callback("kept"))
+        with self.assertLogs("apps.matchmaking.scheduler", "ERROR"):
+            await self.wait_until_idle()
+        self.assertEqual([key for key, _ in self.fired], ["kept"])
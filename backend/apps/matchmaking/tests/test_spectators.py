@@ -0,0 +1,62 @@
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from apps.matchmaking.game_consumer import SPECTATOR_GROUP, SPECTATOR_IDLE_TIMEOUT, PongConsumer, new_game
+
+IDLE_TICKS = round(SPECTATOR_IDLE_TIMEOUT * settings.PONG_SIMULATION_RATE)
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class SpectatorFeedTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.consumer = PongConsumer()
+        self.consumer.channel_layer = get_channel_layer()
+        self.consumer.match_id = "spectator-test"
+        self.consumer.room_group_name = "match_spectator-test"
+        self.game = new_game()
+        self.game.running = True
+
+    async def frames_at(self, tick: int) -> list[dict]:
+        """Publish the spectator frame of ``tick``, returning what the spectator group received."""
+        channel = await self.consumer.channel_layer.new_channel()
+        await self.consumer.channel_layer.group_add(SPECTATOR_GROUP.format(self.consumer.match_id), channel)
+        self.game.tick = tick
+        self.consumer.publish_spectators(self.game, [])
+        for task in list(self.consumer.background_tasks):
+            await task
+        frames = []
+        while self.consumer.channel_layer.channels.get(channel):
+            frames.append(await self.consumer.channel_layer.receive(channel))
+        await self.consumer.channel_layer.group_discard(SPECTATOR_GROUP.format(self.consumer.match_id), channel)
+        return frames
+
+    async def join(self, tick: int, *, keyframe: bool = True) -> None:
+        self.game.tick = tick
+        PongConsumer.games[self.consumer.room_group_name] = self.game
+        try:
+            await self.consumer.spectator_join({"type": "spectator_join", "keyframe": keyframe})
+        finally:
+            del PongConsumer.games[self.consumer.room_group_name]
+
+    async def test_join_starts_the_feed_with_a_keyframe(self) -> None:
+        await self.join(10)
+        (frame,) = await self.frames_at(10)
+        self.assertIn("text", frame)
+
+    async def test_keep_alive_does_not_force_a_keyframe(self) -> None:
+        await self.join(10)
+        await self.frames_at(10)
+        await self.join(11, keyframe=False)
+        self.assertFalse(self.game.spectators.keyframe_due)
+        (frame,) = await self.frames_at(10 + self.game.spectators.every)
+        self.assertIn("bytes", frame)
+
+    async def test_feed_stops_once_nobody_announced_for_the_idle_timeout(self) -> None:
+        await self.join(10)
+        await self.join(10 + IDLE_TICKS, keyframe=False)
+        self.assertTrue(await self.frames_at(10 + 2 * IDLE_TICKS))
+        self.assertIsNotNone(self.game.spectators)
+
+        self.assertEqual(await self.frames_at(11 + 2 * IDLE_TICKS), [])
+        self.assertIsNone(self.game.spectators)
@@ -0,0 +1,92 @@
+import redis
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from apps.matchmaking.pong_engine import GameState, simulate
+from apps.matchmaking.state_store import GameStateStore, load_pong_checkpoint, pong_checkpoint
+
+
+def redis_available() -> bool:
+    try:
+        return redis.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=0.2).ping()
+    except redis.RedisError:
+        return False
+
+
+def as_stored(fields: dict[str, str | bytes | int]) -> dict[bytes, bytes]:
+    """Encode ``fields`` the way ``HGETALL`` hands them back."""
+    return {key.encode(): value if isinstance(value, bytes) else str(value).encode() for key, value in fields.items()}
+
+
+def serving_game() -> GameState:
+    """Return a match stopped while the ball waits to be served after a point."""
+    game = GameState(seed=1234)
+    game.running = True
+    while not game.ball.resseting:
+        simulate([game], 1.0)
+    simulate([game], 1.0)
+    return game
+
+
+def assert_same_state(test: SimpleTestCase, restored: GameState, game: GameState) -> None:
+    # A restored match stays paused until its players return.
+    test.assertEqual({**restored.to_dict(), "running": True}, {**game.to_dict(), "running": True})
+    test.assertEqual(restored.tick, game.tick)
+    test.assertEqual(restored.time, game.time)
+    test.assertEqual(restored.seed, game.seed)
+    test.assertEqual(restored.rng.state, game.rng.state)
+    test.assertEqual(restored.ball.resseting, game.ball.resseting)
+    test.assertEqual(restored.ball.reset_timer, game.ball.reset_timer)
+
+
+class PongCheckpointTests(SimpleTestCase):
+    def test_round_trip_restores_the_state(self) -> None:
+        game = serving_game()
+        restored = GameState()
+        load_pong_checkpoint(as_stored(pong_checkpoint(game)), restored)
+        assert_same_state(self, restored, game)
+
+    def test_resumed_match_plays_on_like_the_original(self) -> None:
+        game = serving_game()
+        restored = GameState()
+        load_pong_checkpoint(as_stored(pong_checkpoint(game)), restored)
+        restored.running = True
+        for _ in range(600):
+            simulate([game], 1.0)
+            simulate([restored], 1.0)
+        assert_same_state(self, restored, game)
+
+
+@override_settings(GAME_STATE_STORE=True, GAME_SHARD_ID="test-shard")
+class GameStateStoreTests(SimpleTestCase):
+    def setUp(self) -> None:
+        if not redis_available():
+            self.skipTest("Redis is not reachable at REDIS_URL")
+
+    async def test_checkpoint_is_restored_from_redis(self) -> None:
+        store = GameStateStore()
+        match_id = "checkpoint-test"
+        game = serving_game()
+        try:
+            self.assertIsNone(await store.acquire(match_id))
+            await store.checkpoint_pong(match_id, game)
+            restored = GameState()
+            self.assertTrue(await store.restore_pong(match_id, restored))
+            assert_same_state(self, restored, game)
+        finally:
+            await store.discard(match_id)
+        self.assertFalse(await store.restore_pong(match_id, GameState()))
+
+    async def test_lease_held_by_another_worker_is_not_taken(self) -> None:
+        store = GameStateStore()
+        with override_settings(GAME_SHARD_ID="other-shard"):
+            other = GameStateStore()
+        match_id = "lease-test"
+        try:
+            self.assertIsNone(await store.acquire(match_id))
+            self.assertEqual(await other.acquire(match_id), "test-shard")
+            self.assertIsNone(await store.acquire(match_id))
+        finally:
+            await store.discard(match_id)
+        self.assertIsNone(await other.acquire(match_id))
+        await other.discard(match_id)
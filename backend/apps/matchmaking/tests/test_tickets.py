@@ -0,0 +1,82 @@
+import time
+from unittest import mock
+
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core import signing
+from django.test import TestCase, override_settings
+
+from apps.matchmaking.models import Match, MatchType
+from apps.matchmaking.tickets import TICKET_SALT, issue_ticket, read_ticket
+from apps.users.models import User
+from setup.routing import websocket_urlpatterns
+
+
+def query(ticket: str) -> bytes:
+    return f"protocol=binary&ticket={ticket}".encode()
+
+
+class TicketTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.alice = User.objects.create(username="alice", email="alice@example.com")
+        cls.bob = User.objects.create(username="bob", email="bob@example.com")
+        cls.eve = User.objects.create(username="eve", email="eve@example.com")
+        cls.match = Match.objects.create(user1=cls.alice, user2=cls.bob, match_type=MatchType.PONG)
+
+    def read(self, ticket: str, user: User, match_type: str = MatchType.PONG) -> object:
+        return read_ticket(query(ticket), str(self.match.id), match_type, user)
+
+    def test_ticket_carries_the_match_and_the_side_of_its_user(self) -> None:
+        ticket = self.read(issue_ticket(self.match, self.bob), self.bob)
+        self.assertEqual(ticket.match_id, self.match.id)
+        self.assertEqual(ticket.side, 2)
+        self.assertFalse(ticket.is_player1)
+        self.assertEqual(ticket.user_id, self.bob.id)
+        self.assertEqual(ticket.opponent_id, self.alice.id)
+        self.assertEqual(ticket.usernames, ("alice", "bob"))
+
+    def test_ticket_is_only_valid_for_its_user_match_and_game(self) -> None:
+        ticket = issue_ticket(self.match, self.alice)
+        self.assertIsNone(self.read(ticket, self.eve))
+        self.assertIsNone(self.read(ticket, self.alice, MatchType.TICTACTOE))
+        other = Match.objects.create(user1=self.alice, user2=self.eve, match_type=MatchType.PONG)
+        self.assertIsNone(read_ticket(query(ticket), str(other.id), MatchType.PONG, self.alice))
+
+    def test_forged_or_missing_tickets_are_refused(self) -> None:
+        forged = signing.dumps({"match": str(self.match.id), "side": 1}, salt="another salt")
+        self.assertIsNone(self.read(forged, self.alice))
+        ticket = issue_ticket(self.match, self.alice)
+        self.assertIsNone(self.read(ticket[:-1] + ("A" if ticket[-1] != "A" else "B"), self.alice))
+        incomplete = signing.dumps({"match": str(self.match.id)}, salt=TICKET_SALT)
+        self.assertIsNone(self.read(incomplete, self.alice))
+        self.assertIsNone(read_ticket(b"protocol=binary", str(self.match.id), MatchType.PONG, self.alice))
+
+    @override_settings(MATCH_TICKET_MAX_AGE=60)
+    def test_expired_ticket_is_refused(self) -> None:
+        ticket = issue_ticket(self.match, self.alice)
+        with mock.patch("time.time", return_value=time.time() + 120):
+            self.assertIsNone(self.read(ticket, self.alice))
+
+
+class GameSocketTicketTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.alice = User.objects.create(username="alice", email="alice@example.com")
+        cls.bob = User.objects.create(username="bob", email="bob@example.com")
+
+    async def connect(self, path: str, user: User) -> tuple[bool, int | None]:
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), path)
+        communicator.scope["user"] = user
+        connected, code = await communicator.connect()
+        await communicator.disconnect()
+        return connected, code
+
+    async def test_sockets_without_a_ticket_of_their_user_are_refused(self) -> None:
+        pong = await Match.objects.acreate(user1=self.alice, user2=self.bob, match_type=MatchType.PONG)
+        tictactoe = await Match.objects.acreate(user1=self.alice, user2=self.bob, match_type=MatchType.TICTACTOE)
+        for match in (pong, tictactoe):
+            path = "game" if match.match_type == MatchType.PONG else "tictactoe"
+            ticket = issue_ticket(match, self.alice)
+            self.assertEqual(await self.connect(f"/ws/{path}/{match.id}/", self.alice), (False, 1000))
+            self.assertEqual(await self.connect(f"/ws/{path}/{match.id}/?ticket={ticket}", self.bob), (False, 1000))
@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.matchmaking import tictactoe_ai
+from apps.matchmaking.tictactoe_ai import best_move, choose_move
+from apps.matchmaking.tictactoe_engine import FULL_BOARD
+
+
+def cells(*positions: int) -> int:
+    return sum(1 << position for position in positions)
+
+
+class BestMoveTests(SimpleTestCase):
+    def test_immediate_win_is_taken(self) -> None:
+        self.assertEqual(best_move(cells(10, 11, 20, 22), cells(0, 1, 2), 0, "medium"), 3)
+        self.assertEqual(best_move(cells(0, 1, 2), cells(10, 11, 20), 0, "medium"), 3)
+
+    def test_open_four_of_the_opponent_is_blocked(self) -> None:
+        self.assertEqual(best_move(cells(0, 1, 2), cells(12, 18), 0, "medium"), 3)
+
+    def test_blocked_cell_is_never_played(self) -> None:
+        move = best_move(cells(10, 11, 20, 22), cells(0, 1, 2), cells(3), "hard")
+        self.assertIsNotNone(move)
+        self.assertNotEqual(move, 3)
+        self.assertFalse(cells(0, 1, 2, 3, 10, 11, 20, 22) >> move & 1)
+
+    def test_full_board_has_no_move(self) -> None:
+        x = cells(*range(0, 25, 2))
+        self.assertIsNone(best_move(x, FULL_BOARD & ~x, 0, "hard"))
+
+
+class ChooseMoveTests(SimpleTestCase):
+    def setUp(self) -> None:
+        pool = ThreadPoolExecutor(1)
+        self.addCleanup(pool.shutdown)
+        patcher = mock.patch.object(tictactoe_ai, "search_pool", mock.Mock(return_value=pool))
+        self.search_pool = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_broken_pool_is_replaced_and_a_random_move_played(self) -> None:
+        x, o = cells(0, 1), cells(5)
+        with (
+            mock.patch.object(tictactoe_ai, "best_move", side_effect=BrokenProcessPool),
+            self.assertLogs("apps.matchmaking.tictactoe_ai", "ERROR"),
+        ):
+            move = await choose_move(x, o, cells(6), "hard")
+        self.search_pool.cache_clear.assert_called_once()
+        self.assertNotIn(move, (0, 1, 5, 6))
+
+    async def test_failed_search_plays_a_random_move(self) -> None:
+        with (
+            mock.patch.object(tictactoe_ai, "best_move", side_effect=ValueError),
+            self.assertLogs("apps.matchmaking.tictactoe_ai", "ERROR"),
+        ):
+            move = await choose_move(cells(0), 0, 0, "easy")
+        self.search_pool.cache_clear.assert_not_called()
+        self.assertNotEqual(move, 0)
@@ -0,0 +1,66 @@
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from apps.matchmaking.tictactoe_book import (
+    INVERSE_SYMMETRIES,
+    SYMMETRIES,
+    OpeningBook,
+    canonical,
+    pack,
+    transform,
+    write_book,
+)
+from apps.matchmaking.tictactoe_engine import CELLS
+
+# X on two cells, O on one and the block on another, with no symmetry of the board mapping it onto itself.
+POSITION = (1 << 0 | 1 << 7, 1 << 3, 1 << 16)
+MOVE = 11
+
+
+def transform_position(position: tuple[int, int, int], symmetry: tuple[int, ...]) -> tuple[int, int, int]:
+    return tuple(transform(cells, symmetry) for cells in position)
+
+
+class SymmetryTests(SimpleTestCase):
+    def test_inverse_symmetries_undo_the_symmetries(self) -> None:
+        for symmetry, inverse in zip(SYMMETRIES, INVERSE_SYMMETRIES, strict=True):
+            self.assertEqual([symmetry[inverse[cell]] for cell in range(CELLS)], list(range(CELLS)))
+
+    def test_canonical_form_is_shared_by_every_orientation(self) -> None:
+        key, _ = canonical(*POSITION)
+        for symmetry in SYMMETRIES:
+            self.assertEqual(canonical(*transform_position(POSITION, symmetry))[0], key)
+
+    def test_canonical_symmetry_gives_the_canonical_form(self) -> None:
+        key, index = canonical(*POSITION)
+        self.assertEqual(pack(*transform_position(POSITION, SYMMETRIES[index])), key)
+
+
+class OpeningBookTests(SimpleTestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "book.bin"
+
+    def test_lookup_maps_the_move_back_to_every_orientation(self) -> None:
+        self.assertEqual(len({pack(*transform_position(POSITION, symmetry)) for symmetry in SYMMETRIES}), 8)
+        key, index = canonical(*POSITION)
+        write_book(self.path, {key: SYMMETRIES[index][MOVE]}, depth=3)
+        book = OpeningBook.open(self.path)
+        self.assertIsNotNone(book)
+
+        for symmetry in SYMMETRIES:
+            self.assertEqual(book.lookup(*transform_position(POSITION, symmetry)), symmetry[MOVE])
+
+    def test_positions_out_of_the_book_are_not_found(self) -> None:
+        key, index = canonical(*POSITION)
+        write_book(self.path, {key: SYMMETRIES[index][MOVE]}, depth=3)
+        book = OpeningBook.open(self.path)
+        self.assertIsNone(book.lookup(1 << 0, 1 << 3, 1 << 16))
+        self.assertIsNone(book.lookup(POSITION[0] | 1 << 24, POSITION[1] | 1 << 20, POSITION[2]))
+
+    def test_invalid_file_is_not_opened(self) -> None:
+        self.path.write_bytes(b"not a book, just some bytes")
+        self.assertIsNone(OpeningBook.open(self.path))
@@ -0,0 +1,185 @@
+import asyncio
+import json
+from unittest import mock
+
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+
+from apps.matchmaking.models import Match, MatchType
+from apps.matchmaking.results import result_writer
+from apps.matchmaking.tickets import issue_ticket
+from apps.matchmaking.tictactoe_ai import best_move
+from apps.matchmaking.tictactoe_consumer import TicTacToeConsumer
+from apps.users.models import User
+from setup.routing import websocket_urlpatterns
+
+IN_MEMORY_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+
+def highest_cell(cells: int) -> int | None:
+    """Stand in for the random block: the highest free cell, far from the moves of the tests."""
+    return cells.bit_length() - 1 if cells else None
+
+
+async def search_in_process(x: int, o: int, block: int, difficulty: str) -> int | None:
+    """Stand in for the process pool, which a test has no use for."""
+    return best_move(x, o, block, difficulty)
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS)
+class TicTacToeConsumerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.alice = User.objects.create(username="alice", email="alice@example.com")
+        cls.bob = User.objects.create(username="bob", email="bob@example.com")
+
+    def setUp(self) -> None:
+        self.match = Match.objects.create(user1=self.alice, user2=self.bob, match_type=MatchType.TICTACTOE)
+        patcher = mock.patch("apps.matchmaking.tictactoe_consumer.random_cell", highest_cell)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(TicTacToeConsumer.games.clear)
+
+    async def join(self, user: User) -> WebsocketCommunicator:
+        ticket = issue_ticket(self.match, user)
+        communicator = WebsocketCommunicator(
+            URLRouter(websocket_urlpatterns), f"/ws/tictactoe/{self.match.id}/?ticket={ticket}"
+        )
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def start(self) -> tuple[WebsocketCommunicator, WebsocketCommunicator]:
+        x = await self.join(self.alice)
+        o = await self.join(self.bob)
+        for player in (x, o):
+            message = json.loads(await player.receive_from())
+            self.assertEqual(message["events"], [{"type": "start_game"}])
+            self.assertEqual(message["game"]["turn"], "X")
+        return x, o
+
+    async def click(self, player: WebsocketCommunicator, position: int) -> None:
+        await player.send_to(text_data=json.dumps({"action": "click", "position": position}))
+
+    async def move(self, *players: WebsocketCommunicator) -> dict:
+        """Return the one move event every player receives."""
+        messages = [json.loads(await player.receive_from()) for player in players]
+        self.assertTrue(all(message == messages[0] for message in messages))
+        self.assertEqual(len(messages[0]["events"]), 1)
+        return messages[0]["events"][0]
+
+    async def finished_match(self) -> Match:
+        for _ in range(100):
+            match = await Match.objects.select_related("winner").aget(id=self.match.id)
+            if match.finished_date_played is not None:
+                break
+            await asyncio.sleep(0.01)
+        self.assertIsNotNone(match.finished_date_played)
+        return match
+
+    async def test_each_move_is_broadcast_as_one_delta(self) -> None:
+        x, o = await self.start()
+        await self.click(x, 12)
+        move = await self.move(x, o)
+        self.assertEqual(
+            move,
+            {
+                "type": "move",
+                "number": 1,
+                "position": 12,
+                "symbol": "X",
+                "turn": "O",
+                "block_index": 24,
+                "result": None,
+            },
+        )
+        await x.disconnect()
+        await o.disconnect()
+
+    async def test_moves_out_of_turn_or_on_taken_cells_are_ignored(self) -> None:
+        x, o = await self.start()
+        await self.click(o, 0)
+        await self.click(x, 99)
+        self.assertTrue(await x.receive_nothing())
+        await self.click(x, 0)
+        self.assertEqual((await self.move(x, o))["block_index"], 24)
+        await self.click(o, 0)
+        await self.click(o, 24)
+        await self.click(x, 1)
+        self.assertTrue(await o.receive_nothing())
+        await x.disconnect()
+        await o.disconnect()
+
+    async def test_four_in_a_row_wins_and_finishes_the_match(self) -> None:
+        x, o = await self.start()
+        for position in (0, 5, 1, 6, 2, 7):
+            await self.click(x if position < 5 else o, position)
+            self.assertIsNone((await self.move(x, o))["result"])
+        await self.click(x, 3)
+        move = await self.move(x, o)
+        self.assertEqual(move["result"], {"winner": "alice", "start_position": 0, "end_position": 3})
+
+        match = await self.finished_match()
+        self.assertEqual(match.winner, self.alice)
+        await self.click(o, 8)
+        self.assertTrue(await o.receive_nothing())
+        await x.disconnect()
+        await o.disconnect()
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS)
+class TicTacToeAIConsumerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.alice = User.objects.create(username="alice", email="alice@example.com")
+        cls.ai = User.objects.create(username="AI", email="ai@example.com")
+
+    def setUp(self) -> None:
+        self.match = Match.objects.create(user1=self.alice, user2=self.ai, match_type=MatchType.TICTACTOE)
+        for target, replacement in (("random_cell", highest_cell), ("choose_move", search_in_process)):
+            patcher = mock.patch(f"apps.matchmaking.tictactoe_consumer.{target}", replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(TicTacToeConsumer.games.clear)
+
+    def join(self, path: str) -> WebsocketCommunicator:
+        ticket = issue_ticket(self.match, self.alice)
+        communicator = WebsocketCommunicator(
+            URLRouter(websocket_urlpatterns), f"/ws/tictactoe/{self.match.id}/{path}?ticket={ticket}"
+        )
+        communicator.scope["user"] = self.alice
+        return communicator
+
+    async def test_ai_answers_every_move(self) -> None:
+        player = self.join("single_player/medium/")
+        connected, _ = await player.connect()
+        self.assertTrue(connected)
+        self.assertEqual(json.loads(await player.receive_from())["events"], [{"type": "start_game"}])
+
+        await player.send_to(text_data=json.dumps({"action": "click", "position": 12}))
+        move = json.loads(await player.receive_from())["events"][0]
+        self.assertEqual((move["symbol"], move["position"]), ("X", 12))
+        answer = json.loads(await player.receive_from())["events"][0]
+        self.assertEqual((answer["symbol"], answer["number"], answer["turn"]), ("O", 2, "X"))
+        self.assertNotIn(answer["position"], (12, move["block_index"]))
+        await player.disconnect()
+
+    async def test_difficulty_is_refused_for_matches_against_a_person(self) -> None:
+        self.match.user2 = await User.objects.acreate(username="bob", email="bob@example.com")
+        await self.match.asave()
+        connected, _ = await self.join("single_player/hard/").connect()
+        self.assertFalse(connected)
+
+    async def test_game_is_released_when_the_forfeit_cannot_be_written(self) -> None:
+        player = self.join("single_player/easy/")
+        await player.connect()
+        await player.receive_from()
+        with (
+            mock.patch.object(result_writer, "commit", side_effect=DatabaseError),
+            self.assertRaises(DatabaseError),
+        ):
+            await player.disconnect()
+        self.assertNotIn(f"match_{self.match.id}", TicTacToeConsumer.games)
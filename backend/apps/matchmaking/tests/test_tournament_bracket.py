@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.matchmaking.models import Tournament, TournamentPlayer
+from apps.matchmaking.results import MatchResult, commit_results
+from apps.users.models import User
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class BracketTests(TestCase):
+    def setUp(self) -> None:
+        self.addCleanup(cache.clear)
+        users = [User.objects.create(username=f"player{i}", email=f"player{i}@example.com") for i in range(5)]
+        self.tournament = Tournament.objects.create(name="Copa", created_by=users[0])
+        self.tournament.players.add(
+            *[TournamentPlayer.objects.create(player=user, display_name=f"Jogador {i}") for i, user in enumerate(users)]
+        )
+        self.tournament.create_next_round()
+
+    def test_bracket_lists_the_matches_and_byes_of_each_round(self) -> None:
+        (first_round,) = self.tournament.get_rounds_data()
+        self.assertEqual(first_round["round_number"], 1)
+        self.assertTrue(first_round["is_current"])
+        self.assertEqual(len(first_round["matches"]), 2)
+        self.assertEqual(len(first_round["byes"]), 1)
+        for match in first_round["matches"]:
+            self.assertTrue(match["player1"]["display_name"].startswith("Jogador"))
+            self.assertIsNone(match["winner"])
+
+    def test_bracket_is_built_with_a_constant_number_of_queries(self) -> None:
+        with self.assertNumQueries(4):
+            self.tournament.build_rounds_data()
+
+    def test_cached_bracket_is_served_until_its_version_changes(self) -> None:
+        bracket = self.tournament.get_bracket_json()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.tournament.get_bracket_json(), bracket)
+
+        match = self.tournament.matches.first()
+        version = self.tournament.bracket_version
+        commit_results([MatchResult(match.id, winner_id=match.user1_id, loser_id=match.user2_id)])
+        self.tournament.refresh_from_db()
+        self.assertEqual(self.tournament.bracket_version, version + 1)
+
+        (first_round,) = self.tournament.get_rounds_data()
+        winners = {entry["id"]: entry["winner"] for entry in first_round["matches"]}
+        self.assertEqual(winners[str(match.id)], match.user1.username)
+
+    def test_new_round_bumps_the_version(self) -> None:
+        version = self.tournament.bracket_version
+        for match in self.tournament.matches.all():
+            commit_results([MatchResult(match.id, winner_id=match.user1_id, loser_id=match.user2_id)])
+        self.tournament.refresh_from_db()
+        self.tournament.check_round_finished()
+
+        self.assertGreater(self.tournament.bracket_version, version + 2)
+        self.assertEqual(len(self.tournament.get_rounds_data()), 2)
@@ -0,0 +1,73 @@
+import uuid
+from dataclasses import dataclass
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from django.core import signing
+
+from apps.matchmaking.models import Match
+from apps.users.models import User
+
+TICKET_SALT = "apps.matchmaking.tickets"
+
+
+@dataclass(frozen=True, slots=True)
+class MatchTicket:
+    """What a game socket needs to know about its match, vouched for by the page that opened it.
+
+    ``side`` is 1 for ``user1`` (the left paddle, X) and 2 for ``user2``.
+    """
+
+    match_id: uuid.UUID
+    match_type: str
+    side: int
+    user_ids: tuple[uuid.UUID, uuid.UUID]
+    usernames: tuple[str, str]
+
+    @property
+    def is_player1(self) -> bool:
+        return self.side == 1
+
+    @property
+    def user_id(self) -> uuid.UUID:
+        return self.user_ids[self.side - 1]
+
+    @property
+    def opponent_id(self) -> uuid.UUID:
+        return self.user_ids[2 - self.side]
+
+
+def issue_ticket(match: Match, user: User) -> str:
+    """Sign a ticket letting ``user`` join ``match`` without the game socket querying the database."""
+    return signing.dumps(
+        {
+            "match": str(match.id),
+            "type": match.match_type,
+            "side": 1 if user.id == match.user1_id else 2,
+            "users": [str(match.user1_id), str(match.user2_id)],
+            "names": [match.user1.username, match.user2.username],
+        },
+        salt=TICKET_SALT,
+    )
+
+
+def read_ticket(query_string: bytes, match_id: str, match_type: str, user: User) -> MatchTicket | None:
+    """Return the ticket of the socket when it is genuine, fresh and issued to ``user`` for this match."""
+    values = parse_qs(query_string.decode()).get("ticket", [])
+    if not values:
+        return None
+    try:
+        data = signing.loads(values[0], salt=TICKET_SALT, max_age=settings.MATCH_TICKET_MAX_AGE)
+        ticket = MatchTicket(
+            match_id=uuid.UUID(data["match"]),
+            match_type=data["type"],
+            side=data["side"],
+            user_ids=(uuid.UUID(data["users"][0]), uuid.UUID(data["users"][1])),
+            usernames=(data["names"][0], data["names"][1]),
+        )
+    except (signing.BadSignature, KeyError, IndexError, TypeError, ValueError):
+        return None
+
+    if str(ticket.match_id) != match_id or ticket.match_type != match_type or ticket.user_id != user.id:
+        return None
+    return ticket
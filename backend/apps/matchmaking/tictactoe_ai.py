@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import cache
+
+from django.conf import settings
+
+from apps.matchmaking.pong_ai import AIDifficulty
+from apps.matchmaking.tictactoe_book import opening_book
+from apps.matchmaking.tictactoe_engine import CELL_LINES, CELLS, FULL_BOARD, LINES, iter_cells, random_cell
+
+logger = logging.getLogger(__name__)
+
+# Four in a row wins and every five holds a four, so the fours alone decide and score a position.
+FOURS = tuple(mask for mask, _, _ in LINES if mask.bit_count() == 4)  # noqa: PLR2004
+WIN = 1_000_000
+# Score of a four holding this many stones of one symbol and none of the other.
+FOUR_WEIGHTS = (0, 1, 10, 100)
+# Cells on more fours come first when nothing better orders the moves.
+CELL_ORDER = sorted(range(CELLS), key=lambda cell: -sum(1 for line in CELL_LINES[cell] if line[0] in FOURS))
+EXACT, LOWER, UPPER = 0, 1, 2
+MAX_TABLE_SIZE = 500_000
+# Nodes searched between two looks at the clock.
+CLOCK_EVERY = 256
+
+_zobrist = random.Random(0x7A7)  # noqa: S311
+ZOBRIST = tuple(tuple(_zobrist.getrandbits(64) for _ in range(CELLS)) for _ in range(2))
+
+# Transposition table of the worker process, shared by every search it runs:
+# position hash -> (depth, value, bound, best move).
+table: dict[int, tuple[int, int, int, int]] = {}
+
+
+@dataclass(slots=True, frozen=True)
+class TicTacToeAIConfig:
+    time_budget: float
+    max_depth: int
+    # Chance of playing a random move instead of the searched one.
+    blunder_rate: float
+    # The book holds best-play moves, which only the hardest AI may play.
+    use_book: bool = False
+
+    @classmethod
+    def get_config(cls, difficulty: str) -> "TicTacToeAIConfig":
+        return AI_CONFIGS.get(difficulty, AI_CONFIGS[AIDifficulty.MEDIUM.value])
+
+
+AI_CONFIGS = {
+    AIDifficulty.EASY.value: TicTacToeAIConfig(time_budget=0.05, max_depth=1, blunder_rate=0.3),
+    AIDifficulty.MEDIUM.value: TicTacToeAIConfig(time_budget=0.25, max_depth=3, blunder_rate=0.0),
+    AIDifficulty.HARD.value: TicTacToeAIConfig(time_budget=1.5, max_depth=CELLS, blunder_rate=0.0, use_book=True),
+}
+
+
+class SearchTimeoutError(Exception):
+    pass
+
+
+@dataclass(slots=True)
+class Search:
+    """Iterative-deepening negamax with alpha-beta pruning over the bitboards.
+
+    ``own`` always holds the stones of the side to move. The blocked cell is
+    only known for the move being chosen: it moves at random after every move,
+    so deeper plies treat every empty cell as playable.
+    """
+
+    deadline: float
+    # 0 when X moves at the root, 1 when O does.
+    side: int
+    block: int
+    nodes: int = 0
+
+    def threats(self, own: int, other: int) -> tuple[int, int]:
+        """Return the cells completing a four for ``own`` and for ``other``."""
+        wins = losses = 0
+        for mask in FOURS:
+            mine = own & mask
+            theirs = other & mask
+            if not theirs and mine.bit_count() == 3:  # noqa: PLR2004
+                wins |= mask ^ mine
+            elif not mine and theirs.bit_count() == 3:  # noqa: PLR2004
+                losses |= mask ^ theirs
+        return wins, losses
+
+    def evaluate(self, own: int, other: int) -> int:
+        score = 0
+        for mask in FOURS:
+            mine = own & mask
+            theirs = other & mask
+            if not theirs:
+                score += FOUR_WEIGHTS[mine.bit_count()]
+            elif not mine:
+                score -= FOUR_WEIGHTS[theirs.bit_count()]
+        return score
+
+    def moves(self, free: int, losses: int, best: int | None) -> list[int]:
+        # Any move but one on an open four of the opponent loses at once.
+        candidates = losses & free or free
+        ordered = [cell for cell in CELL_ORDER if candidates >> cell & 1]
+        if best is not None and best in ordered:
+            ordered.remove(best)
+            ordered.insert(0, best)
+        return ordered
+
+    def probe(self, key: int, depth: int, alpha: int, beta: int) -> tuple[int | None, int, int, int | None]:
+        """Look ``key`` up, returning its value when it settles the node, the narrowed window and its best move."""
+        entry = table.get(key)
+        if entry is None:
+            return None, alpha, beta, None
+        entry_depth, value, bound, best_move = entry
+        if entry_depth >= depth:
+            if bound == EXACT:
+                return value, alpha, beta, best_move
+            if bound == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value, alpha, beta, best_move
+        return None, alpha, beta, best_move
+
+    # Positions travel as arguments: the hottest loop of the search would pay for attribute lookups.
+    def negamax(self, own: int, other: int, key: int, depth: int, alpha: int, beta: int, ply: int) -> int:  # noqa: PLR0913
+        self.nodes += 1
+        if self.nodes % CLOCK_EVERY == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeoutError
+
+        free = FULL_BOARD & ~(own | other)
+        if not free:
+            return 0
+
+        original_alpha = alpha
+        value, alpha, beta, best_move = self.probe(key, depth, alpha, beta)
+        if value is not None:
+            return value
+
+        wins, losses = self.threats(own, other)
+        if wins & free:
+            return WIN - ply
+        if depth == 0:
+            return self.evaluate(own, other)
+
+        zobrist = ZOBRIST[(self.side + ply) & 1]
+        best = -WIN
+        for cell in self.moves(free, losses, best_move):
+            value = -self.negamax(other, own | 1 << cell, key ^ zobrist[cell], depth - 1, -beta, -alpha, ply + 1)
+            if value > best:
+                best, best_move = value, cell
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        bound = UPPER if best <= original_alpha else LOWER if best >= beta else EXACT
+        if len(table) >= MAX_TABLE_SIZE:
+            table.clear()
+        table[key] = (depth, best, bound, best_move)
+        return best
+
+    def root(self, own: int, other: int, key: int, depth: int, first: int | None) -> int:
+        free = FULL_BOARD & ~(own | other | self.block)
+        wins, losses = self.threats(own, other)
+        if wins & free:
+            return (wins & free & -(wins & free)).bit_length() - 1
+        candidates = self.moves(free, losses, first)
+        if len(candidates) == 1:
+            return candidates[0]
+        zobrist = ZOBRIST[self.side]
+        alpha, best_move = -WIN - 1, first
+        for cell in candidates:
+            value = -self.negamax(other, own | 1 << cell, key ^ zobrist[cell], depth - 1, -WIN - 1, -alpha, 1)
+            if value > alpha:
+                alpha, best_move = value, cell
+        return best_move
+
+
+def search_move(x: int, o: int, block: int, max_depth: int, deadline: float) -> int | None:
+    """Deepen the search of the next move up to ``max_depth`` plies or until ``deadline``."""
+    free = FULL_BOARD & ~(x | o | block)
+    if not free:
+        return None
+
+    # X moves first, so O is to move whenever it is a stone behind.
+    side = 0 if x.bit_count() == o.bit_count() else 1
+    own, other = (x, o) if side == 0 else (o, x)
+    key = 0
+    for cell in iter_cells(x):
+        key ^= ZOBRIST[0][cell]
+    for cell in iter_cells(o):
+        key ^= ZOBRIST[1][cell]
+
+    search = Search(deadline=deadline, side=side, block=block)
+    move = None
+    for depth in range(1, min(max_depth, free.bit_count()) + 1):
+        try:
+            move = search.root(own, other, key, depth, move)
+        except SearchTimeoutError:
+            break
+    return move if move is not None else next(iter_cells(free))
+
+
+def best_move(x: int, o: int, block: int, difficulty: str) -> int | None:
+    """Choose the next move within the time budget of ``difficulty``, from the opening book when it allows one."""
+    config = TicTacToeAIConfig.get_config(difficulty)
+    free = FULL_BOARD & ~(x | o | block)
+    if not free:
+        return None
+    if random.random() < config.blunder_rate:  # noqa: S311
+        return random.choice(list(iter_cells(free)))  # noqa: S311
+
+    book = opening_book() if config.use_book else None
+    move = book.lookup(x, o, block) if book is not None else None
+    if move is not None:
+        return move
+    return search_move(x, o, block, config.max_depth, time.perf_counter() + config.time_budget)
+
+
+@cache
+def search_pool() -> ProcessPoolExecutor:
+    # Spawned, not forked: the server process runs threads that a fork would copy mid-flight.
+    return ProcessPoolExecutor(settings.TICTACTOE_AI_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+
+async def choose_move(x: int, o: int, block: int, difficulty: str) -> int | None:
+    """Search the next move in a worker process, so a long search never stalls the event loop.
+
+    A failed search falls back to a random move rather than leaving the
+    player waiting, and a broken pool is replaced for the next search.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(search_pool(), best_move, x, o, block, difficulty)
+    except BrokenProcessPool:
+        # A search process died, which breaks the whole pool for good.
+        logger.exception("TicTacToe AI search pool broke, starting a new one")
+        search_pool().shutdown(wait=False, cancel_futures=True)
+        search_pool.cache_clear()
+    except Exception:
+        logger.exception("TicTacToe AI search failed")
+    return random_cell(FULL_BOARD & ~(x | o | block))
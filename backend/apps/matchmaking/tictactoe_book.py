@@ -0,0 +1,135 @@
+import mmap
+import struct
+from array import array
+from functools import cache
+from pathlib import Path
+
+from django.conf import settings
+
+from apps.matchmaking.tictactoe_engine import BOARD_SIZE, CELLS, iter_cells
+
+BOOK_MAGIC = b"TTTB"
+BOOK_VERSION = 1
+# Magic, version, moves played in the deepest positions, number of slots.
+BOOK_HEADER = struct.Struct("<4sHHQ")
+
+# A slot holds the packed position in its low bits and the move plus one above them; an empty slot is zero.
+KEY_BITS = 2 * CELLS + 5
+KEY_MASK = (1 << KEY_BITS) - 1
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+UINT64_MASK = (1 << 64) - 1
+
+
+def build_symmetries() -> tuple[tuple[int, ...], ...]:
+    """Map every cell to its image under each of the eight rotations and reflections of the board."""
+    last = BOARD_SIZE - 1
+    images = (
+        lambda row, column: (row, column),
+        lambda row, column: (column, last - row),
+        lambda row, column: (last - row, last - column),
+        lambda row, column: (last - column, row),
+        lambda row, column: (row, last - column),
+        lambda row, column: (last - row, column),
+        lambda row, column: (column, row),
+        lambda row, column: (last - column, last - row),
+    )
+    symmetries = []
+    for image in images:
+        cells = []
+        for cell in range(CELLS):
+            row, column = image(*divmod(cell, BOARD_SIZE))
+            cells.append(row * BOARD_SIZE + column)
+        symmetries.append(tuple(cells))
+    return tuple(symmetries)
+
+
+SYMMETRIES = build_symmetries()
+INVERSE_SYMMETRIES = tuple(tuple(symmetry.index(cell) for cell in range(CELLS)) for symmetry in SYMMETRIES)
+
+
+def transform(cells: int, symmetry: tuple[int, ...]) -> int:
+    image = 0
+    for cell in iter_cells(cells):
+        image |= 1 << symmetry[cell]
+    return image
+
+
+def pack(x: int, o: int, block: int) -> int:
+    # The block is stored one-based, zero standing for no block.
+    return x | o << CELLS | block.bit_length() << 2 * CELLS
+
+
+def canonical(x: int, o: int, block: int) -> tuple[int, int]:
+    """Return the smallest packing of the position over the symmetries of the board, and the symmetry giving it."""
+    return min(
+        (pack(transform(x, symmetry), transform(o, symmetry), transform(block, symmetry)), index)
+        for index, symmetry in enumerate(SYMMETRIES)
+    )
+
+
+def slot(key: int, capacity: int) -> int:
+    # Fibonacci hashing: the top bits of the product spread consecutive positions over the table.
+    return (key * HASH_MULTIPLIER & UINT64_MASK) >> (64 - capacity.bit_length() + 1)
+
+
+class OpeningBook:
+    """Solved opening positions in an open-addressing hash table mapped read-only from disk.
+
+    Every worker process maps the same file, so the table is loaded once by the
+    operating system and a lookup touches a slot or two of it.
+    """
+
+    __slots__ = ("depth", "entries")
+
+    def __init__(self, entries: memoryview, depth: int) -> None:
+        self.entries = entries
+        self.depth = depth
+
+    @classmethod
+    def open(cls, path: Path) -> "OpeningBook | None":
+        if not path.is_file():
+            return None
+        with path.open("rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, depth, capacity = BOOK_HEADER.unpack_from(data)
+        if magic != BOOK_MAGIC or version != BOOK_VERSION or len(data) != BOOK_HEADER.size + capacity * 8:
+            data.close()
+            return None
+        return cls(memoryview(data)[BOOK_HEADER.size :].cast("Q"), depth)
+
+    def lookup(self, x: int, o: int, block: int) -> int | None:
+        """Return the solved move of the position, or ``None`` when it is out of the book."""
+        if (x | o).bit_count() > self.depth:
+            return None
+        key, index = canonical(x, o, block)
+        capacity = len(self.entries)
+        position = slot(key, capacity)
+        while entry := self.entries[position]:
+            if entry & KEY_MASK == key:
+                return INVERSE_SYMMETRIES[index][(entry >> KEY_BITS) - 1]
+            position = (position + 1) & (capacity - 1)
+        return None
+
+
+def write_book(path: Path, moves: dict[int, int], depth: int) -> None:
+    """Write the canonical position -> move pairs of ``moves`` as a table at most half full."""
+    capacity = 1 << (2 * len(moves)).bit_length()
+    entries = array("Q", bytes(capacity * 8))
+    for key, move in moves.items():
+        position = slot(key, capacity)
+        while entries[position]:
+            position = (position + 1) & (capacity - 1)
+        entries[position] = key | (move + 1) << KEY_BITS
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Written aside and renamed, so workers mapping the old book never see a partial one.
+    partial = path.with_suffix(".partial")
+    with partial.open("wb") as file:
+        file.write(BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, depth, capacity))
+        entries.tofile(file)
+    partial.replace(path)
+
+
+@cache
+def opening_book() -> OpeningBook | None:
+    return OpeningBook.open(Path(settings.TICTACTOE_OPENING_BOOK))
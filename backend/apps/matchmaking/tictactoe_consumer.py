@@ -1,17 +1,21 @@
 import asyncio
 import json
-import random
 from dataclasses import dataclass, field
 from typing import ClassVar
 
-from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
-from django.utils.timezone import now
 
-from apps.matchmaking.models import Match
+from apps.matchmaking.models import MatchType
+from apps.matchmaking.results import MatchResult, match_finished, result_writer
+from apps.matchmaking.sharding import SHARD_REDIRECT_CODE, routable, shard_map
+from apps.matchmaking.state_store import state_store
+from apps.matchmaking.tickets import read_ticket
+from apps.matchmaking.tictactoe_ai import choose_move
+from apps.matchmaking.tictactoe_engine import CELLS, FULL_BOARD, board_cells, random_cell, winning_line
+from setup.metrics import ACTIVE_MATCHES, MeteredConsumerMixin
 
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     username: str | None = None
     is_online: bool = False
@@ -20,7 +24,7 @@ class Player:
         return {"username": self.username, "is_online": self.is_online}
 
 
-@dataclass
+@dataclass(slots=True)
 class Players:
     player_x: Player = field(default_factory=Player)
     player_o: Player = field(default_factory=Player)
@@ -29,187 +33,224 @@ class Players:
         return {"player_x": self.player_x.to_dict(), "player_o": self.player_o.to_dict()}
 
 
-@dataclass
+@dataclass(slots=True)
 class GameObject:
-    board: list[str] = field(default_factory=lambda: ["" for _ in range(25)])
+    """A 5x5 board kept as one 25-bit integer of stones per symbol, cell ``i`` being bit ``i``."""
+
+    x: int = 0
+    o: int = 0
+    block: int = 0
     turn: str = "X"
-    block_index: int | None = None
     winner: str | None = None
     players: Players = field(default_factory=Players)
+    # Difficulty of the AI playing O in single-player matches.
+    ai: str | None = None
+
+    @property
+    def moves(self) -> int:
+        return (self.x | self.o).bit_count()
+
+    @property
+    def block_index(self) -> int | None:
+        return self.block.bit_length() - 1 if self.block else None
+
+    def free_cells(self) -> int:
+        return FULL_BOARD & ~(self.x | self.o | self.block)
+
+    def place(self, position: int, symbol: str) -> tuple[int, int] | None:
+        """Put ``symbol`` on ``position`` and return the line it completes, if any."""
+        if symbol == "X":
+            self.x |= 1 << position
+            return winning_line(self.x, position)
+        self.o |= 1 << position
+        return winning_line(self.o, position)
 
     def to_dict(self) -> dict:
-        return {"board": self.board, "turn": self.turn, "winner": self.winner, "players": self.players.to_dict()}
+        return {
+            "board": board_cells(self.x, self.o),
+            "block_index": self.block_index,
+            "moves": self.moves,
+            "turn": self.turn,
+            "winner": self.winner,
+            "players": self.players.to_dict(),
+        }
 
 
-class TicTacToeConsumer(AsyncWebsocketConsumer):
+class TicTacToeConsumer(MeteredConsumerMixin, AsyncWebsocketConsumer):
     games: ClassVar[dict[str, GameObject]] = {}
-    locks: ClassVar[dict] = {}
-    winning_combinations: ClassVar[list[tuple[int]]] = [
-        (0, 1, 2, 3, 4),
-        (0, 1, 2, 3),
-        (1, 2, 3, 4),
-        (5, 6, 7, 8, 9),
-        (5, 6, 7, 8),
-        (6, 7, 8, 9),
-        (10, 11, 12, 13, 14),
-        (10, 11, 12, 13),
-        (11, 12, 13, 14),
-        (15, 16, 17, 18, 19),
-        (15, 16, 17, 18),
-        (16, 17, 18, 19),
-        (20, 21, 22, 23, 24),
-        (20, 21, 22, 23),
-        (21, 22, 23, 24),
-        (0, 5, 10, 15, 20),
-        (0, 5, 10, 15),
-        (5, 10, 15, 20),
-        (1, 6, 11, 16, 21),
-        (1, 6, 11, 16),
-        (6, 11, 16, 21),
-        (2, 7, 12, 17, 22),
-        (2, 7, 12, 17),
-        (7, 12, 17, 22),
-        (3, 8, 13, 18, 23),
-        (3, 8, 13, 18),
-        (8, 13, 18, 23),
-        (4, 9, 14, 19, 24),
-        (4, 9, 14, 19),
-        (9, 14, 19, 24),
-        (0, 6, 12, 18, 24),
-        (4, 8, 12, 16, 20),
-        (0, 6, 12, 18),
-        (6, 12, 18, 24),
-        (1, 7, 13, 19),
-        (5, 11, 17, 23),
-        (4, 8, 12, 16),
-        (8, 12, 16, 20),
-        (3, 7, 11, 15),
-        (9, 13, 17, 21),
-    ]
 
     async def connect(self) -> None:
         self.match_id = self.scope["url_route"]["kwargs"]["match_id"]
         self.room_group_name = f"match_{self.match_id}"
         self.user = self.scope["user"]
+        self.ticket = None
+        self.ai_task = None
 
         if not self.user.is_authenticated:
             await self.close()
             return
 
-        self.match = await database_sync_to_async(Match.objects.get)(id=self.match_id)
-        if self.match.finished_date_played or not await self.is_user_in_match():
+        self.ticket = read_ticket(self.scope["query_string"], self.match_id, MatchType.TICTACTOE, self.user)
+        if self.ticket is None:
+            await self.close()
+            return
+
+        # Tickets outlive the match: once its game is released, only the database knows it is over.
+        if self.room_group_name not in self.games and await match_finished(self.match_id):
+            await self.close()
+            return
+
+        difficulty = self.scope["url_route"]["kwargs"].get("difficulty")
+        if difficulty is not None and self.ticket.usernames[1] != "AI":
             await self.close()
             return
 
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
 
+        owner = await shard_map.claim(self.match_id) or await state_store.acquire(self.match_id)
+        if owner is not None:
+            if routable(owner):
+                await self.close(code=SHARD_REDIRECT_CODE, reason=owner)
+            else:
+                # Held by a worker nginx cannot reach: the client retries until the lease moves or expires.
+                await self.close()
+            return
+
         if self.room_group_name not in self.games:
-            self.games[self.room_group_name] = GameObject()
-            self.locks[self.room_group_name] = asyncio.Lock()
+            game = GameObject()
+            await state_store.restore_tictactoe(self.match_id, game)
+            self.games[self.room_group_name] = game
 
         game = self.games[self.room_group_name]
-        player = game.players.player_x if game.players.player_x.username is None else game.players.player_o
+        # user1 plays X, which the results rely on.
+        player = game.players.player_x if self.ticket.is_player1 else game.players.player_o
         player.username, player.is_online = self.user.username, True
-        self.player = "X" if player is game.players.player_x else "O"
+        self.player = "X" if self.ticket.is_player1 else "O"
+        if difficulty is not None:
+            game.ai = difficulty
+            game.players.player_o.username, game.players.player_o.is_online = "AI", True
+        await state_store.checkpoint_tictactoe(self.match_id, game)
 
         if game.players.player_x.is_online and game.players.player_o.is_online:
             await self.send_game_state([{"type": "start_game"}])
+            # Back from a disconnect while the AI was still thinking.
+            self.schedule_ai_move(game)
 
     async def disconnect(self, close_code: int) -> None:
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
         game = self.games.get(self.room_group_name)
-        if game is None:
+        if game is None or self.ticket is None:
             return
 
-        player = (
-            game.players.player_x if game.players.player_x.username == self.user.username else game.players.player_o
-        )
+        player = game.players.player_x if self.ticket.is_player1 else game.players.player_o
         player.is_online = False
+        if game.ai is not None:
+            # The AI leaves with its only opponent.
+            game.players.player_o.is_online = False
+            if self.ai_task is not None:
+                self.ai_task.cancel()
 
         if game.players.player_x.is_online is False and game.players.player_o.is_online is False:
-            match = await database_sync_to_async(Match.objects.get)(id=self.match_id)
-            if not match.finished_date_played:
-                match.winner = self.user
-                match.finished_date_played = now()
-                await match.asave(update_fields=["winner", "finished_date_played"])
-
-            del self.games[self.room_group_name]
-            del self.locks[self.room_group_name]
+            # The last socket to leave wins, except the human of an AI match, who always leaves last and forfeits.
+            winner_id, loser_id = self.ticket.user_id, self.ticket.opponent_id
+            if game.ai is not None:
+                winner_id, loser_id = loser_id, winner_id
+            try:
+                await result_writer.commit(
+                    MatchResult(
+                        match_id=self.ticket.match_id,
+                        winner_id=winner_id,
+                        loser_id=loser_id,
+                        count_stats=False,
+                    )
+                )
+            finally:
+                # Released even when the result could not be written, or the board would stay in memory for good.
+                del self.games[self.room_group_name]
+                await shard_map.release(self.match_id)
+                await state_store.discard(self.match_id)
 
     async def receive(self, text_data: str) -> None:
         data = json.loads(text_data)
         action = data.get("action")
         position = data.get("position")
 
-        if action == "click" and position is not None:
+        if action == "click" and isinstance(position, int) and 0 <= position < CELLS:
             await self.player_click(position)
 
-    async def calc_block_index(self) -> int:
-        game = self.games[self.room_group_name]
-        available_indexes = [i for i, value in enumerate(game.board) if not value and i != game.block_index]
-        if available_indexes:
-            game.block_index = random.choice(available_indexes)  # noqa: S311
-            await self.send_game_state([{"type": "block_index", "block_index": game.block_index}])
+    def move_block(self, game: GameObject) -> int | None:
+        # Any empty cell but the one blocked until now.
+        block_index = random_cell(game.free_cells())
+        if block_index is not None:
+            game.block = 1 << block_index
+        return block_index
 
     async def player_click(self, position: int) -> None:
-        async with self.locks[self.room_group_name]:
-            game = self.games[self.room_group_name]
-            if game.winner or game.board[position] != "" or game.turn != self.player or game.block_index == position:
-                return
-
-            game.board[position] = self.player
-            game.turn = "X" if self.player == "O" else "O"
-
-            winner_result = self.check_winner(game.board)
-            game.winner, start_position, end_position = winner_result if winner_result else (None, None, None)
-            await self.send_game_state([{"type": "put_symbol", "position": position, "symbol": self.player}])
-            await self.calc_block_index()
-
-            if game.winner:
-                await self.send_game_state(
-                    [
-                        {
-                            "type": "finish_game",
-                            "winner": self.user.username,
-                            "start_position": start_position,
-                            "end_position": end_position,
-                        }
-                    ]
+        game = self.games.get(self.room_group_name)
+        # Clicks racing the release of a finished game are ignored.
+        if game is None:
+            return
+        await self.play(game, position, self.player, self.user.username)
+        self.schedule_ai_move(game)
+
+    def schedule_ai_move(self, game: GameObject) -> None:
+        if game.ai is None or game.winner or game.turn != "O":
+            return
+        if self.ai_task is None or self.ai_task.done():
+            self.ai_task = asyncio.create_task(self.ai_move(game))
+
+    async def ai_move(self, game: GameObject) -> None:
+        # The search runs in a worker process; the board may be gone by the time it answers.
+        position = await choose_move(game.x, game.o, game.block, game.ai)
+        if position is not None and self.games.get(self.room_group_name) is game:
+            await self.play(game, position, "O", "AI")
+
+    async def play(self, game: GameObject, position: int, symbol: str, username: str) -> None:
+        # The move is applied without awaiting anything, so no other click can interleave and no lock is needed.
+        if game.winner or game.turn != symbol or not game.free_cells() >> position & 1:
+            return
+
+        line = game.place(position, symbol)
+        game.turn = "X" if symbol == "O" else "O"
+        move = {
+            "type": "move",
+            "number": game.moves,
+            "position": position,
+            "symbol": symbol,
+            "turn": game.turn,
+            "block_index": None,
+            "result": None,
+        }
+        if line is None:
+            move["block_index"] = self.move_block(game)
+        else:
+            game.winner = symbol
+            move["result"] = {"winner": username, "start_position": line[0], "end_position": line[1]}
+
+        # One delta per move, encoded once for every recipient.
+        await self.broadcast({"events": [move]})
+        await state_store.checkpoint_tictactoe(self.match_id, game)
+
+        if game.winner:
+            user1, user2 = self.ticket.user_ids
+            await result_writer.commit(
+                MatchResult(
+                    match_id=self.ticket.match_id,
+                    winner_id=user1 if game.winner == "X" else user2,
+                    loser_id=user2 if game.winner == "X" else user1,
                 )
-                winner = self.match.user1 if game.winner == "X" else self.match.user2
-                losser = self.match.user2 if game.winner == "X" else self.match.user1
-                winner.wins += 1
-                losser.losses += 1
-                self.match.winner = winner
-                await winner.asave(update_fields=["wins"])
-                await losser.asave(update_fields=["losses"])
-                self.match.winner = self.match.user1 if game.winner == "X" else self.match.user2
-                self.match.finished_date_played = now()
-                await self.match.asave(update_fields=["winner", "finished_date_played"])
-
-    def check_winner(self, board: list[str]) -> tuple[str, int, int] | None:
-        for combination in self.winning_combinations:
-            if len(combination) == 5:  # noqa: PLR2004
-                a, b, c, d, f = combination
-                if board[a] and board[a] == board[b] == board[c] == board[d] == board[f]:
-                    return (board[a], a, f)
-            elif len(combination) == 4:  # noqa: PLR2004
-                a, b, c, d = combination
-                if board[a] and board[a] == board[b] == board[c] == board[d]:
-                    return (board[a], a, d)
-        return None
+            )
 
     async def send_game_state(self, events: list[dict]) -> None:
         game = self.games.get(self.room_group_name)
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {"type": "game_state", "game": game.to_dict(), "events": events},
-        )
+        await self.broadcast({"game": game.to_dict(), "events": events})
+
+    async def broadcast(self, message: dict) -> None:
+        await self.channel_layer.group_send(self.room_group_name, {"type": "game_message", "text": json.dumps(message)})
+
+    async def game_message(self, event: dict) -> None:
+        await self.send(text_data=event["text"])
 
-    async def game_state(self, event: dict) -> None:
-        await self.send(text_data=json.dumps(event))
 
-    @database_sync_to_async
-    def is_user_in_match(self) -> bool:
-        return self.user in (self.match.user1, self.match.user2)
+ACTIVE_MATCHES.set_function("tictactoe", function=lambda: len(TicTacToeConsumer.games))
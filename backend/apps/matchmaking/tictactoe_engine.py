@@ -0,0 +1,65 @@
+import random
+from collections.abc import Iterator
+
+BOARD_SIZE = 5
+CELLS = BOARD_SIZE * BOARD_SIZE
+FULL_BOARD = (1 << CELLS) - 1
+# Runs of this many stones or more in a row, column or diagonal win.
+WIN_LENGTHS = (5, 4)
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+# A line is its bit mask plus the first and last cell, which the client strikes through.
+Line = tuple[int, int, int]
+
+
+def build_lines() -> tuple[Line, ...]:
+    """Every winning line of the board, longest first so a five is reported over the four inside it."""
+    lines = []
+    for length in WIN_LENGTHS:
+        for row in range(BOARD_SIZE):
+            for column in range(BOARD_SIZE):
+                for row_step, column_step in DIRECTIONS:
+                    end_row = row + row_step * (length - 1)
+                    end_column = column + column_step * (length - 1)
+                    if not (0 <= end_row < BOARD_SIZE and 0 <= end_column < BOARD_SIZE):
+                        continue
+                    cells = [
+                        (row + row_step * step) * BOARD_SIZE + column + column_step * step for step in range(length)
+                    ]
+                    lines.append((sum(1 << cell for cell in cells), cells[0], cells[-1]))
+    return tuple(lines)
+
+
+LINES = build_lines()
+# The lines through each cell: a move can only complete one of those.
+CELL_LINES = tuple(tuple(line for line in LINES if line[0] >> cell & 1) for cell in range(CELLS))
+
+
+def winning_line(stones: int, cell: int) -> tuple[int, int] | None:
+    """Return the first and last cell of a line completed in ``stones`` by the move at ``cell``."""
+    for mask, start, end in CELL_LINES[cell]:
+        if stones & mask == mask:
+            return start, end
+    return None
+
+
+def iter_cells(cells: int) -> Iterator[int]:
+    while cells:
+        lowest = cells & -cells
+        yield lowest.bit_length() - 1
+        cells ^= lowest
+
+
+def random_cell(cells: int) -> int | None:
+    """Pick one set bit of ``cells`` uniformly, or ``None`` when there is none."""
+    count = cells.bit_count()
+    if not count:
+        return None
+    for _ in range(random.randrange(count)):  # noqa: S311
+        cells &= cells - 1
+    return (cells & -cells).bit_length() - 1
+
+
+def board_cells(x: int, o: int) -> list[str]:
+    """Spell the bitboards out cell by cell, as the clients draw them."""
+    return ["X" if x >> cell & 1 else "O" if o >> cell & 1 else "" for cell in range(CELLS)]
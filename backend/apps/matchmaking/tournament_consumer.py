@@ -8,11 +8,12 @@ from django.db.models import Q
 from django.utils.timezone import now
 
 from apps.matchmaking.models import Tournament, TournamentPlayer
+from setup.metrics import MeteredConsumerMixin
 
 MIN_TOURNAMENT_PLAYERS = 3
 
 
-class TournamentConsumer(AsyncWebsocketConsumer):
+class TournamentConsumer(MeteredConsumerMixin, AsyncWebsocketConsumer):
     connected_users: ClassVar[dict[str, set[str]]] = {}
 
     async def connect(self) -> None:
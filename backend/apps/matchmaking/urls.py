@@ -3,6 +3,7 @@ from django.urls import path
 from apps.matchmaking.views import (
     create_ai_match,
     create_match,
+    create_tictactoe_ai_match,
     create_tictactoe_match,
     create_tournament,
     delete_tournament,
@@ -10,6 +11,8 @@ from apps.matchmaking.views import (
     leave_tournament,
     match_game,
     match_refuse,
+    match_replay,
+    match_spectate,
     tictactoe,
     tournament_room,
     tournaments,
@@ -17,6 +20,8 @@ from apps.matchmaking.views import (
 
 urlpatterns = [
     path("game/<uuid:match_id>", match_game, name="match_game"),
+    path("game/<uuid:match_id>/replay", match_replay, name="match_replay"),
+    path("game/<uuid:match_id>/watch", match_spectate, name="match_spectate"),
     path("create/<uuid:opponent_id>", create_match, name="add_match"),
     path("refuse/<uuid:match_id>", match_refuse, name="match_refuse"),
     path("tournament/create", create_tournament, name="create_tournament"),
@@ -30,6 +35,7 @@ urlpatterns = [
     path("tournament/<uuid:tournament_id>/join", join_tournament, name="join_tournament"),
     path("tournament/<uuid:tournament_id>/leave/", leave_tournament, name="leave_tournament"),
     path("create-ai-match/", create_ai_match, name="create_ai_match"),
+    path("create-tictactoe-ai-match/", create_tictactoe_ai_match, name="create_tictactoe_ai_match"),
     path("create-tictactoe-match/<uuid:opponent_id>", create_tictactoe_match, name="create_tictactoe_match"),
     path("tictactoe-game/<uuid:match_id>", tictactoe, name="tictactoe_game"),
 ]
@@ -11,9 +11,20 @@ from django.views.decorators.http import require_http_methods, require_POST
 
 from apps.matchmaking.forms import CreateTournament, JoinTournament
 from apps.matchmaking.models import Match, MatchType, Tournament, TournamentPlayer
+from apps.matchmaking.pong_physics import BASE_TICK_RATE, PADDLE_MAX_Y, PADDLE_MIN_Y, PADDLE_SPEED
+from apps.matchmaking.replays import replay_path
+from apps.matchmaking.sharding import locate_shard
+from apps.matchmaking.tickets import issue_ticket
 from apps.users.models import User
 from apps.users.schemas import ToastMessage
 
+PONG_SIMULATION = {
+    "base_tick_rate": BASE_TICK_RATE,
+    "paddle_speed": PADDLE_SPEED,
+    "paddle_min_y": PADDLE_MIN_Y,
+    "paddle_max_y": PADDLE_MAX_Y,
+}
+
 
 @login_required
 def create_tictactoe_match(request: HttpRequest, opponent_id: UUID) -> HttpResponse:
@@ -78,7 +89,12 @@ def tictactoe(request: HttpRequest, match_id: UUID) -> HttpResponse:
     return render(
         request,
         "matchmaking/tictactoe.html",
-        {"match": match, "is_player1": match.user1 == request.user},
+        {
+            "match": match,
+            "is_player1": match.user1 == request.user,
+            "shard": locate_shard(match.id),
+            "ticket": issue_ticket(match, request.user),
+        },
     )
 
 
@@ -167,7 +183,65 @@ def match_game(request: HttpRequest, match_id: UUID) -> HttpResponse:
     return render(
         request,
         "matchmaking/pong.html",
-        {"match": match, "is_player1": match.user1 == request.user},
+        {
+            "match": match,
+            "is_player1": match.user1 == request.user,
+            "shard": locate_shard(match.id),
+            "ticket": issue_ticket(match, request.user),
+            "simulation": PONG_SIMULATION,
+        },
+    )
+
+
+@login_required
+def match_replay(request: HttpRequest, match_id: UUID) -> HttpResponse:
+    match = get_object_or_404(Match, id=match_id)
+
+    if match.match_type != MatchType.PONG:
+        messages.error(request, _("This is not a pong match"))
+        return redirect("/")
+
+    if not match.finished_date_played or not replay_path(match.id).is_file():
+        messages.error(request, _("Replay not available"))
+        return redirect("/")
+
+    return render(
+        request,
+        "matchmaking/pong.html",
+        {
+            "match": match,
+            "is_player1": match.user1 == request.user,
+            "viewer": "replay",
+            "simulation": PONG_SIMULATION,
+        },
+    )
+
+
+@login_required
+def match_spectate(request: HttpRequest, match_id: UUID) -> HttpResponse:
+    match = get_object_or_404(Match, id=match_id)
+
+    if match.match_type != MatchType.PONG:
+        messages.error(request, _("This is not a pong match"))
+        return redirect("/")
+
+    if match.finished_date_played:
+        messages.error(request, _("Match already finished"))
+        return redirect("/")
+
+    if not Tournament.objects.filter(matches=match, players__player=request.user).exists():
+        messages.error(request, _("You are not part of this tournament"))
+        return redirect("/")
+
+    return render(
+        request,
+        "matchmaking/pong.html",
+        {
+            "match": match,
+            "is_player1": True,
+            "viewer": "spectator",
+            "simulation": PONG_SIMULATION,
+        },
     )
 
 
@@ -315,3 +389,19 @@ def create_ai_match(request: HttpRequest) -> HttpResponse:
 
     url = reverse("match_game", kwargs={"match_id": match.id})
     return redirect(f"{url}?single_player=true&difficulty={difficulty}&next={next_url}")
+
+
+@login_required
+def create_tictactoe_ai_match(request: HttpRequest) -> HttpResponse:
+    next_url = request.GET.get("next", "/")
+    difficulty = request.GET.get("difficulty", "medium")
+    ai_user = get_object_or_404(User, username="AI")
+
+    match = Match.objects.create(
+        user1=request.user,
+        user2=ai_user,
+        match_type=MatchType.TICTACTOE,
+    )
+
+    url = reverse("tictactoe_game", kwargs={"match_id": match.id})
+    return redirect(f"{url}?single_player=true&difficulty={difficulty}&next={next_url}")
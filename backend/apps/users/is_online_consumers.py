@@ -2,9 +2,10 @@ from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 
 from apps.users.models import User
+from setup.metrics import MeteredConsumerMixin
 
 
-class OnlineStatusConsumer(AsyncWebsocketConsumer):
+class OnlineStatusConsumer(MeteredConsumerMixin, AsyncWebsocketConsumer):
     async def connect(self) -> None:
         if "user" in self.scope and self.scope["user"].is_authenticated:
             self.user = self.scope["user"]
@@ -2,8 +2,10 @@ import json
 
 from channels.generic.websocket import AsyncWebsocketConsumer
 
+from setup.metrics import MeteredConsumerMixin
 
-class NotificationConsumer(AsyncWebsocketConsumer):
+
+class NotificationConsumer(MeteredConsumerMixin, AsyncWebsocketConsumer):
     async def connect(self) -> None:
         if "user" in self.scope and self.scope["user"].is_authenticated:
             self.user = self.scope["user"]
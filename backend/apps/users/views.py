@@ -10,7 +10,8 @@ from django.utils.timezone import now, timedelta
 from django.utils.translation import gettext_lazy as _
 
 from apps.chat.models import BlockList, Chat, ChatParticipants
-from apps.matchmaking.models import Match, Tournament
+from apps.matchmaking.models import Match, MatchType, Tournament
+from apps.matchmaking.replays import replay_path
 from apps.users.forms import UserCreationForm, UserEditProfileForm, UserLoginForm
 from apps.users.models import Friendship, FriendshipStatus, User
 
@@ -134,6 +135,13 @@ def profile(request: HttpRequest) -> HttpResponse:
     paginator = Paginator(matches, 5)
     page_number = request.GET.get("page")
     matches = paginator.get_page(page_number)
+    # Only the matches of the page are looked up on disk; a match played before recording started has no replay.
+    for match in matches:
+        match["has_replay"] = (
+            match["match_type"] == MatchType.PONG
+            and match["finished_date_played"] is not None
+            and replay_path(match["id"]).is_file()
+        )
 
     return render(request, "users/profile.html", {"friends": friends, "matches": matches})
 
@@ -0,0 +1,199 @@
+import functools
+import secrets
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+from typing import Any
+
+from channels.db import DatabaseSyncToAsync
+from channels_redis.core import RedisChannelLayer
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+# Latency buckets in seconds, from well under a 30 Hz tick to a stalled worker.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Consumer handler running in the current task, for the metrics of what it waits on.
+current_handler: ContextVar[str] = ContextVar("current_handler", default="")
+registry: list["Metric"] = []
+
+
+class Metric(ABC):
+    """A metric rendered in the Prometheus text format, registered on creation."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        registry.append(self)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self.samples()
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]: ...
+
+    def label_string(self, values: tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{label}="{value}"' for label, value in zip(self.labels, values, strict=True)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self.values.items():
+            yield f"{self.name}{self.label_string(labels)} {value}"
+
+
+class Gauge(Counter):
+    """Gauge set in place, or read from a callback when scraped for values only known by their owner."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self.callbacks: dict[tuple[str, ...], Callable[[], float]] = {}
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set_function(self, *labels: str, function: Callable[[], float]) -> None:
+        self.callbacks[labels] = function
+
+    def samples(self) -> Iterator[str]:
+        yield from super().samples()
+        for labels, function in self.callbacks.items():
+            yield f"{self.name}{self.label_string(labels)} {function()}"
+
+
+class Histogram(Metric):
+    """Cumulative histogram kept as per-bucket counts, one ``bisect`` per observation."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+        # Per label values: one count per bucket plus +Inf, then the sum.
+        self.series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self) -> Iterator[str]:
+        for labels, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series, strict=False):
+                cumulative += count
+                bucket = f'le="{bound}"'
+                yield f"{self.name}_bucket{self.label_string(labels, bucket)} {cumulative}"
+            yield f"{self.name}_sum{self.label_string(labels)} {series[-1]}"
+            yield f"{self.name}_count{self.label_string(labels)} {cumulative}"
+
+
+TICK_DURATION = Histogram("game_tick_duration_seconds", "Time spent running one tick of every match.", ("game",))
+TICK_STEP_DURATION = Histogram(
+    "game_tick_step_duration_seconds", "Time spent in the batched simulation step of a tick.", ("game",)
+)
+TICK_LAG = Histogram("game_tick_lag_seconds", "How late the game loop woke up after its deadline.", ("game",))
+TICKS_SKIPPED = Counter("game_ticks_skipped_total", "Ticks dropped because the game loop fell behind.", ("game",))
+BROADCAST_LATENCY = Histogram(
+    "game_broadcast_latency_seconds", "Time a send to the channel layer or a local fanout blocked.", ("operation",)
+)
+ACTIVE_MATCHES = Gauge("game_active_matches", "Matches held in memory by this worker.", ("game",))
+CONNECTED_SOCKETS = Gauge("websocket_connections", "Open WebSocket connections.", ("consumer",))
+DB_DURATION = Histogram("consumer_db_duration_seconds", "Time consumer handlers waited on the database.", ("handler",))
+
+
+class MeteredConsumerMixin:
+    """Count the open sockets of a consumer class and name the handler running for the metrics it records."""
+
+    async def dispatch(self, message: dict) -> None:
+        token = current_handler.set(f"{type(self).__name__}.{message['type']}")
+        try:
+            await super().dispatch(message)
+        finally:
+            current_handler.reset(token)
+
+    async def accept(self, subprotocol: str | None = None, headers: list | None = None) -> None:
+        await super().accept(subprotocol, headers)
+        if not getattr(self, "metered", False):
+            self.metered = True
+            CONNECTED_SOCKETS.inc(type(self).__name__)
+
+    async def websocket_disconnect(self, message: dict) -> None:
+        if getattr(self, "metered", False):
+            self.metered = False
+            CONNECTED_SOCKETS.dec(type(self).__name__)
+        await super().websocket_disconnect(message)
+
+
+def instrument_database_sync_to_async() -> None:
+    """Record the wait of every Channels ``database_sync_to_async`` call under the running consumer handler."""
+    call = DatabaseSyncToAsync.__call__
+    if getattr(call, "metered", False):
+        return
+
+    @functools.wraps(call)
+    async def timed(self: DatabaseSyncToAsync, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+        start = time.perf_counter()
+        try:
+            return await call(self, *args, **kwargs)
+        finally:
+            DB_DURATION.observe(time.perf_counter() - start, current_handler.get())
+
+    timed.metered = True
+    DatabaseSyncToAsync.__call__ = timed
+
+
+class MeteredRedisChannelLayer(RedisChannelLayer):
+    async def send(self, channel: str, message: dict) -> None:
+        start = time.perf_counter()
+        try:
+            await super().send(channel, message)
+        finally:
+            BROADCAST_LATENCY.observe(time.perf_counter() - start, "send")
+
+    async def group_send(self, group: str, message: dict) -> None:
+        start = time.perf_counter()
+        try:
+            await super().group_send(group, message)
+        finally:
+            BROADCAST_LATENCY.observe(time.perf_counter() - start, "group_send")
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    """Expose the metrics of this worker in the Prometheus text format."""
+    token = settings.METRICS_TOKEN
+    # Closed until a token is configured: the numbers describe the internals of the worker.
+    if not token or not secrets.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponse(status=403)
+    lines = [line for metric in registry for line in metric.render()]
+    return HttpResponse("\n".join(lines) + "\n", content_type=CONTENT_TYPE)
@@ -2,6 +2,8 @@ from django.urls import re_path
 
 from apps.chat.consumers import ChatConsumer
 from apps.matchmaking.game_consumer import AIDifficulty, PongConsumer
+from apps.matchmaking.replay_consumer import ReplayConsumer
+from apps.matchmaking.spectator_consumer import SpectatorConsumer
 from apps.matchmaking.tictactoe_consumer import TicTacToeConsumer
 from apps.matchmaking.tournament_consumer import TournamentConsumer
 from apps.users.is_online_consumers import OnlineStatusConsumer
@@ -13,7 +15,13 @@ websocket_urlpatterns = [
         PongConsumer.as_asgi(kwargs={"difficulty": AIDifficulty.MEDIUM.value}),
     ),
     re_path(r"ws/game/(?P<match_id>[0-9a-f-]+)/$", PongConsumer.as_asgi()),
+    re_path(r"ws/replay/(?P<match_id>[0-9a-f-]+)/$", ReplayConsumer.as_asgi()),
+    re_path(r"ws/spectate/(?P<match_id>[0-9a-f-]+)/$", SpectatorConsumer.as_asgi()),
     re_path(r"ws/tictactoe/(?P<match_id>[0-9a-f-]+)/$", TicTacToeConsumer.as_asgi()),
+    re_path(
+        r"ws/tictactoe/(?P<match_id>[0-9a-f-]+)/single_player/(?P<difficulty>easy|medium|hard)/?$",
+        TicTacToeConsumer.as_asgi(),
+    ),
     re_path(r"ws/online-status/$", OnlineStatusConsumer.as_asgi()),
     re_path(r"ws/notifications/$", NotificationConsumer.as_asgi()),
     re_path(r"ws/chat/(?P<room_uuid>[^/]+)/$", ChatConsumer.as_asgi()),
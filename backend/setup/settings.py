@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 
 from django.contrib.messages import constants as messages
+from django.core.exceptions import ImproperlyConfigured
 from django.utils.translation import gettext_lazy as _
 
 # Build paths inside the project like this: BASE_DIR / "subdir".
@@ -67,15 +68,65 @@ TEMPLATES = [
     },
 ]
 ASGI_APPLICATION = "setup.asgi.application"
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
 CHANNEL_LAYERS = {
     "default": {
-        "BACKEND": "channels_redis.core.RedisChannelLayer",
+        "BACKEND": "setup.metrics.MeteredRedisChannelLayer",
         "CONFIG": {
-            "hosts": [("redis", 6379)],
+            "hosts": [REDIS_URL],
         },
     },
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "KEY_PREFIX": "cache",
+    },
+}
+# Seconds a built tournament bracket stays cached; a new version replaces it as soon as the bracket changes.
+TOURNAMENT_BRACKET_CACHE_TTL = int(os.getenv("TOURNAMENT_BRACKET_CACHE_TTL", "86400"))
+
+# Game shards
+# Each game worker runs with its own GAME_SHARD_ID (its upstream host name in nginx)
+# and the same comma separated GAME_SHARDS list. A single shard disables routing.
+GAME_SHARDS = [shard for shard in os.getenv("GAME_SHARDS", "").split(",") if shard]
+GAME_SHARD_ID = os.getenv("GAME_SHARD_ID", "")
+
+# Pong simulation rate in Hz. Collisions are swept, so rates below 30 stay correct.
+PONG_SIMULATION_RATE = int(os.getenv("PONG_SIMULATION_RATE", "30"))
+# Network send rates in Hz: full rate while the state changes, heartbeat while it is static.
+PONG_BROADCAST_RATE = int(os.getenv("PONG_BROADCAST_RATE", str(PONG_SIMULATION_RATE)))
+PONG_HEARTBEAT_RATE = int(os.getenv("PONG_HEARTBEAT_RATE", "2"))
+# Spectators get their own downsampled stream, with a full keyframe every few seconds.
+PONG_SPECTATOR_RATE = int(os.getenv("PONG_SPECTATOR_RATE", "10"))
+PONG_SPECTATOR_KEYFRAME_INTERVAL = float(os.getenv("PONG_SPECTATOR_KEYFRAME_INTERVAL", "2.0"))
+# Seconds a Pong match left by every player stays paused, waiting for one to reconnect, before it is forfeited.
+PONG_RECONNECT_GRACE = float(os.getenv("PONG_RECONNECT_GRACE", "15.0"))
+# Worker processes searching the moves of the TicTacToe AI, off the event loop.
+TICTACTOE_AI_WORKERS = int(os.getenv("TICTACTOE_AI_WORKERS", "2"))
+# Opening positions solved ahead of time by `manage.py build_tictactoe_book`, mapped read-only by every worker.
+# The hard AI searches every move while the file is missing.
+TICTACTOE_OPENING_BOOK = os.getenv("TICTACTOE_OPENING_BOOK", os.path.join(BASE_DIR, "media", "tictactoe_book.bin"))
+
+# Checkpoint live matches to Redis so another worker can resume them after a restart.
+# A worker owns its matches through a lease renewed on every checkpoint.
+GAME_STATE_STORE = os.getenv("GAME_STATE_STORE", "false").lower() in {"1", "true", "yes"}
+GAME_STATE_CHECKPOINT_INTERVAL = float(os.getenv("GAME_STATE_CHECKPOINT_INTERVAL", "1.0"))
+GAME_STATE_LEASE_TTL = float(os.getenv("GAME_STATE_LEASE_TTL", "5.0"))
+if GAME_STATE_STORE and not GAME_SHARD_ID:
+    # Leases are owned by shard ids, which are also where other workers redirect sockets to.
+    msg = "GAME_STATE_STORE requires GAME_SHARD_ID"
+    raise ImproperlyConfigured(msg)
+
+# Lifetime in seconds of the signed tickets the match pages hand to the game sockets.
+# Reconnects reuse the ticket of the page; reloading the page issues a new one.
+MATCH_TICKET_MAX_AGE = int(os.getenv("MATCH_TICKET_MAX_AGE", "900"))
+
+# Prometheus metrics of each worker at /metrics, behind this bearer token; disabled while it is empty.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
 # Authentication
 AUTHENTICATION_BACKENDS = (
     "django.contrib.auth.backends.ModelBackend",
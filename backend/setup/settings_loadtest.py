@@ -0,0 +1,31 @@
+import tempfile
+from pathlib import Path
+
+from setup.settings import *  # noqa: F403
+
+# In-process load tests (manage.py loadtest): no Redis, no Postgres, nothing
+# shared with a deployment. Everything is thrown away under the temp directory.
+LOADTEST = True
+DEBUG = False
+LOADTEST_DIR = Path(tempfile.gettempdir()) / "transcendence-loadtest"
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": LOADTEST_DIR / "db.sqlite3",
+    },
+}
+CHANNEL_LAYERS = {
+    "default": {
+        "BACKEND": "channels.layers.InMemoryChannelLayer",
+        "CONFIG": {"capacity": 10_000},
+    },
+}
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+}
+MEDIA_ROOT = LOADTEST_DIR / "media"
+GAME_SHARDS = []
+GAME_STATE_STORE = False
@@ -1,16 +1,31 @@
+const SHARD_REDIRECT_CODE = 4301;
+
 class BaseWebSocket {
-  constructor(path) {
+  constructor(path, query = "") {
     this.wsScheme = window.location.protocol === "https:" ? "wss" : "ws";
-    this.url = `${this.wsScheme}://${window.location.host}/ws/${path}/`;
+    this.path = path;
+    this.params = new URLSearchParams(query);
+    this.url = this.buildUrl();
     this.reconnectAttempts = 0;
     this.maxReconnectAttempts = 10;
     this.reconnectInterval = 3000;
+    this.redirectAttempts = 0;
+    this.maxRedirectAttempts = 5;
+    this.redirectBaseDelay = 250;
     this.setupVisibilityHandler();
     this.connect();
   }
 
+  buildUrl() {
+    const query = this.params.toString();
+    return `${this.wsScheme}://${window.location.host}/ws/${this.path}/${query ? `?${query}` : ""}`;
+  }
+
   connect() {
+    const onmessage = this.socket ? this.socket.onmessage : null;
     this.socket = new WebSocket(this.url);
+    this.socket.binaryType = "arraybuffer";
+    this.socket.onmessage = onmessage;
     this.setupBaseHandlers();
   }
 
@@ -18,6 +33,7 @@ class BaseWebSocket {
     document.addEventListener("visibilitychange", () => {
       if (document.visibilityState === "visible") {
         this.reconnectAttempts = 0;
+        this.redirectAttempts = 0;
         if (this.socket.readyState === WebSocket.CLOSED) {
           this.connect();
         }
@@ -34,7 +50,23 @@ class BaseWebSocket {
       console.error(`Erro no WebSocket ao conectar ao ${this.url}: `, error);
     };
 
-    this.socket.onclose = () => {
+    this.socket.onclose = (event) => {
+      if (event.code === SHARD_REDIRECT_CODE && event.reason) {
+        // Workers that disagree about the owner would bounce the socket forever.
+        if (this.redirectAttempts >= this.maxRedirectAttempts) {
+          console.error(`Redirecionamentos demais ao conectar ao ${this.url}`);
+          return;
+        }
+        const delay = this.redirectBaseDelay * 2 ** this.redirectAttempts;
+        this.redirectAttempts++;
+        this.params.set("shard", event.reason);
+        this.url = this.buildUrl();
+        setTimeout(() => this.connect(), delay);
+        return;
+      }
+
+      // The socket reached its owner before this close, so a later move starts a fresh redirect budget.
+      this.redirectAttempts = 0;
       if (this.reconnectAttempts < this.maxReconnectAttempts) {
         setTimeout(() => {
           this.reconnectAttempts++;
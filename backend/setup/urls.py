@@ -4,6 +4,8 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path, re_path
 
+from setup.metrics import metrics
+
 urlpatterns = (
     i18n_patterns(
         re_path(r"^rosetta/", include("rosetta.urls")),
@@ -16,5 +18,6 @@ urlpatterns = (
     + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     + [
         path("accounts/", include("apps.users.providers.fortytwo.urls")),
+        path("metrics", metrics, name="metrics"),
     ]
 )